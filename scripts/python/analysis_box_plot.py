@@ -1,16 +1,13 @@
 from src.analysis.comparison_box_plot import filter_fpl_data, plot_boxplot
-from src.tools.yaml_loader import load_yaml_file
-import pandas as pd
+from src.data_prep.join_data import load_combine_fpl_data
+from src.tools.storage import read_dataset
+from src.tools.config import get_parameter
 
 # Load parameters
-file_path = "conf/parameters.yaml"
-parameters = load_yaml_file(file_path)
-number_gameweeks_played_min = parameters["number_gameweeks_played_min"]
+number_gameweeks_played_min = get_parameter("number_gameweeks_played_min")
 
-fpl_data = pd.read_csv("data/fpl_data/joined/seasons_joined.csv")
-goals_championship_fpl_points = pd.read_csv(
-    "data/analysis/goals_championship_fpl_points.csv"
-)
+fpl_data = load_combine_fpl_data()
+goals_championship_fpl_points = read_dataset("goals_championship_fpl_points")
 
 # Drop Cole Palmer anomoly season
 fpl_data = fpl_data.drop(
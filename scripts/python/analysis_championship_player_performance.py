@@ -6,46 +6,60 @@ from src.analysis.championship_player_performance import (
     match_and_merge_with_fpl_data,
     process_promotions,
 )
+from src.analysis.player_resolution import PlayerResolutionStore
 from src.data_prep.join_data import (
     load_combine_championship_assists_data,
     load_combine_championship_goals_data,
+    load_combine_fpl_data,
 )
-from src.tools.yaml_loader import load_yaml_file
+from src.tools.config import get_parameter, get_promoted_teams_by_season
 
-# Load promotion/relegation yaml
-file_path = "conf/promoted_teams_by_season.yaml"
-promoted_teams_by_season = load_yaml_file(file_path)
+if __name__ == "__main__":
+    # Load promotion/relegation yaml
+    promoted_teams_by_season = get_promoted_teams_by_season()
 
+    # Goal scorers
+    season_years = [
+        "2015-2016",
+        "2016-2017",
+        "2017-2018",
+        "2018-2019",
+        "2019-2020",
+        "2020-2021",
+        "2021-2022",
+        "2022-2023",
+        "2023-2024",
+    ]
 
-# Goal scorers
-season_years = [
-    "2015-2016",
-    "2016-2017",
-    "2017-2018",
-    "2018-2019",
-    "2019-2020",
-    "2020-2021",
-    "2021-2022",
-    "2022-2023",
-    "2023-2024",
-]
+    df_goals = load_combine_championship_goals_data(
+        season_years=season_years, export_csv=True
+    )
+    df_assists = load_combine_championship_assists_data(
+        season_years=season_years, export_csv=True
+    )
 
-df_goals = load_combine_championship_goals_data(
-    season_years=season_years, export_csv=True
-)
-df_assists = load_combine_championship_assists_data(
-    season_years=season_years, export_csv=True
-)
-
-# Filter promoted players
-df_goals = process_promotions(df_goals, promoted_teams_by_season)
-df_assists = process_promotions(df_assists, promoted_teams_by_season)
+    # Filter promoted players
+    df_goals = process_promotions(df_goals, promoted_teams_by_season)
+    df_assists = process_promotions(df_assists, promoted_teams_by_season)
 
-# Join with FPL data
-fpl_df = pd.read_csv("data/fpl_data/joined/seasons_joined.csv")
-df_goals = match_and_merge_with_fpl_data(df=df_goals, fpl_df=fpl_df)
-df_assists = match_and_merge_with_fpl_data(df=df_assists, fpl_df=fpl_df)
+    # Join with FPL data, sharing resolved players between goals, assists and past runs.
+    # Seasons are matched in parallel worker processes if `matching_max_workers` is set.
+    fpl_df = load_combine_fpl_data()
+    resolution_store = PlayerResolutionStore()
+    max_workers = get_parameter("matching_max_workers")
+    df_goals = match_and_merge_with_fpl_data(
+        df=df_goals,
+        fpl_df=fpl_df,
+        resolution_store=resolution_store,
+        max_workers=max_workers,
+    )
+    df_assists = match_and_merge_with_fpl_data(
+        df=df_assists,
+        fpl_df=fpl_df,
+        resolution_store=resolution_store,
+        max_workers=max_workers,
+    )
 
-# Reformat and tidy output
-df_goals = format_dataframe(df=df_goals, metric="Goals", export_csv=True)
-df_assists = format_dataframe(df=df_assists, metric="Assists", export_csv=True)
+    # Reformat and tidy output
+    df_goals = format_dataframe(df=df_goals, metric="Goals", export_csv=True)
+    df_assists = format_dataframe(df=df_assists, metric="Assists", export_csv=True)
@@ -1,10 +1,8 @@
 import seaborn as sns
 import matplotlib.pyplot as plt
-import pandas as pd
+from src.tools.storage import read_dataset
 
-goals_championship_fpl_points = pd.read_csv(
-    "data/analysis/goals_championship_fpl_points.csv"
-)
+goals_championship_fpl_points = read_dataset("goals_championship_fpl_points")
 
 
 forwards = goals_championship_fpl_points[
@@ -1,10 +1,9 @@
 import pandas as pd
-from src.tools.yaml_loader import load_yaml_file
+from src.tools.config import get_promoted_teams_by_season
 from src.analysis.team_performance import load_and_process_fpl_data
 
 # Load promotion/relegation yaml
-file_path = "conf/promoted_teams_by_season.yaml"
-promoted_teams_by_season = load_yaml_file(file_path)
+promoted_teams_by_season = get_promoted_teams_by_season()
 
 seasons = [
     "2016-17",
@@ -0,0 +1,231 @@
+import os
+import time
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from src.data_prep.championship_past_data import (
+    TABLE_PARSERS,
+    parse_assists_table,
+    parse_goals_table,
+)
+from src.tools.scraper import create_session, fetch_with_retry
+from src.tools.snapshot_archive import get_snapshot_archive
+from src.tools.config import get_config
+
+FIXTURE_DIR = "data/html_fixtures"
+
+# Timeout in seconds of the single attempt made to download a missing fixture
+FIXTURE_TIMEOUT = 10
+
+
+def parse_table_legacy(html, headers, columns_to_clean=None):
+    """
+    The original html.parser `parse_table` with row-wise cleaning, kept as the reference
+    for benchmarks.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content of the webpage.
+    headers : list
+        List of column headers for the table.
+    columns_to_clean : dict, optional
+        Dictionary where the key is the column name and the value is a function to clean
+        a single value (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the table data.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", {"class": "standard_tabelle"})
+
+    if not table:
+        return pd.DataFrame()
+
+    rows = table.find_all("tr")[1:]
+
+    data = []
+    for row in rows:
+        columns = row.find_all("td")
+        processed_columns = [col.text.strip().split("\n")[-1] for col in columns]
+        data.append(processed_columns)
+
+    df = pd.DataFrame(data, columns=headers)
+
+    if columns_to_clean:
+        for col, cleaning_function in columns_to_clean.items():
+            if col in df.columns:
+                df[col] = df[col].apply(cleaning_function)
+
+    return df
+
+
+def parse_legacy(html, metric):
+    """Parse a goals or assists page with the legacy parser."""
+    if metric == "goals":
+        return parse_table_legacy(
+            html,
+            headers=["#", "Player", "", "Country", "Team", "Goals"],
+            columns_to_clean={"Goals": lambda goal_str: goal_str.split(" ")[0]},
+        )
+    return parse_table_legacy(
+        html, headers=["#", "Player", "", "Country", "Team", "Assists"]
+    )
+
+
+def parse_with_backend(html, metric, parser):
+    """Parse a goals or assists page with one of the `TABLE_PARSERS` backends."""
+    if metric == "goals":
+        return parse_goals_table(html, parser=parser)
+    return parse_assists_table(html, parser=parser)
+
+
+def load_fixture(metric, season, url, session=None):
+    """
+    Load the saved HTML page for a metric and season.
+
+    The latest archived snapshot of the page is used if there is one. Otherwise the
+    page is downloaded to the fixture directory on first use, with one attempt of at
+    most `FIXTURE_TIMEOUT` seconds.
+
+    Parameters
+    ----------
+    metric : str
+        Either 'goals' or 'assists'.
+    season : str
+        The season string, e.g. '2023-2024'.
+    url : str
+        The URL the page is downloaded from if no fixture is saved.
+    session : requests.Session, optional
+        The session used to download a missing fixture. Missing fixtures are not
+        downloaded if None (default is None).
+
+    Returns
+    -------
+    str
+        The HTML content, or None if there is no fixture and it could not be
+        downloaded.
+    """
+    archive = get_snapshot_archive()
+    snapshot = archive.latest(f"{metric}/{season}")
+    if snapshot is not None:
+        return archive.read_text(snapshot)
+
+    path = f"{FIXTURE_DIR}/{metric}/{season}.html"
+    if not os.path.exists(path):
+        if session is None:
+            return None
+        try:
+            response = fetch_with_retry(
+                session, url, retries=0, timeout=FIXTURE_TIMEOUT
+            )
+        except requests.RequestException as e:
+            print(f"Error fetching URL {url}: {e}")
+            return None
+        html = response.text
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(html)
+
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def time_parser(function, repeats):
+    """
+    Time the fastest of several runs of a parser.
+
+    Parameters
+    ----------
+    function : callable
+        The parser, called without arguments.
+    repeats : int
+        The number of runs.
+
+    Returns
+    -------
+    tuple of (float, pd.DataFrame)
+        The fastest run time in seconds and the output of the last run.
+    """
+    best_time = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def benchmark_page(html, metric, season, repeats=5):
+    """
+    Compare every parser backend against the legacy parser on one page.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content of the page.
+    metric : str
+        Either 'goals' or 'assists'.
+    season : str
+        The season string, e.g. '2023-2024'.
+    repeats : int, optional
+        The number of timed runs per parser (default is 5).
+
+    Returns
+    -------
+    list of dict
+        The timings, throughput and output parity of each backend.
+    """
+    legacy_time, legacy_df = time_parser(lambda: parse_legacy(html, metric), repeats)
+    size_mb = len(html.encode("utf-8")) / 1024 / 1024
+
+    results = []
+    for parser in TABLE_PARSERS:
+        parser_time, parser_df = time_parser(
+            lambda: parse_with_backend(html, metric, parser), repeats
+        )
+        results.append(
+            {
+                "metric": metric,
+                "season": season,
+                "parser": parser,
+                "rows": len(parser_df),
+                "legacy_ms": round(legacy_time * 1000, 2),
+                "parser_ms": round(parser_time * 1000, 2),
+                "mb_per_second": round(size_mb / parser_time, 1),
+                "speed_up": round(legacy_time / parser_time, 1),
+                "identical": parser_df.equals(legacy_df),
+            }
+        )
+        print(results[-1])
+    return results
+
+
+if __name__ == "__main__":
+    championship_urls = get_config("championship_urls")
+    session = create_session()
+
+    results = []
+    for metric, seasons in championship_urls.items():
+        for season, url in seasons.items():
+            html = load_fixture(metric, season, url, session=session)
+            if html is None:
+                print(f"No fixture available for {metric} {season}.")
+                # Stop downloading, as when offline every download would time out
+                session = None
+                continue
+            results.extend(benchmark_page(html, metric, season))
+
+    if not results:
+        print("No fixture available, nothing to benchmark.")
+    else:
+        results = pd.DataFrame(results)
+        print(results.to_string(index=False))
+        print(
+            results.groupby("parser")[["legacy_ms", "parser_ms"]]
+            .sum()
+            .assign(speed_up=lambda df: (df["legacy_ms"] / df["parser_ms"]).round(1))
+        )
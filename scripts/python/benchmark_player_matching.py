@@ -0,0 +1,330 @@
+import time
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz
+
+from src.analysis.name_index import NameIndex, fold_accents, normalize_name
+from src.analysis.player_matching import match_players
+from src.data_prep.join_data import load_combine_fpl_data
+from src.tools.config import get_config
+
+# Confirmed Championship-to-FPL pairs, as (path, Championship team column, FPL team column)
+GROUND_TRUTH_FILES = [
+    ("data/analysis/goals_championship_fpl_points.csv", "Team", "Team"),
+    ("data/analysis/assists_championship_fpl_points.csv", "Team", "Team"),
+    (
+        "data/analysis/goals_championship_fpl_points_with_transfers.csv",
+        "Championship Team",
+        "FPL Team",
+    ),
+]
+
+# Registered matchers, called as `matcher(names, teams, seasons, fpl_df)` and returning
+# the matched FPL name of each player, or None
+MATCHERS = {}
+
+
+def register_matcher(name, matcher):
+    """
+    Register a matcher to be benchmarked.
+
+    Parameters
+    ----------
+    name : str
+        The name the matcher is reported under.
+    matcher : callable
+        Function called as `matcher(names, teams, seasons, fpl_df)` that returns an
+        array of the matched FPL name of each player, or None for no match.
+    """
+    MATCHERS[name] = matcher
+
+
+def make_blocked_matcher(scorer, threshold):
+    """Make a matcher running `match_players` with a scorer and threshold."""
+
+    def matcher(names, teams, seasons, fpl_df):
+        matches = match_players(
+            names, teams, seasons, fpl_df, scorer=scorer, threshold=threshold
+        )
+        return matches["fuzzy_match"].to_numpy()
+
+    return matcher
+
+
+def make_name_index_matcher(scorer, threshold):
+    """Make a matcher looking every name up in a season's `NameIndex`, ignoring teams."""
+    indexes = {}
+
+    def matcher(names, teams, seasons, fpl_df):
+        matches = np.full(len(names), None, dtype=object)
+        for position, (name, season) in enumerate(zip(names, seasons)):
+            if season not in indexes:
+                season_names = fpl_df.loc[fpl_df["season_start"] == season, ["name"]]
+                indexes[season] = NameIndex(season_names.drop_duplicates())
+            matches[position] = indexes[season].best_match(
+                name, threshold=threshold, scorer=scorer
+            )
+        return matches
+
+    return matcher
+
+
+for threshold in [60, 70, 80, 90]:
+    register_matcher(
+        f"token_sort_ratio@{threshold}",
+        make_blocked_matcher(fuzz.token_sort_ratio, threshold),
+    )
+register_matcher("token_set_ratio@70", make_blocked_matcher(fuzz.token_set_ratio, 70))
+register_matcher("WRatio@80", make_blocked_matcher(fuzz.WRatio, 80))
+register_matcher("ratio@70", make_blocked_matcher(fuzz.ratio, 70))
+register_matcher(
+    "name_index_token_sort_ratio@70",
+    make_name_index_matcher(fuzz.token_sort_ratio, 70),
+)
+
+
+def load_ground_truth(fpl_df):
+    """
+    Load the confirmed Championship-to-FPL pairs of the analysis outputs.
+
+    The outputs do not store the FPL name, so each pair is resolved to the one FPL
+    player of the season and team with the same points, goals, assists and value.
+    Pairs that do not resolve to exactly one FPL player are dropped.
+
+    Parameters
+    ----------
+    fpl_df : pd.DataFrame
+        The FPL data from `load_combine_fpl_data`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'player', 'team' (FPL team names) and 'season_start' to match, and the
+        'fpl_name' each should match.
+    """
+    stat_columns = ["total_points", "goals_scored", "assists", "value_first_gw"]
+    team_name_mapping = get_config("team_name_mapping")
+
+    pairs = []
+    for path, team_column, fpl_team_column in GROUND_TRUTH_FILES:
+        df = pd.read_csv(path)
+        pairs.append(
+            pd.DataFrame(
+                {
+                    "player": df["Player"],
+                    "team": df[team_column].replace(team_name_mapping),
+                    "fpl_team": df[fpl_team_column].replace(team_name_mapping),
+                    "season": df["FPL Season"],
+                    "total_points": df["FPL Points"],
+                    "goals_scored": df["FPL Goals"],
+                    "assists": df["FPL Assists"],
+                    "value_first_gw": df["FPL Value"],
+                }
+            )
+        )
+    pairs = pd.concat(pairs, ignore_index=True).drop_duplicates()
+
+    candidates = pairs.merge(
+        fpl_df[["name", "team", "season", "season_start"] + stat_columns],
+        left_on=["fpl_team", "season"] + stat_columns,
+        right_on=["team", "season"] + stat_columns,
+        suffixes=("", "_fpl"),
+    )
+    keys = ["player", "team", "season_start"]
+    candidates = candidates.drop_duplicates(keys + ["name"])
+    resolved = candidates[~candidates.duplicated(keys, keep=False)]
+
+    ground_truth = resolved[keys + ["name"]].rename(columns={"name": "fpl_name"})
+    print(f"{len(ground_truth)} of {len(pairs)} confirmed pairs resolved.")
+    return ground_truth.reset_index(drop=True)
+
+
+def add_noise(name, rng):
+    """
+    Apply one random edit to a name: a dropped, swapped or repeated character, folded
+    accents, an initial for the first name, or reversed name order.
+
+    Parameters
+    ----------
+    name : str
+        The name to edit.
+    rng : np.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    str
+        The edited name.
+    """
+    edit = rng.integers(6)
+    position = rng.integers(1, max(len(name) - 1, 2))
+    tokens = name.split()
+
+    if edit == 0:
+        return name[:position] + name[position + 1 :]
+    if edit == 1 and len(name) > 2:
+        return (
+            name[: position - 1]
+            + name[position]
+            + name[position - 1]
+            + name[position + 1 :]
+        )
+    if edit == 2:
+        return name[:position] + name[position] + name[position:]
+    if edit == 3:
+        return fold_accents(name).upper()
+    if edit == 4 and len(tokens) > 1:
+        return f"{tokens[0][0]}. {' '.join(tokens[1:])}"
+    return " ".join(reversed(tokens))
+
+
+def build_benchmark_set(ground_truth, fpl_df, noisy_copies=0, seed=0):
+    """
+    Build the labelled players to match, with synthetic noisy and unmatchable names.
+
+    Every confirmed pair is included as is and with `noisy_copies` edited copies
+    (`add_noise`), each labelled with the pair's FPL name. Each pair is also placed in
+    one other season whose FPL data has no player of that name, labelled as having
+    no match.
+
+    Parameters
+    ----------
+    ground_truth : pd.DataFrame
+        The confirmed pairs from `load_ground_truth`.
+    fpl_df : pd.DataFrame
+        The FPL data from `load_combine_fpl_data`.
+    noisy_copies : int, optional
+        The number of edited copies of each confirmed name (default is 0).
+    seed : int, optional
+        The seed of the random edits (default is 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'player', 'team', 'season_start', 'fpl_name' (None for no match) and
+        'kind' ('confirmed', 'noisy' or 'unmatchable') of each player.
+    """
+    rng = np.random.default_rng(seed)
+    confirmed = ground_truth.assign(kind="confirmed")
+    parts = [confirmed]
+
+    for _ in range(noisy_copies):
+        noisy = confirmed.assign(kind="noisy")
+        noisy["player"] = [add_noise(name, rng) for name in noisy["player"]]
+        parts.append(noisy)
+
+    # Move each player to a season without any FPL player of the same name
+    season_names = {
+        season: set(group["name"].map(normalize_name))
+        for season, group in fpl_df.groupby("season_start")
+    }
+    seasons = np.array(sorted(season_names))
+    other_seasons = [
+        [
+            season
+            for season in seasons
+            if normalize_name(player) not in season_names[season]
+        ]
+        for player in ground_truth["player"]
+    ]
+    unmatchable = confirmed.assign(kind="unmatchable", fpl_name=None)
+    unmatchable["season_start"] = [
+        rng.choice(choices) if choices else -1 for choices in other_seasons
+    ]
+    parts.append(unmatchable[unmatchable["season_start"] >= 0])
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def score_matches(benchmark_set, matches):
+    """
+    Compare matches with the labels.
+
+    Parameters
+    ----------
+    benchmark_set : pd.DataFrame
+        The labelled players from `build_benchmark_set`.
+    matches : array-like
+        The matched FPL name of each player, or None.
+
+    Returns
+    -------
+    dict
+        The precision (correct matches over all matches) and recall (correct matches
+        over players with a label).
+    """
+    matches = pd.Series(matches, dtype=object)
+    labels = benchmark_set["fpl_name"].reset_index(drop=True)
+    matched = matches.notna()
+    correct = matched & (matches == labels)
+    return {
+        "precision": round(correct.sum() / max(matched.sum(), 1), 4),
+        "recall": round(correct.sum() / max(labels.notna().sum(), 1), 4),
+    }
+
+
+def benchmark_matcher(name, benchmark_set, fpl_df, latency_sample=200, seed=0):
+    """
+    Measure the accuracy, throughput and per-name latency of a registered matcher.
+
+    Throughput is timed on one call with every player. Latency is timed on separate
+    calls with one player each, for a random sample of players.
+
+    Parameters
+    ----------
+    name : str
+        The name of the registered matcher.
+    benchmark_set : pd.DataFrame
+        The labelled players from `build_benchmark_set`.
+    fpl_df : pd.DataFrame
+        The FPL data from `load_combine_fpl_data`.
+    latency_sample : int, optional
+        The number of single-player calls timed (default is 200).
+    seed : int, optional
+        The seed of the latency sample (default is 0).
+
+    Returns
+    -------
+    dict
+        The matcher's precision, recall, names per second and p50/p99 latency.
+    """
+    matcher = MATCHERS[name]
+    names = benchmark_set["player"].to_numpy(dtype=object)
+    teams = benchmark_set["team"].to_numpy(dtype=object)
+    seasons = benchmark_set["season_start"].to_numpy()
+
+    start = time.perf_counter()
+    matches = matcher(names, teams, seasons, fpl_df)
+    batch_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(names), min(latency_sample, len(names)), replace=False)
+    latencies = []
+    for position in sample:
+        start = time.perf_counter()
+        matcher(names[[position]], teams[[position]], seasons[[position]], fpl_df)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "matcher": name,
+        **score_matches(benchmark_set, matches),
+        "names_per_second": round(len(names) / batch_time),
+        "p50_ms": round(np.percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(np.percentile(latencies, 99) * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    fpl_df = load_combine_fpl_data()
+    ground_truth = load_ground_truth(fpl_df)
+
+    for noisy_copies in [0, 10]:
+        benchmark_set = build_benchmark_set(
+            ground_truth, fpl_df, noisy_copies=noisy_copies
+        )
+        print(f"\n{len(benchmark_set)} players, {noisy_copies} noisy copies per name:")
+        results = pd.DataFrame(
+            [benchmark_matcher(name, benchmark_set, fpl_df) for name in MATCHERS]
+        )
+        print(results.to_string(index=False))
@@ -0,0 +1,231 @@
+import time
+
+import pandas as pd
+
+from src.data_prep.fpl_data import (
+    add_player_positions,
+    fetch_data_from_url,
+    get_merged_gw_source,
+    process_fpl_data,
+)
+from src.tools.config import get_parameter
+
+
+def process_fpl_data_legacy(df, season_year):
+    """
+    The original multi-pass `process_fpl_data`, kept as the reference for benchmarks.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame containing raw FPL data.
+    season_year : str
+        The season year in the format "YYYY-YY".
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the processed and aggregated FPL data.
+    """
+    df = add_player_positions(df, season_year)
+
+    df["gk_points"] = df["total_points"].where(df["position"] == "GK", 0)
+    df["def_points"] = df["total_points"].where(df["position"] == "DEF", 0)
+    df["mid_points"] = df["total_points"].where(df["position"] == "MID", 0)
+    df["fwd_points"] = df["total_points"].where(df["position"] == "FWD", 0)
+
+    max_gw = df["GW"].max()
+    df_max_gw = df[df["GW"] == max_gw]
+
+    count_df = (
+        df[df["minutes"] > get_parameter("minutes_played_gameweek_min")]
+        .groupby("name")["GW"]
+        .nunique()
+        .reset_index(name="count_gws_min_minutes")
+    )
+
+    player_df = (
+        df.groupby("name")
+        .agg(
+            total_points=("total_points", "sum"),
+            goals_scored=("goals_scored", "sum"),
+            assists=("assists", "sum"),
+            clean_sheets=("clean_sheets", "sum"),
+            yellow_cards=("yellow_cards", "sum"),
+            red_cards=("red_cards", "sum"),
+            goals_conceded=("goals_conceded", "sum"),
+            own_goals=("own_goals", "sum"),
+            penalties_missed=("penalties_missed", "sum"),
+            penalties_saved=("penalties_saved", "sum"),
+            saves=("saves", "sum"),
+            bonus_points=("bonus", "sum"),
+            minutes_played=("minutes", "sum"),
+            min_gw=("GW", "min"),
+        )
+        .reset_index()
+    )
+
+    player_df = player_df.merge(count_df, on="name", how="left")
+
+    min_gameweek_info = df.loc[df.groupby("name")["GW"].idxmin()][["name", "value"]]
+    player_df = pd.merge(
+        player_df, min_gameweek_info, on="name", how="left", suffixes=("", "_min")
+    )
+    player_df = player_df.rename(columns={"value": "value_first_gw"})
+
+    player_df = player_df.sort_values(by="total_points", ascending=False).reset_index(
+        drop=True
+    )
+
+    player_df = player_df.merge(
+        df_max_gw[["name", "position", "team"]], on="name", how="left"
+    )
+
+    column_order = [
+        "name",
+        "team",
+        "total_points",
+        "position",
+        "goals_scored",
+        "assists",
+        "clean_sheets",
+        "yellow_cards",
+        "red_cards",
+        "goals_conceded",
+        "own_goals",
+        "penalties_missed",
+        "penalties_saved",
+        "saves",
+        "bonus_points",
+        "value_first_gw",
+        "count_gws_min_minutes",
+        "minutes_played",
+        "min_gw",
+    ]
+    player_df = player_df[column_order]
+
+    player_df["name"] = player_df["name"].str.replace("_", " ")
+    player_df["name"] = player_df["name"].str.replace(r"\s\d+$", "", regex=True)
+
+    return player_df
+
+
+def inflate_gameweek_data(df, factor):
+    """
+    Inflate gameweek data by adding renamed copies of every player.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The gameweek data to inflate.
+    factor : int
+        The number of copies of each player, including the original.
+
+    Returns
+    -------
+    pd.DataFrame
+        Gameweek data with `factor` times as many players and rows.
+    """
+    copies = [df]
+    for copy_number in range(1, factor):
+        copy = df.copy()
+        copy["name"] = copy["name"] + f" Copy{copy_number}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).sort_values("GW", kind="stable")
+
+
+def time_function(function, df, season_year, repeats):
+    """
+    Time the fastest of several runs of an aggregation function.
+
+    Parameters
+    ----------
+    function : callable
+        The aggregation function, called as `function(df, season_year)`.
+    df : pd.DataFrame
+        The gameweek data. A fresh copy is passed to each run.
+    season_year : str
+        The season year in the format "YYYY-YY".
+    repeats : int
+        The number of runs.
+
+    Returns
+    -------
+    tuple of (float, pd.DataFrame)
+        The fastest run time in seconds and the output of the last run.
+    """
+    best_time = float("inf")
+    for _ in range(repeats):
+        df_copy = df.copy()
+        start = time.perf_counter()
+        result = function(df_copy, season_year)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def benchmark_season(season_year, factors, repeats=3):
+    """
+    Compare the legacy and single-pass aggregation on real and inflated data.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+    factors : list of int
+        Inflation factors to run, where 1 is the real data.
+    repeats : int, optional
+        The number of timed runs per path (default is 3).
+
+    Returns
+    -------
+    pd.DataFrame
+        The row count, timings, speed-up and output parity for each factor.
+    """
+    vaastav_url, encoding = get_merged_gw_source(season_year)
+    df = fetch_data_from_url(vaastav_url, encoding=encoding)
+    df = add_player_positions(df, season_year)
+
+    # The legacy path groups players by name, so compare on name-keyed data
+    df = df.drop(columns=["element"])
+
+    results = []
+    for factor in factors:
+        df_inflated = inflate_gameweek_data(df, factor)
+        legacy_time, legacy_df = time_function(
+            process_fpl_data_legacy, df_inflated, season_year, repeats
+        )
+        new_time, new_df = time_function(
+            process_fpl_data, df_inflated, season_year, repeats
+        )
+
+        try:
+            pd.testing.assert_frame_equal(legacy_df, new_df)
+            identical = True
+        except AssertionError:
+            identical = False
+
+        results.append(
+            {
+                "season": season_year,
+                "factor": factor,
+                "rows": len(df_inflated),
+                "legacy_seconds": round(legacy_time, 4),
+                "single_pass_seconds": round(new_time, 4),
+                "speed_up": round(legacy_time / new_time, 1),
+                "identical": identical,
+            }
+        )
+        print(results[-1])
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    seasons = ["2016-17", "2023-24"]
+    factors = [1, 10, 100]
+
+    results = pd.concat(
+        [benchmark_season(season_year, factors) for season_year in seasons],
+        ignore_index=True,
+    )
+    print(results.to_string(index=False))
@@ -0,0 +1,154 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.analysis.stats_tests import (
+    create_subset,
+    filter_data,
+    loop_combinations_resampling,
+)
+from src.data_prep.join_data import load_combine_fpl_data
+from src.tools.config import get_parameter
+
+
+def mean_difference(promoted, not_promoted, axis):
+    """The difference in mean points, vectorized along `axis` for scipy."""
+    return promoted.mean(axis=axis) - not_promoted.mean(axis=axis)
+
+
+def loop_combinations_resampling_scipy(df, n_resamples, seed=0):
+    """
+    Per-combination `scipy.stats.permutation_test` and `scipy.stats.bootstrap`, kept
+    as the reference for benchmarks.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame containing the data.
+    n_resamples : int
+        The number of permutations and bootstrap resamples per combination.
+    seed : int, optional
+        The seed of the resamples (default is 0).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The difference in means, p-value and 95% bootstrap interval of each position
+        and value combination with at least two players in both samples.
+    """
+    results = []
+    for position in df["position"].unique():
+        for value in df["value_first_gw"].unique():
+            filtered_df = filter_data(df, position, value)
+            promoted = filtered_df["promoted_from_championship"] == 1
+            samples = (
+                filtered_df.loc[promoted, "total_points"].to_numpy(dtype="float64"),
+                filtered_df.loc[~promoted, "total_points"].to_numpy(dtype="float64"),
+            )
+            if min(len(sample) for sample in samples) < 2:
+                continue
+
+            permutation = stats.permutation_test(
+                samples,
+                mean_difference,
+                n_resamples=n_resamples,
+                vectorized=True,
+                random_state=seed,
+            )
+            interval = stats.bootstrap(
+                samples,
+                mean_difference,
+                n_resamples=n_resamples,
+                method="percentile",
+                random_state=seed,
+            ).confidence_interval
+            results.append(
+                {
+                    "position": position,
+                    "value_first_gw": value,
+                    "p_value": permutation.pvalue,
+                    "ci_lower": interval.low,
+                    "ci_upper": interval.high,
+                }
+            )
+    return pd.DataFrame(results)
+
+
+def get_p_value_tolerance(n_resamples):
+    """
+    Get the expected largest Monte-Carlo difference between two p-value estimates.
+
+    Two independent estimates of a p-value from `n_resamples` resamples each differ
+    with a standard error of at most sqrt(2 * 0.25 / n_resamples). Results are
+    expected to agree with scipy's within five standard errors, not exactly.
+    """
+    return 5 * np.sqrt(0.5 / n_resamples)
+
+
+def compare_results(reference_df, result_df):
+    """
+    Get the largest differences between two sets of resampling results.
+
+    Parameters
+    ----------
+    reference_df, result_df : pd.DataFrame
+        Results with 'position', 'value_first_gw', 'p_value', 'ci_lower' and
+        'ci_upper' columns.
+
+    Returns
+    -------
+    dict
+        The largest absolute difference in p-values and in interval bounds over the
+        combinations in both.
+    """
+    merged = reference_df.merge(
+        result_df, on=["position", "value_first_gw"], suffixes=("_reference", "")
+    )
+    bound_differences = [
+        (merged[f"{bound}_reference"] - merged[bound]).abs().max()
+        for bound in ["ci_lower", "ci_upper"]
+    ]
+    return {
+        "max_p_value_difference": round(
+            (merged["p_value_reference"] - merged["p_value"]).abs().max(), 4
+        ),
+        "max_ci_difference": round(max(bound_differences), 2),
+    }
+
+
+if __name__ == "__main__":
+    df = load_combine_fpl_data()
+    df = df[df["count_gws_min_minutes"] >= get_parameter("number_gameweeks_played_min")]
+    df = df[df["min_gw"] == 1]
+    df = create_subset(df, team_strength_threshold=5)
+
+    results = []
+    for n_resamples in [1000, 10000]:
+        start = time.perf_counter()
+        scipy_df = loop_combinations_resampling_scipy(df, n_resamples)
+        scipy_time = time.perf_counter() - start
+
+        for max_workers in [None, os.cpu_count()]:
+            start = time.perf_counter()
+            result_df = loop_combinations_resampling(
+                df, n_resamples=n_resamples, max_workers=max_workers
+            )
+            new_time = time.perf_counter() - start
+            results.append(
+                {
+                    "n_resamples": n_resamples,
+                    "max_workers": max_workers,
+                    "combinations": len(result_df),
+                    "scipy_seconds": round(scipy_time, 3),
+                    "index_matrix_seconds": round(new_time, 3),
+                    "speed_up": round(scipy_time / new_time, 1),
+                    **compare_results(scipy_df, result_df),
+                    "p_value_tolerance": round(get_p_value_tolerance(n_resamples), 4),
+                }
+            )
+            print(results[-1])
+
+    print(pd.DataFrame(results).to_string(index=False))
@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.stats_tests import (
+    create_subset,
+    filter_data,
+    format_result,
+    loop_combinations,
+    perform_test,
+)
+from src.data_prep.join_data import load_combine_fpl_data
+from src.tools.config import get_parameter
+
+
+def loop_combinations_legacy(df):
+    """
+    The original per-combination `loop_combinations`, kept as the reference for
+    benchmarks.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame containing the data.
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        The t-test and Mann-Whitney U test results for each position and value.
+    """
+    results_t = []
+    results_mwu = []
+
+    unique_positions = df["position"].unique()
+    unique_values = df["value_first_gw"].unique()
+
+    for position in unique_positions:
+        for value in unique_values:
+            filtered_df = filter_data(df, position, value)
+            result_t = perform_test(filtered_df, test_type="t_test")
+            result_mwu = perform_test(filtered_df, test_type="mwu")
+
+            if result_t:
+                result_t.update({"position": position, "value_first_gw": value})
+                results_t.append(result_t)
+
+            if result_mwu:
+                result_mwu.update({"position": position, "value_first_gw": value})
+                results_mwu.append(result_mwu)
+
+    return pd.DataFrame(results_t), pd.DataFrame(results_mwu)
+
+
+def inflate_players(df, factor, seed=0):
+    """
+    Inflate player data with jittered copies of every player.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The player data to inflate.
+    factor : int
+        The number of copies of each player, including the original.
+    seed : int, optional
+        The seed of the jitter added to the copies' total points (default is 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        Player data with `factor` times as many rows.
+    """
+    rng = np.random.default_rng(seed)
+    copies = [df]
+    for _ in range(1, factor):
+        copy = df.copy()
+        copy["total_points"] = copy["total_points"] + rng.integers(-5, 6, len(copy))
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def time_function(function, df, repeats):
+    """
+    Time the fastest of several runs of a test function.
+
+    Parameters
+    ----------
+    function : callable
+        The function, called as `function(df)`.
+    df : pd.DataFrame
+        The player data.
+    repeats : int
+        The number of runs.
+
+    Returns
+    -------
+    tuple of (float, tuple)
+        The fastest run time in seconds and the output of the last run.
+    """
+    best_time = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(df)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def compare_results(legacy_results, new_results):
+    """
+    Check that both paths return the same results, and the same formatted tables.
+
+    Parameters
+    ----------
+    legacy_results, new_results : tuple of (pd.DataFrame, pd.DataFrame)
+        The t-test and Mann-Whitney U results of each path.
+
+    Returns
+    -------
+    bool
+        True if the results match to floating point tolerance and the formatted
+        tables are identical.
+    """
+    try:
+        for legacy_df, new_df in zip(legacy_results, new_results):
+            pd.testing.assert_frame_equal(legacy_df, new_df, check_dtype=False)
+            pd.testing.assert_frame_equal(
+                format_result(legacy_df.copy()), format_result(new_df.copy())
+            )
+    except AssertionError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    df = load_combine_fpl_data()
+    df = df[df["count_gws_min_minutes"] >= get_parameter("number_gameweeks_played_min")]
+    df = df[df["min_gw"] == 1]
+
+    results = []
+    for team_strength_threshold in [3, 5]:
+        df_subset = create_subset(df, team_strength_threshold)
+        for factor in [1, 10, 100]:
+            df_inflated = inflate_players(df_subset, factor)
+            legacy_time, legacy_results = time_function(
+                loop_combinations_legacy, df_inflated, repeats=3
+            )
+            new_time, new_results = time_function(
+                loop_combinations, df_inflated, repeats=3
+            )
+            results.append(
+                {
+                    "team_strength_threshold": team_strength_threshold,
+                    "factor": factor,
+                    "rows": len(df_inflated),
+                    "legacy_seconds": round(legacy_time, 4),
+                    "grouped_seconds": round(new_time, 4),
+                    "speed_up": round(legacy_time / new_time, 1),
+                    "identical": compare_results(legacy_results, new_results),
+                }
+            )
+            print(results[-1])
+
+    print(pd.DataFrame(results).to_string(index=False))
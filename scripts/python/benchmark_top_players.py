@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.app_tools import TopPlayersIndex, top_players_fpl_data
+from src.tools.storage import read_dataset
+
+FPL_COLUMNS = [
+    "name",
+    "season",
+    "total_points",
+    "position",
+    "team",
+    "value_first_gw",
+    "goals_scored",
+    "assists",
+    "saves",
+    "goals_conceded",
+    "minutes_played",
+    "promoted_from_championship",
+]
+
+
+def inflate_seasons(df, factor, seed=0):
+    """
+    Inflate FPL data with copies of every season, with jittered total points.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The FPL data to inflate.
+    factor : int
+        The number of copies of each season, including the original.
+    seed : int, optional
+        The seed of the jitter added to the copies' total points (default is 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        FPL data with `factor` times as many rows, each copy with its own season
+        names.
+    """
+    rng = np.random.default_rng(seed)
+    copies = [df]
+    for copy_number in range(1, factor):
+        copy = df.copy()
+        copy["total_points"] = copy["total_points"] + rng.integers(-5, 6, len(copy))
+        copy["season"] = copy["season"].astype(str) + f" ({copy_number})"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def random_queries(n_queries, seed=0):
+    """
+    Draw random position, value range and top_n queries, like slider interactions.
+
+    Parameters
+    ----------
+    n_queries : int
+        The number of queries.
+    seed : int, optional
+        The seed of the queries (default is 0).
+
+    Returns
+    -------
+    list of tuple
+        The (filter_position, filter_value_first_gw, top_n) of each query.
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        low = round(rng.uniform(0, 10), 1)
+        high = round(rng.uniform(low, 10), 1)
+        queries.append(
+            (
+                rng.choice(["All", "GK", "DEF", "MID", "FWD"]),
+                (low, high),
+                int(rng.choice([5, 25, 1000])),
+            )
+        )
+    return queries
+
+
+def same_players(legacy_df, index_df):
+    """
+    Check that both paths return the same players and columns in points order.
+
+    Players with equal points may be listed in a different order, so both results are
+    ordered by points and then by row before comparing.
+    """
+
+    def order(df):
+        return df.assign(row=df.index).sort_values(
+            ["Total Points", "row"], ascending=[False, True]
+        )
+
+    try:
+        pd.testing.assert_frame_equal(order(legacy_df), order(index_df))
+    except AssertionError:
+        return False
+    return index_df["Total Points"].is_monotonic_decreasing
+
+
+if __name__ == "__main__":
+    df = read_dataset("fpl_data", columns=FPL_COLUMNS)
+    queries = random_queries(200)
+
+    results = []
+    for factor in [1, 10, 100]:
+        df_inflated = inflate_seasons(df, factor)
+
+        start = time.perf_counter()
+        index = TopPlayersIndex(df_inflated)
+        build_time = time.perf_counter() - start
+
+        legacy_times = []
+        index_times = []
+        identical = True
+        for filter_position, filter_value_first_gw, top_n in queries:
+            start = time.perf_counter()
+            legacy_df = top_players_fpl_data(
+                df_inflated, filter_position, filter_value_first_gw, top_n
+            )
+            legacy_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            index_df = index.top_players(filter_position, filter_value_first_gw, top_n)
+            index_times.append(time.perf_counter() - start)
+
+            identical = identical and same_players(legacy_df, index_df)
+
+        results.append(
+            {
+                "factor": factor,
+                "rows": len(df_inflated),
+                "build_ms": round(build_time * 1000, 1),
+                "legacy_p50_ms": round(np.percentile(legacy_times, 50) * 1000, 3),
+                "index_p50_ms": round(np.percentile(index_times, 50) * 1000, 3),
+                "index_p99_ms": round(np.percentile(index_times, 99) * 1000, 3),
+                "identical": identical,
+            }
+        )
+        print(results[-1])
+
+    print(pd.DataFrame(results).to_string(index=False))
@@ -0,0 +1,43 @@
+import glob
+
+import pandas as pd
+
+from src.data_prep.dimensions import (
+    get_backfill_teams,
+    get_player_dimension,
+    get_team_dimension,
+)
+from src.tools.storage import get_dataset_config, write_dataset
+
+# Add stable player and team ids to the FPL data saved before the dimensions existed.
+# The aggregated data has no FPL 'code', so these players are identified across
+# seasons by name, and by name and team if their name is shared by several players in
+# any season. Namesakes who never play in the same season share an id until their
+# seasons are re-fetched. Each season's CSV file is rewritten unchanged apart from the
+# new columns.
+csv_path = get_dataset_config("fpl_data")["csv_path"]
+paths = sorted(glob.glob(csv_path.format(partition="*")))
+seasons_data = [pd.read_csv(path) for path in paths]
+
+# Players are told apart by team in every season if their name is shared in any
+all_seasons = pd.concat(seasons_data, ignore_index=True)
+backfill_teams = get_backfill_teams(
+    all_seasons["name"], all_seasons["team"], all_seasons["season"]
+)
+shared_names = set(all_seasons.loc[pd.notna(backfill_teams), "name"])
+
+team_dimension = get_team_dimension()
+player_dimension = get_player_dimension()
+for path, season_data in zip(paths, seasons_data):
+    season_data["team_id"] = team_dimension.get_ids(season_data["team"])
+    season_data["player_id"] = player_dimension.get_ids(
+        season_data["name"],
+        season_data["team"].where(season_data["name"].isin(shared_names)),
+    )
+    season_data = season_data[get_dataset_config("fpl_data")["schema"].names]
+
+    # Save the dimensions first, so every saved key has a dimension row
+    player_dimension.save()
+    team_dimension.save()
+    write_dataset(season_data, "fpl_data", export_csv=True)
+    print(f"Keys for '{path}' have been added.")
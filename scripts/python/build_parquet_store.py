@@ -0,0 +1,8 @@
+from src.tools.storage import DATASETS, dataset_exists, import_csv_dataset
+
+# Convert the existing CSV outputs of every dataset to Parquet
+for name in DATASETS:
+    if not dataset_exists(name):
+        continue
+    import_csv_dataset(name)
+    print(f"Dataset '{name}' converted to Parquet.")
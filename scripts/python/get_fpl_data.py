@@ -1,3 +1,3 @@
 from src.data_prep.fpl_data import process_and_merge_season_data
 
-process_and_merge_season_data(2016, 2023)
+process_and_merge_season_data(2016, 2023, max_workers=8)
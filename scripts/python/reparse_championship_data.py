@@ -0,0 +1,5 @@
+from src.data_prep.championship_past_data import reparse_all_snapshots
+
+# Rebuild the goal and assist data from the archived pages, without scraping
+if __name__ == "__main__":
+    reparse_all_snapshots(metrics=("goals", "assists"))
@@ -0,0 +1,100 @@
+import time
+
+import pandas as pd
+
+from src.tools.schema import get_memory_usage
+from src.tools.storage import DATASETS, dataset_exists, read_dataset
+
+# Operations timed on the FPL data, called as `operation(df)`
+OPERATIONS = {
+    "groupby_season_position": lambda df: df.groupby(
+        ["season", "position"], observed=True
+    )["total_points"]
+    .mean()
+    .reset_index(),
+    "filter_position_team": lambda df: df[
+        (df["position"] == "MID") & (df["team"] == "Fulham")
+    ],
+    "filter_team_strength": lambda df: df[df["team_strength"] <= 3],
+}
+
+
+def is_identical(default, compact):
+    """Check that compact data holds the same values as data with default dtypes."""
+    if isinstance(default, pd.DataFrame):
+        return default.equals(compact.astype(default.dtypes.to_dict()))
+    return default.equals(compact.astype(default.dtype))
+
+
+def time_operation(operation, df, repeats=20):
+    """
+    Time the fastest of several runs of an operation.
+
+    Parameters
+    ----------
+    operation : callable
+        The operation, called as `operation(df)`.
+    df : pd.DataFrame
+        The data.
+    repeats : int, optional
+        The number of runs (default is 20).
+
+    Returns
+    -------
+    tuple of (float, object)
+        The fastest run time in seconds and the output of the last run.
+    """
+    best_time = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = operation(df)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+results = []
+for name in DATASETS:
+    if not dataset_exists(name):
+        continue
+    default_df = read_dataset(name, compact=False)
+    compact_df = read_dataset(name)
+    default_bytes = get_memory_usage(default_df)["bytes"].sum()
+    compact_bytes = get_memory_usage(compact_df)["bytes"].sum()
+    results.append(
+        {
+            "dataset": name,
+            "rows": len(compact_df),
+            "default_mb": round(default_bytes / 1e6, 3),
+            "compact_mb": round(compact_bytes / 1e6, 3),
+            "reduction": round(default_bytes / compact_bytes, 1),
+            "identical": is_identical(default_df, compact_df),
+        }
+    )
+
+results = pd.DataFrame(results)
+print(results.to_string(index=False))
+print(
+    f"\nAll datasets: {results['default_mb'].sum():.2f} MB with default dtypes, "
+    f"{results['compact_mb'].sum():.2f} MB compact."
+)
+
+print("\nLargest FPL data columns:")
+print(get_memory_usage(read_dataset("fpl_data")).head(10).to_string(index=False))
+
+default_df = read_dataset("fpl_data", compact=False)
+compact_df = read_dataset("fpl_data")
+timings = []
+for name, operation in OPERATIONS.items():
+    default_time, default_result = time_operation(operation, default_df)
+    compact_time, compact_result = time_operation(operation, compact_df)
+    timings.append(
+        {
+            "operation": name,
+            "default_ms": round(default_time * 1000, 3),
+            "compact_ms": round(compact_time * 1000, 3),
+            "speed_up": round(default_time / compact_time, 1),
+            "identical": is_identical(default_result, compact_result),
+        }
+    )
+print()
+print(pd.DataFrame(timings).to_string(index=False))
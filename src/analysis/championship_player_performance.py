@@ -1,12 +1,10 @@
 import pandas as pd
-from fuzzywuzzy import process, fuzz
+from rapidfuzz import fuzz
 
-from src.tools.yaml_loader import load_yaml_file
-
-
-# Load mapping of actual team names to the ones used in the promotion dictionary
-file_path = "conf/team_name_mapping.yaml"
-team_name_mapping = load_yaml_file(file_path)
+from src.analysis.player_resolution import resolve_players
+from src.data_prep.dimensions import get_team_dimension
+from src.tools.config import get_config
+from src.tools.storage import write_dataset
 
 
 def check_promoted_next_season(row, promoted_teams_by_season):
@@ -50,8 +48,9 @@ def process_promotions(df, promoted_teams_by_season):
     pandas.DataFrame
         The modified DataFrame with the new column indicating next season promotions.
     """
-    # Replace team names using the mapping
-    df["Team"] = df["Team"].replace(team_name_mapping)
+    # Replace team names using the mapping of actual team names to the ones used in
+    # the promotion dictionary
+    df["Team"] = df["Team"].astype(str).replace(get_config("team_name_mapping"))
 
     # Apply the function to create the new column
     df["promoted_next_season"] = df.apply(
@@ -108,48 +107,35 @@ def get_top_ranked_players(df, metric, top_n=25):
     return top_ranked
 
 
-from fuzzywuzzy import process, fuzz
-import pandas as pd
-
-
-def get_best_match(player_name, choices, scorer, threshold=70):
-    """
-    Get the best fuzzy match for a player name.
-
-    Parameters
-    ----------
-    player_name : str
-        The name of the player to match.
-    choices : list of str
-        A list of player names to match against.
-    scorer : callable
-        The scoring function from fuzzywuzzy to use for matching.
-    threshold : int, optional
-        The minimum score required for a match to be considered valid (default is 70).
-
-    Returns
-    -------
-    str or None
-        The best match if the score is above the threshold; otherwise, None.
-    """
-    match, score = process.extractOne(player_name, choices, scorer=scorer)
-    return match if score >= threshold else None
-
-
-def fuzzy_match_players(df, fpl_df, season, scorer):
+def fuzzy_match_players(
+    df, fpl_df, season, scorer, threshold=70, resolution_store=None, matches=None
+):
     """
     Fuzzy match players in the current season's goals DataFrame with FPL player names.
 
+    Each player is scored against the FPL names of their own team first, and only
+    against the whole season if none of those is a match. Players already in the
+    resolution store are not scored again. Each match carries the 'player_id' of the
+    FPL player it was made to, so FPL players sharing a name are kept apart.
+
     Parameters
     ----------
     df : pandas.DataFrame
         DataFrame containing player goals data with a 'next_season_start' column.
     fpl_df : pandas.DataFrame
-        DataFrame containing FPL data with a 'season_start' column.
+        DataFrame containing FPL data with 'season_start', 'player_id' and 'team_id'
+        columns.
     season : str
         The season to filter the DataFrames on.
     scorer : callable
-        The scoring function from fuzzywuzzy to use for matching.
+        The scoring function from rapidfuzz to use for matching.
+    threshold : int, optional
+        The minimum score required for a match to be considered valid (default is 70).
+    resolution_store : PlayerResolutionStore, optional
+        Store of previously resolved players to read and add to (default is None).
+    matches : pandas.DataFrame, optional
+        The 'fuzzy_match' and 'player_id' of every row of `df`, already resolved with
+        `resolve_players`. The season is resolved here if None (default is None).
 
     Returns
     -------
@@ -159,13 +145,24 @@ def fuzzy_match_players(df, fpl_df, season, scorer):
     # Filter df for the current season
     current_season_goals = df[df["next_season_start"] == season].copy()
 
-    # Get unique player names from fpl_df for the current season
+    # Get FPL data for the current season
     fpl_season_data = fpl_df[fpl_df["season_start"] == season]
-    fpl_player_names = fpl_season_data["name"].unique()
 
-    # Apply the fuzzy match function to the current season's goals DataFrame
-    current_season_goals["fuzzy_match"] = current_season_goals["Player"].apply(
-        get_best_match, choices=fpl_player_names, scorer=scorer
+    # Match the current season's players, blocked by team
+    if matches is None:
+        matches = resolve_players(
+            names=current_season_goals["Player"],
+            teams=current_season_goals["Team"],
+            seasons=current_season_goals["next_season_start"],
+            fpl_df=fpl_season_data,
+            scorer=scorer,
+            threshold=threshold,
+            resolution_store=resolution_store,
+        )
+    current_season_goals["fuzzy_match"] = matches["fuzzy_match"]
+    current_season_goals["player_id"] = matches["player_id"]
+    current_season_goals["team_id"] = get_team_dimension().get_ids(
+        current_season_goals["Team"], add=False
     )
 
     return current_season_goals, fpl_season_data
@@ -173,12 +170,14 @@ def fuzzy_match_players(df, fpl_df, season, scorer):
 
 def merge_dataframes(season_goals_df, fpl_season_data):
     """
-    Merge the fuzzy matched goals DataFrame with FPL data.
+    Merge the fuzzy matched goals DataFrame with FPL data on the integer player and
+    team keys.
 
     Parameters
     ----------
     season_goals_df : pandas.DataFrame
-        DataFrame containing the current season's goals with fuzzy matched player names.
+        DataFrame containing the current season's goals with fuzzy matched player names
+        and their 'player_id' and 'team_id'.
     fpl_season_data : pandas.DataFrame
         DataFrame containing FPL player data for the current season.
 
@@ -191,6 +190,8 @@ def merge_dataframes(season_goals_df, fpl_season_data):
         season_goals_df,
         fpl_season_data[
             [
+                "player_id",
+                "team_id",
                 "name",
                 "team",
                 "season_start",
@@ -203,8 +204,8 @@ def merge_dataframes(season_goals_df, fpl_season_data):
             ]
         ],
         how="left",
-        left_on=["fuzzy_match", "Team", "next_season_start"],
-        right_on=["name", "team", "season_start"],
+        left_on=["player_id", "team_id", "next_season_start"],
+        right_on=["player_id", "team_id", "season_start"],
     )
 
     # Drop the fuzzy_match column if you don't need it anymore
@@ -213,18 +214,30 @@ def merge_dataframes(season_goals_df, fpl_season_data):
     return merged_season
 
 
-def match_and_merge_with_fpl_data(df, fpl_df, scorer=process.fuzz.token_sort_ratio):
+def match_and_merge_with_fpl_data(
+    df, fpl_df, scorer=fuzz.token_sort_ratio, resolution_store=None, max_workers=None
+):
     """
     Process all unique seasons and return a concatenated DataFrame.
 
+    With `max_workers`, the players of every season are fuzzy matched up front, one
+    season per worker process, and the result is identical to matching the seasons
+    one after another.
+
     Parameters
     ----------
     df : pandas.DataFrame
         DataFrame containing player goals data with a 'next_season_start' column.
     fpl_df : pandas.DataFrame
         DataFrame containing FPL data with a 'season_start' column.
-    scorer : callable
-        The scoring function from fuzzywuzzy to use for matching.
+    scorer : callable, optional
+        The scoring function from rapidfuzz to use for matching (default is `fuzz.token_sort_ratio`).
+    resolution_store : PlayerResolutionStore, optional
+        Store of previously resolved players, shared between runs. New resolutions are
+        saved to it (default is None).
+    max_workers : int, optional
+        If given, match the seasons in parallel with at most this many worker
+        processes. If None, seasons are matched in this process (default is None).
 
     Returns
     -------
@@ -234,13 +247,33 @@ def match_and_merge_with_fpl_data(df, fpl_df, scorer=process.fuzz.token_sort_rat
     season_dfs = []
     unique_seasons = df["next_season_start"].unique()
 
+    matches = None
+    if max_workers is not None:
+        matches = resolve_players(
+            names=df["Player"],
+            teams=df["Team"],
+            seasons=df["next_season_start"],
+            fpl_df=fpl_df[fpl_df["season_start"].isin(unique_seasons)],
+            scorer=scorer,
+            resolution_store=resolution_store,
+            max_workers=max_workers,
+        )
+
     for season in unique_seasons:
         current_season_goals, fpl_season_data = fuzzy_match_players(
-            df, fpl_df, season, scorer
+            df,
+            fpl_df,
+            season,
+            scorer,
+            resolution_store=resolution_store,
+            matches=matches,
         )
         merged_season = merge_dataframes(current_season_goals, fpl_season_data)
         season_dfs.append(merged_season)
 
+    if resolution_store is not None:
+        resolution_store.save()
+
     # Concatenate all the season DataFrames into one
     return pd.concat(season_dfs, ignore_index=True)
 
@@ -375,7 +408,7 @@ def format_dataframe(df, metric, export_csv=False):
     df = remove_nulls(df, "FPL Points")
 
     # Concatenate 'Name' and 'Season' columns
-    df["Player (FPL Season)"] = df["Player"] + " (" + df["FPL Season"] + ")"
+    df["Player (FPL Season)"] = df["Player"] + " (" + df["FPL Season"].astype(str) + ")"
 
     df["Player (FPL Season) - Short"] = (
         df["Player"].apply(lambda x: " ".join(x.split(" ")[1:]))
@@ -387,8 +420,6 @@ def format_dataframe(df, metric, export_csv=False):
     )
 
     if export_csv:
-        df.to_csv(
-            f"data/analysis/{metric.lower()}_championship_fpl_points.csv", index=False
-        )
+        write_dataset(df, f"{metric.lower()}_championship_fpl_points", export_csv=True)
 
     return df
@@ -0,0 +1,242 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+# Trailing numeric suffix of raw FPL names, e.g. 'Danny_Ings_413'
+NUMERIC_SUFFIX_PATTERN = re.compile(r"\s\d+$")
+
+# Letters that are not accented forms of an ASCII letter, so are kept by NFKD
+LETTER_FOLDS = str.maketrans(
+    {
+        "ø": "o",
+        "Ø": "O",
+        "æ": "ae",
+        "Æ": "Ae",
+        "œ": "oe",
+        "Œ": "Oe",
+        "ł": "l",
+        "Ł": "L",
+        "đ": "d",
+        "Đ": "D",
+        "ð": "d",
+        "Ð": "D",
+        "þ": "th",
+        "Þ": "Th",
+        "ß": "ss",
+        "ı": "i",
+    }
+)
+
+
+def fold_accents(name):
+    """
+    Fold accented characters to their ASCII base, e.g. 'Mitrović' to 'Mitrovic'.
+
+    Letters such as 'ø' and 'æ', which do not decompose into a base letter and an
+    accent, are first replaced using `LETTER_FOLDS`, e.g. 'Ødegaard' to 'Odegaard'.
+
+    Parameters
+    ----------
+    name : str
+        The name to fold.
+
+    Returns
+    -------
+    str
+        The name without combining accents.
+    """
+    folded = unicodedata.normalize("NFKD", name.translate(LETTER_FOLDS))
+    return "".join(char for char in folded if not unicodedata.combining(char))
+
+
+def normalize_name(name):
+    """
+    Normalize a player name for indexing and lookup.
+
+    Underscores and the numeric suffixes of raw FPL names are removed, accents are
+    folded, punctuation is replaced with spaces, and the lowercased tokens are sorted
+    so that 'Sánchez, Alexis' and 'Alexis_Sanchez_12' normalize the same way.
+
+    Parameters
+    ----------
+    name : str
+        The name to normalize.
+
+    Returns
+    -------
+    str
+        The normalized name, e.g. 'alexis sanchez'.
+    """
+    name = NUMERIC_SUFFIX_PATTERN.sub("", name.replace("_", " "))
+    return " ".join(sorted(default_process(fold_accents(name)).split()))
+
+
+def get_trigrams(normalized_name):
+    """
+    Get the distinct character trigrams of a normalized name.
+
+    The name is padded with spaces so that short queries and the starts and ends of
+    names still produce trigrams.
+
+    Parameters
+    ----------
+    normalized_name : str
+        A name returned by `normalize_name`.
+
+    Returns
+    -------
+    set of str
+        The trigrams.
+    """
+    padded = f"  {normalized_name} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Trigram inverted index over player names for sub-linear fuzzy lookup.
+
+    Names are normalized once when the index is built. A query only reads the
+    posting lists of its own trigrams to rank the names sharing the most trigrams
+    with it, and the top candidates are re-ranked with a rapidfuzz scorer.
+
+    Parameters
+    ----------
+    records : pd.DataFrame
+        The records to index, e.g. one row per FPL player-season.
+    name_column : str, optional
+        The column holding the names (default is 'name').
+    """
+
+    def __init__(self, records, name_column="name"):
+        self.records = records.reset_index(drop=True)
+        self.names = self.records[name_column].to_numpy(dtype=object)
+
+        # Each distinct normalized name is indexed once, however many records have it
+        normalized = [normalize_name(name) for name in self.names]
+        self.keys, self.record_keys = np.unique(normalized, return_inverse=True)
+
+        postings = {}
+        for key_id, key in enumerate(self.keys):
+            for trigram in get_trigrams(key):
+                postings.setdefault(trigram, []).append(key_id)
+        self._postings = {
+            trigram: np.array(key_ids, dtype=np.int32)
+            for trigram, key_ids in postings.items()
+        }
+
+        # Records of each normalized name, sorted by key for slicing
+        self._record_order = np.argsort(self.record_keys, kind="stable")
+        self._key_starts = np.searchsorted(
+            self.record_keys[self._record_order], np.arange(len(self.keys) + 1)
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_candidates(self, normalized_query, max_candidates=100):
+        """
+        Get the normalized names sharing the most trigrams with a query.
+
+        Parameters
+        ----------
+        normalized_query : str
+            A name returned by `normalize_name`.
+        max_candidates : int, optional
+            The maximum number of candidates returned (default is 100).
+
+        Returns
+        -------
+        np.ndarray
+            The ids of the candidate normalized names.
+        """
+        posting_lists = [
+            self._postings[trigram]
+            for trigram in get_trigrams(normalized_query)
+            if trigram in self._postings
+        ]
+        if not posting_lists:
+            return np.array([], dtype=np.int32)
+
+        key_ids, shared = np.unique(np.concatenate(posting_lists), return_counts=True)
+        if len(key_ids) > max_candidates:
+            top = np.argpartition(-shared, max_candidates - 1)[:max_candidates]
+            key_ids = key_ids[top]
+        return key_ids
+
+    def search(
+        self,
+        query,
+        limit=10,
+        min_score=0,
+        scorer=fuzz.token_sort_ratio,
+        max_candidates=100,
+    ):
+        """
+        Find the records whose names best match a query.
+
+        Parameters
+        ----------
+        query : str
+            The name to look up, e.g. 'mitrovic'.
+        limit : int, optional
+            The maximum number of distinct names returned, with all of their records
+            (default is 10).
+        min_score : float, optional
+            The minimum score of a returned name (default is 0).
+        scorer : callable, optional
+            The rapidfuzz scorer used to re-rank candidates (default is `fuzz.token_sort_ratio`).
+        max_candidates : int, optional
+            The number of candidates taken from the index for re-ranking (default is 100).
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching records with a 'score' column, best match first.
+        """
+        normalized_query = normalize_name(query)
+        key_ids = self.get_candidates(normalized_query, max_candidates)
+        if not normalized_query or len(key_ids) == 0:
+            return self.records.iloc[:0].assign(score=pd.Series(dtype=float))
+
+        scores = process.cdist([normalized_query], self.keys[key_ids], scorer=scorer)[0]
+        ranked = np.lexsort((key_ids, -scores))[:limit]
+        ranked = ranked[scores[ranked] >= min_score]
+
+        positions = []
+        record_scores = []
+        for rank in ranked:
+            key_id = key_ids[rank]
+            start, end = self._key_starts[key_id], self._key_starts[key_id + 1]
+            positions.extend(self._record_order[start:end])
+            record_scores.extend([scores[rank]] * (end - start))
+
+        return self.records.iloc[positions].assign(score=record_scores)
+
+    def best_match(self, query, threshold=70, scorer=fuzz.token_sort_ratio):
+        """
+        Get the indexed name that best matches a query.
+
+        Parameters
+        ----------
+        query : str
+            The name to look up.
+        threshold : int, optional
+            The minimum score required for a match (default is 70).
+        scorer : callable, optional
+            The rapidfuzz scorer used to re-rank candidates (default is `fuzz.token_sort_ratio`).
+
+        Returns
+        -------
+        str or None
+            The original name of the best match if its score reaches the threshold;
+            otherwise, None.
+        """
+        matches = self.search(query, limit=1, min_score=threshold, scorer=scorer)
+        if matches.empty:
+            return None
+        return self.names[matches.index[0]]
@@ -0,0 +1,287 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+from src.analysis.name_index import fold_accents
+
+
+def normalize_name(name):
+    """
+    Normalize a name for scoring: fold accents to ASCII, lowercase it and replace
+    punctuation with spaces.
+
+    Parameters
+    ----------
+    name : str
+        The name to normalize, e.g. 'Bruno Écuélé Manga'.
+
+    Returns
+    -------
+    str
+        The normalized name, e.g. 'bruno ecuele manga'.
+    """
+    return default_process(fold_accents(name))
+
+
+def score_names(names, choices, scorer=fuzz.token_sort_ratio):
+    """
+    Find the best scoring choice for each name with one vectorized score matrix.
+
+    Parameters
+    ----------
+    names : array-like of str
+        The names to match.
+    choices : array-like of str
+        The candidate names, e.g. the FPL names of one team and season.
+    scorer : callable, optional
+        A rapidfuzz scorer (default is `fuzz.token_sort_ratio`).
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The position in `choices` of the best choice for each name and its score. The
+        first choice wins ties, as with `process.extractOne`.
+    """
+    scores = process.cdist(names, choices, scorer=scorer, processor=normalize_name)
+    best = scores.argmax(axis=1)
+    return best, scores[np.arange(len(best)), best]
+
+
+def build_candidates(fpl_df):
+    """
+    Index the FPL players to match against by (team, season) block and by season.
+
+    Parameters
+    ----------
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+
+    Returns
+    -------
+    tuple of (dict, dict)
+        The arrays of FPL names and their player ids for each (team, season start)
+        and for each season start.
+    """
+    fpl_names = fpl_df[["name", "team", "season_start", "player_id"]].drop_duplicates()
+    block_choices = {
+        key: (group["name"].to_numpy(dtype=object), group["player_id"].to_numpy())
+        for key, group in fpl_names.groupby(
+            ["team", "season_start"], sort=False, observed=True
+        )
+    }
+    season_choices = {}
+    for season, group in fpl_names.groupby("season_start", sort=False):
+        group = group.drop_duplicates(["name", "player_id"])
+        season_choices[season] = (
+            group["name"].to_numpy(dtype=object),
+            group["player_id"].to_numpy(),
+        )
+    return block_choices, season_choices
+
+
+def match_players(
+    names,
+    teams,
+    seasons,
+    fpl_df,
+    scorer=fuzz.token_sort_ratio,
+    threshold=70,
+    candidates=None,
+):
+    """
+    Match Championship player names to FPL names, blocking candidates by team and season.
+
+    Each name is first scored only against the FPL names of the same team and season.
+    Names with no candidate above the threshold in their block are scored against
+    every FPL name of the season instead.
+
+    Parameters
+    ----------
+    names : array-like of str
+        The Championship player names.
+    teams : array-like of str
+        The team of each player, using FPL team names.
+    seasons : array-like of int
+        The FPL season start year each player is matched in.
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+    scorer : callable, optional
+        A rapidfuzz scorer (default is `fuzz.token_sort_ratio`).
+    threshold : int, optional
+        The minimum score required for a match (default is 70).
+    candidates : tuple of (dict, dict), optional
+        The FPL players from `build_candidates`, if already built. `fpl_df` is not
+        used when this is given (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'fuzzy_match' name (None if no match is above the threshold), the
+        'player_id' of the matched FPL player and the 'match_score' for each player,
+        with the index of `names` if it is a Series.
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    names = np.asarray(names, dtype=object)
+    queries = pd.DataFrame(
+        {"team": np.asarray(teams, dtype=object), "season": np.asarray(seasons)}
+    )
+    matches = np.full(len(names), None, dtype=object)
+    player_ids = pd.array(np.full(len(names), pd.NA), dtype="Int64")
+    match_scores = np.zeros(len(names))
+
+    if candidates is None:
+        candidates = build_candidates(fpl_df)
+    block_choices, season_choices = candidates
+
+    # Row positions of the names in each (team, season) block
+    blocks = queries.groupby(["team", "season"], sort=False, dropna=False).indices
+
+    unmatched = []
+    for (team, season), positions in blocks.items():
+        choices = block_choices.get((team, season))
+        if choices is None:
+            unmatched.append(positions)
+            continue
+
+        choice_names, choice_ids = choices
+        best, scores = score_names(names[positions], choice_names, scorer=scorer)
+        found = scores >= threshold
+        matches[positions[found]] = choice_names[best[found]]
+        player_ids[positions[found]] = choice_ids[best[found]]
+        match_scores[positions] = scores
+        unmatched.append(positions[~found])
+
+    # Fall back to season-wide matching for names with no match in their block
+    if unmatched:
+        unmatched = np.concatenate(unmatched)
+        seasons_unmatched = queries["season"].to_numpy()[unmatched]
+        for season in pd.unique(seasons_unmatched):
+            choices = season_choices.get(season)
+            if choices is None:
+                continue
+
+            choice_names, choice_ids = choices
+            positions = unmatched[seasons_unmatched == season]
+            best, scores = score_names(names[positions], choice_names, scorer=scorer)
+            found = scores >= threshold
+            matches[positions[found]] = choice_names[best[found]]
+            player_ids[positions[found]] = choice_ids[best[found]]
+            match_scores[positions] = scores
+
+    return pd.DataFrame(
+        {"fuzzy_match": matches, "player_id": player_ids, "match_score": match_scores},
+        index=index,
+    )
+
+
+# FPL names of the worker process, built once by `init_match_worker`
+_worker_candidates = None
+
+
+def init_match_worker(fpl_names):
+    """
+    Build the FPL candidate names once in each worker process of `match_players_parallel`.
+
+    Parameters
+    ----------
+    fpl_names : pd.DataFrame
+        The distinct 'name', 'team', 'season_start' and 'player_id' rows of the FPL
+        data.
+    """
+    global _worker_candidates
+    _worker_candidates = build_candidates(fpl_names)
+
+
+def match_players_in_worker(names, teams, seasons, scorer, threshold):
+    """Match one shard of players against the worker's FPL names with `match_players`."""
+    return match_players(
+        names,
+        teams,
+        seasons,
+        fpl_df=None,
+        scorer=scorer,
+        threshold=threshold,
+        candidates=_worker_candidates,
+    )
+
+
+def match_players_parallel(
+    names,
+    teams,
+    seasons,
+    fpl_df,
+    scorer=fuzz.token_sort_ratio,
+    threshold=70,
+    max_workers=None,
+):
+    """
+    Match players like `match_players`, with each season in a worker process.
+
+    Every name is only scored against FPL names of its own season, so seasons are
+    independent and the result is identical to `match_players`. The FPL names are
+    sent to each worker once, when it starts, rather than with every season.
+
+    Parameters
+    ----------
+    names : array-like of str
+        The Championship player names.
+    teams : array-like of str
+        The team of each player, using FPL team names.
+    seasons : array-like of int
+        The FPL season start year each player is matched in.
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+    scorer : callable, optional
+        A rapidfuzz scorer (default is `fuzz.token_sort_ratio`).
+    threshold : int, optional
+        The minimum score required for a match (default is 70).
+    max_workers : int, optional
+        The maximum number of worker processes. Defaults to the number of CPUs if None
+        (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'fuzzy_match' name, 'player_id' and 'match_score' for each player, with
+        the index of `names` if it is a Series.
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    names = np.asarray(names, dtype=object)
+    teams = np.asarray(teams, dtype=object)
+    seasons = np.asarray(seasons)
+    matches = np.full(len(names), None, dtype=object)
+    player_ids = pd.array(np.full(len(names), pd.NA), dtype="Int64")
+    match_scores = np.zeros(len(names))
+
+    fpl_names = fpl_df[["name", "team", "season_start", "player_id"]].drop_duplicates()
+    shards = pd.Series(seasons).groupby(seasons, sort=False).indices
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_match_worker,
+        initargs=(fpl_names,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                match_players_in_worker,
+                names[positions],
+                teams[positions],
+                seasons[positions],
+                scorer,
+                threshold,
+            ): positions
+            for positions in shards.values()
+        }
+        for future, positions in futures.items():
+            matched = future.result()
+            matches[positions] = matched["fuzzy_match"].to_numpy()
+            player_ids[positions] = matched["player_id"].array
+            match_scores[positions] = matched["match_score"].to_numpy()
+
+    return pd.DataFrame(
+        {"fuzzy_match": matches, "player_id": player_ids, "match_score": match_scores},
+        index=index,
+    )
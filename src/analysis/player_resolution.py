@@ -0,0 +1,378 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.player_matching import match_players, match_players_parallel
+from src.tools.config import get_player_overrides
+
+RESOLUTION_PATH = "data/player_resolution/resolved_players.csv"
+
+RESOLUTION_COLUMNS = [
+    "player",
+    "team",
+    "season_start",
+    "fpl_name",
+    "player_id",
+    "score",
+    "scorer",
+    "threshold",
+    "fpl_fingerprint",
+]
+
+
+def get_scorer_name(scorer):
+    """Get the name a scorer is recorded under in the resolution store."""
+    return getattr(scorer, "__name__", repr(scorer))
+
+
+def get_resolution_key(player, team, season_start):
+    """Get the (Championship name, team, season start) key of a player resolution."""
+    return (player, team if isinstance(team, str) else "", int(season_start))
+
+
+def get_fpl_fingerprints(fpl_df):
+    """
+    Fingerprint the FPL players of each season that names are resolved against.
+
+    Parameters
+    ----------
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+
+    Returns
+    -------
+    dict
+        A hash of the (name, team, player id) rows of each season start, which changes
+        whenever the season's FPL data is rebuilt with different players or ids.
+    """
+    players = fpl_df[["name", "team", "season_start", "player_id"]].astype(
+        {"name": str, "team": str}
+    )
+    fingerprints = {}
+    for season, group in players.groupby("season_start"):
+        row_hashes = pd.util.hash_pandas_object(
+            group.drop(columns="season_start"), index=False
+        )
+        fingerprints[int(season)] = hashlib.sha1(
+            np.sort(row_hashes.to_numpy()).tobytes()
+        ).hexdigest()[:16]
+    return fingerprints
+
+
+def lookup_player_id(fpl_df, name, team, season_start):
+    """
+    Get the 'player_id' of an FPL player by name, preferring players in the given team.
+
+    Parameters
+    ----------
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+    name : str
+        The FPL name, or None.
+    team : str
+        The FPL team name.
+    season_start : int
+        The FPL season start year.
+
+    Returns
+    -------
+    int
+        The 'player_id' of the first FPL player with the name in the team and season,
+        or else in the season, or None if there is no such player.
+    """
+    season_players = fpl_df[
+        (fpl_df["season_start"] == season_start) & (fpl_df["name"] == name)
+    ]
+    for players in [season_players[season_players["team"] == team], season_players]:
+        if len(players):
+            return int(players["player_id"].iloc[0])
+    return None
+
+
+class PlayerResolutionStore:
+    """
+    Persistent store of Championship players resolved to FPL players.
+
+    Each entry maps a (Championship name, team, FPL season start) key to the matched
+    FPL name and player id, or to no match, along with the score, the scorer and
+    threshold that produced it and the fingerprint of the FPL data it was matched
+    against. Entries are only reused with the same scorer and threshold, and are
+    dropped once the season's FPL data changes. A store written before player ids and
+    fingerprints were recorded is not read.
+
+    Parameters
+    ----------
+    path : str, optional
+        The CSV file holding the resolutions (default is `RESOLUTION_PATH`).
+    """
+
+    def __init__(self, path=RESOLUTION_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._resolutions = self._load()
+        self._changed = False
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        df = pd.read_csv(
+            self.path,
+            keep_default_na=False,
+            na_values={"fpl_name": "", "player_id": ""},
+            dtype={"fpl_fingerprint": str},
+        )
+        if not {"player_id", "fpl_fingerprint"} <= set(df.columns):
+            return {}
+        return {
+            get_resolution_key(row.player, row.team, row.season_start): {
+                "fpl_name": None if pd.isna(row.fpl_name) else row.fpl_name,
+                "player_id": None if pd.isna(row.player_id) else int(row.player_id),
+                "score": row.score,
+                "scorer": row.scorer,
+                "threshold": row.threshold,
+                "fpl_fingerprint": row.fpl_fingerprint,
+            }
+            for row in df.itertuples(index=False)
+        }
+
+    def lookup(self, key, scorer_name, threshold, fpl_fingerprint):
+        """
+        Get a stored resolution made with the given scorer, threshold and FPL data.
+
+        Parameters
+        ----------
+        key : tuple
+            The key from `get_resolution_key`.
+        scorer_name : str
+            The name of the scorer, from `get_scorer_name`.
+        threshold : int
+            The minimum score for a match.
+        fpl_fingerprint : str
+            The fingerprint of the season's FPL data, from `get_fpl_fingerprints`.
+
+        Returns
+        -------
+        dict
+            The resolution's 'fpl_name' and 'player_id' (None for no match), 'score',
+            'scorer', 'threshold' and 'fpl_fingerprint', or None if the key has not
+            been resolved this way against the same FPL data.
+        """
+        with self._lock:
+            resolution = self._resolutions.get(key)
+        if resolution is None:
+            return None
+        if resolution["scorer"] != scorer_name or resolution["threshold"] != threshold:
+            return None
+        if resolution["fpl_fingerprint"] != fpl_fingerprint:
+            return None
+        return resolution
+
+    def add(
+        self, key, fpl_name, player_id, score, scorer_name, threshold, fpl_fingerprint
+    ):
+        """
+        Store a resolution, replacing any existing one for the key.
+
+        Parameters
+        ----------
+        key : tuple
+            The key from `get_resolution_key`.
+        fpl_name : str
+            The matched FPL name, or None if there is no match.
+        player_id : int
+            The 'player_id' of the matched FPL player, or None if there is no match.
+        score : float
+            The score of the best candidate.
+        scorer_name : str
+            The name of the scorer, from `get_scorer_name`.
+        threshold : int
+            The minimum score for a match.
+        fpl_fingerprint : str
+            The fingerprint of the season's FPL data, from `get_fpl_fingerprints`.
+        """
+        with self._lock:
+            self._resolutions[key] = {
+                "fpl_name": fpl_name,
+                "player_id": None if pd.isna(player_id) else int(player_id),
+                "score": round(float(score), 2),
+                "scorer": scorer_name,
+                "threshold": threshold,
+                "fpl_fingerprint": fpl_fingerprint,
+            }
+            self._changed = True
+
+    def save(self):
+        """Write the resolutions to the store's CSV file if any have been added."""
+        with self._lock:
+            if not self._changed:
+                return
+
+            df = pd.DataFrame(
+                [
+                    {
+                        "player": player,
+                        "team": team,
+                        "season_start": season_start,
+                        **resolution,
+                    }
+                    for (player, team, season_start), resolution in sorted(
+                        self._resolutions.items()
+                    )
+                ],
+                columns=RESOLUTION_COLUMNS,
+            )
+            df["player_id"] = df["player_id"].astype("Int64")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            df.to_csv(self.path, index=False, encoding="utf-8")
+            self._changed = False
+
+
+def resolve_players(
+    names,
+    teams,
+    seasons,
+    fpl_df,
+    scorer,
+    threshold=70,
+    resolution_store=None,
+    max_workers=None,
+):
+    """
+    Resolve Championship player names to FPL players, fuzzy matching only unseen names.
+
+    Confirmed manual overrides from `conf/player_resolution_overrides.yaml` are used
+    first, with the player id of the overriding FPL name, then resolutions
+    already in the store made against the same FPL data. The remaining names are fuzzy
+    matched with `match_players` and added to the store.
+
+    Parameters
+    ----------
+    names : array-like of str
+        The Championship player names.
+    teams : array-like of str
+        The team of each player, using FPL team names.
+    seasons : array-like of int
+        The FPL season start year each player is matched in.
+    fpl_df : pd.DataFrame
+        FPL data with 'name', 'team', 'season_start' and 'player_id' columns.
+    scorer : callable
+        A rapidfuzz scorer.
+    threshold : int, optional
+        The minimum score required for a match (default is 70).
+    resolution_store : PlayerResolutionStore, optional
+        The store to read and add resolutions to. Every name is fuzzy matched if None
+        (default is None).
+    max_workers : int, optional
+        If given, fuzzy match each season in a separate worker process, with at most
+        this many processes, using `match_players_parallel`. If None, names are
+        matched in this process (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'fuzzy_match' name and 'player_id' (missing if there is no match),
+        'match_score' and 'source' ('override', 'store' or 'matcher') of each player,
+        with the index of `names` if it is a Series.
+
+    Raises
+    ------
+    ValueError
+        If an override names an FPL player who is not in `fpl_df` for its season,
+        as the player would otherwise be dropped when merged on 'player_id'.
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    names = np.asarray(names, dtype=object)
+    teams = np.asarray(teams, dtype=object)
+    seasons = np.asarray(seasons)
+    scorer_name = get_scorer_name(scorer)
+    overrides = get_player_overrides()
+    fpl_fingerprints = get_fpl_fingerprints(fpl_df)
+
+    matches = np.full(len(names), None, dtype=object)
+    player_ids = np.full(len(names), None, dtype=object)
+    match_scores = np.zeros(len(names))
+    sources = np.full(len(names), "matcher", dtype=object)
+
+    keys = [
+        get_resolution_key(name, team, season)
+        for name, team, season in zip(names, teams, seasons)
+    ]
+    pending = []
+    for position, key in enumerate(keys):
+        if key in overrides:
+            fpl_name = overrides[key]
+            player_id = lookup_player_id(fpl_df, fpl_name, key[1], key[2])
+            if fpl_name is not None and player_id is None:
+                raise ValueError(
+                    f"The override of {key} names '{fpl_name}', who is not in the "
+                    "FPL data of that season."
+                )
+            matches[position] = fpl_name
+            player_ids[position] = player_id
+            match_scores[position] = 100.0
+            sources[position] = "override"
+            continue
+
+        resolution = None
+        if resolution_store is not None:
+            resolution = resolution_store.lookup(
+                key, scorer_name, threshold, fpl_fingerprints.get(key[2], "")
+            )
+        if resolution is not None:
+            matches[position] = resolution["fpl_name"]
+            player_ids[position] = resolution["player_id"]
+            match_scores[position] = resolution["score"]
+            sources[position] = "store"
+        else:
+            pending.append(position)
+
+    if pending:
+        pending = np.array(pending)
+        if max_workers is None:
+            matched = match_players(
+                names[pending],
+                teams[pending],
+                seasons[pending],
+                fpl_df,
+                scorer=scorer,
+                threshold=threshold,
+            )
+        else:
+            matched = match_players_parallel(
+                names[pending],
+                teams[pending],
+                seasons[pending],
+                fpl_df,
+                scorer=scorer,
+                threshold=threshold,
+                max_workers=max_workers,
+            )
+        matches[pending] = matched["fuzzy_match"].to_numpy()
+        player_ids[pending] = matched["player_id"].to_numpy(dtype=object, na_value=None)
+        match_scores[pending] = matched["match_score"].to_numpy()
+
+        if resolution_store is not None:
+            for position in pending:
+                resolution_store.add(
+                    keys[position],
+                    matches[position],
+                    player_ids[position],
+                    match_scores[position],
+                    scorer_name,
+                    threshold,
+                    fpl_fingerprints.get(keys[position][2], ""),
+                )
+
+    return pd.DataFrame(
+        {
+            "fuzzy_match": matches,
+            "player_id": pd.array(player_ids, dtype="Int64"),
+            "match_score": match_scores,
+            "source": sources,
+        },
+        index=index,
+    )
@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.stats_tests import (
+    get_moment_statistics,
+    mann_whitney_u_from_counts,
+    welch_ttest_grouped,
+)
+from src.tools.storage import (
+    apply_filters,
+    dataset_exists,
+    read_dataset,
+    write_dataset,
+)
+
+# Columns the players' points are summarised by
+STATISTICS_KEYS = [
+    "season",
+    "position",
+    "value_first_gw",
+    "promoted_from_championship",
+    "team_strength",
+]
+
+
+def summarise_points(df):
+    """
+    Summarise players' total points by season, position, value, promotion and team
+    strength.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The players, with the `STATISTICS_KEYS` and 'total_points' columns. Players
+        without a position or value, or not in either promotion group, are skipped,
+        as they are never tested.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame)
+        The 'count', 'points_sum' and 'points_sum_squares' of each key, and the
+        'count' of players with each 'total_points' of each key, sorted by points.
+    """
+    df = df[
+        df["position"].notna()
+        & df["value_first_gw"].notna()
+        & df["promoted_from_championship"].isin([0, 1])
+    ]
+
+    points_counts = (
+        df.groupby(STATISTICS_KEYS + ["total_points"], dropna=False, observed=True)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+
+    points = points_counts["total_points"]
+    statistics = (
+        points_counts.assign(
+            points_sum=points_counts["count"] * points,
+            points_sum_squares=points_counts["count"] * points**2,
+        )
+        .groupby(STATISTICS_KEYS, dropna=False, observed=True)[
+            ["count", "points_sum", "points_sum_squares"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    return statistics, points_counts
+
+
+def get_stored_seasons():
+    """Get the seasons already summarised in the statistics store."""
+    if not dataset_exists("test_statistics"):
+        return set()
+    stored = read_dataset("test_statistics", columns=["season"])
+    return set(stored["season"].astype(str))
+
+
+def update_statistics_store(df, seasons=None, export_csv=True):
+    """
+    Write the points summaries of new or given seasons to the statistics store.
+
+    The store is partitioned by season, and only the summarised seasons' partitions
+    are written, so adding a season only summarises that season's players. Seasons
+    already in the store are kept as they are unless passed in `seasons`, e.g. after
+    their players or the test filters have changed.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The players to summarise, filtered as for the tests.
+    seasons : list of str, optional
+        The seasons to summarise, replacing any stored summaries of them. If None,
+        only the seasons of `df` not yet in the store are summarised (default is
+        None).
+    export_csv : bool, optional
+        If True, also write the summaries as CSV (default is True).
+    """
+    if seasons is None:
+        stored_seasons = get_stored_seasons()
+        seasons = [
+            season
+            for season in df["season"].astype(str).unique()
+            if season not in stored_seasons
+        ]
+    if len(seasons) == 0:
+        print("Test statistics are up to date.")
+        return
+
+    statistics, points_counts = summarise_points(
+        df[df["season"].astype(str).isin(seasons)]
+    )
+    write_dataset(statistics, "test_statistics", export_csv=export_csv)
+    write_dataset(points_counts, "test_points_counts", export_csv=export_csv)
+    print(
+        f"Updated test statistics for {statistics['season'].nunique()} seasons "
+        f"({len(statistics)} summaries)."
+    )
+
+
+def get_statistics_filters(seasons=None, team_strength_threshold=5):
+    """Get the store filters selecting a subset of seasons and team strengths."""
+    filters = [("team_strength", "<=", team_strength_threshold)]
+    if seasons is not None:
+        filters.append(("season", "in", list(seasons)))
+    return filters
+
+
+def load_statistics(name, seasons=None, team_strength_threshold=5):
+    """
+    Read the summaries of a subset of seasons and team strengths from the store.
+
+    Parameters
+    ----------
+    name : str
+        'test_statistics' or 'test_points_counts'.
+    seasons : list of str, optional
+        The seasons to read, e.g. ['2022-23', '2023-24']. All seasons are read if
+        None (default is None).
+    team_strength_threshold : int, optional
+        The maximum 'team_strength' to read (default is 5).
+
+    Returns
+    -------
+    pd.DataFrame
+        The matching summaries.
+    """
+    return read_dataset(
+        name, filters=get_statistics_filters(seasons, team_strength_threshold)
+    )
+
+
+def tests_from_statistics(
+    seasons=None, team_strength_threshold=5, statistics=None, points_counts=None
+):
+    """
+    Perform Welch's t-tests and Mann-Whitney U tests from the statistics store.
+
+    The counts, sums and sums of squares of the selected seasons and team strengths
+    are merged for Welch's t-tests, and their points counts for the Mann-Whitney U
+    tests, so no player rows are read. Results match `perform_test_on_df` on the same
+    players, up to floating point rounding of the t-tests.
+
+    Parameters
+    ----------
+    seasons : list of str, optional
+        The seasons to test, e.g. ['2022-23', '2023-24']. All stored seasons are
+        tested if None (default is None).
+    team_strength_threshold : int, optional
+        The maximum value of 'team_strength' to include (default is 5).
+    statistics, points_counts : pd.DataFrame, optional
+        The whole 'test_statistics' and 'test_points_counts' datasets, if already
+        loaded, e.g. by the app. They are read from the store if None (default is
+        None).
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        The t-test and Mann-Whitney U test results, with the columns of
+        `loop_combinations`, sorted by position and value.
+    """
+    if statistics is None or points_counts is None:
+        statistics = load_statistics(
+            "test_statistics", seasons, team_strength_threshold
+        )
+        points_counts = load_statistics(
+            "test_points_counts", seasons, team_strength_threshold
+        )
+    else:
+        filters = get_statistics_filters(seasons, team_strength_threshold)
+        statistics = apply_filters(statistics, filters)
+        points_counts = apply_filters(points_counts, filters)
+
+    group_keys = ["position", "value_first_gw"]
+    group_ids, groups = pd.factorize(
+        pd.MultiIndex.from_frame(statistics[group_keys]), sort=True
+    )
+    n_groups = len(groups)
+    promoted = statistics["promoted_from_championship"].to_numpy()
+
+    # Merge the moments of each (group, sample) over seasons and strengths
+    bins = group_ids * 2 + promoted
+    sample_statistics = {}
+    for sample, in_sample in [("promoted", 1), ("not_promoted", 0)]:
+        sums = [
+            np.bincount(bins, statistics[column], 2 * n_groups)[in_sample::2]
+            for column in ["count", "points_sum", "points_sum_squares"]
+        ]
+        sample_statistics[sample] = get_moment_statistics(*sums)
+
+    # Merge the points counts into one run per (group, points), sorted by points
+    runs = (
+        points_counts.assign(
+            group=groups.get_indexer(
+                pd.MultiIndex.from_frame(points_counts[group_keys])
+            )
+        )
+        .pivot_table(
+            index=["group", "total_points"],
+            columns="promoted_from_championship",
+            values="count",
+            aggfunc="sum",
+            fill_value=0,
+        )
+        .reindex(columns=[0, 1], fill_value=0)
+    )
+    mwu_results = mann_whitney_u_from_counts(
+        runs.index.get_level_values("group").to_numpy(),
+        runs[1].to_numpy(),
+        runs[0].to_numpy(),
+        n_groups,
+    )
+
+    n1, mean1, _ = sample_statistics["promoted"]
+    n2, mean2, _ = sample_statistics["not_promoted"]
+    results = pd.DataFrame(
+        {
+            "sample_size_promoted": n1.astype(int),
+            "sample_size_not_promoted": n2.astype(int),
+            "average_score_promoted": mean1,
+            "average_score_not_promoted": mean2,
+        }
+    )
+    groups = groups.to_frame(index=False, name=group_keys)
+    tested = (n1 > 0) & (n2 > 0)
+
+    result_frames = []
+    for test_stat, p_value in [welch_ttest_grouped(sample_statistics), mwu_results]:
+        result_df = results.assign(test_stat=test_stat, p_value=p_value)
+        result_df = pd.concat([result_df, groups], axis=1)[tested]
+        result_frames.append(result_df.reset_index(drop=True))
+
+    return result_frames[0], result_frames[1]
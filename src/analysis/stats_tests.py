@@ -1,6 +1,11 @@
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from scipy import stats
+from scipy import special, stats
 
 
 def create_subset(df, team_strength_threshold=5):
@@ -43,7 +48,9 @@ def filter_data(df, position, value):
     return df[(df["position"] == position) & (df["value_first_gw"] == value)]
 
 
-def perform_test(filtered_df, test_type):
+def perform_test(
+    filtered_df, test_type, n_resamples=10000, confidence_level=0.95, seed=0
+):
     """
     Perform a t-test on the filtered DataFrame to compare total points of promoted vs non-promoted teams.
 
@@ -51,6 +58,17 @@ def perform_test(filtered_df, test_type):
     ----------
     filtered_df : pandas.DataFrame
         The filtered DataFrame on which to perform the t-test. Must contain 'promoted_from_championship' and 'total_points' columns.
+    test_type : str
+        't_test' for Welch's t-test, 'mwu' for the Mann-Whitney U test, or
+        'permutation' for a permutation test of the difference in means with a
+        bootstrap confidence interval (see `resample_group`).
+    n_resamples : int, optional
+        The number of permutations and bootstrap resamples of a 'permutation' test
+        (default is 10000).
+    confidence_level : float, optional
+        The confidence level of the bootstrap interval (default is 0.95).
+    seed : int or np.random.SeedSequence, optional
+        The seed of the resamples (default is 0).
 
     Returns
     -------
@@ -63,6 +81,8 @@ def perform_test(filtered_df, test_type):
         - 'average_score_not_promoted': Mean total points of non-promoted players.
         - 't_test': The t-statistic value.
         - 'p_value': The p-value of the t-test.
+        For 'permutation' tests, the test statistic is the difference in means, and
+        'ci_lower' and 'ci_upper' hold its bootstrap confidence interval.
     """
     group1 = filtered_df[filtered_df["promoted_from_championship"] == 1]["total_points"]
     group2 = filtered_df[filtered_df["promoted_from_championship"] == 0]["total_points"]
@@ -78,8 +98,16 @@ def perform_test(filtered_df, test_type):
             stat, p_value = stats.ttest_ind(group1, group2, equal_var=False)
         elif test_type == "mwu":
             stat, p_value = stats.mannwhitneyu(group1, group2)
+        elif test_type == "permutation":
+            stat, p_value, ci_lower, ci_upper = resample_group(
+                group1.to_numpy(dtype="float64"),
+                group2.to_numpy(dtype="float64"),
+                n_resamples,
+                confidence_level,
+                seed,
+            )
 
-        return {
+        result = {
             "sample_size_promoted": sample_size_promoted,
             "sample_size_not_promoted": sample_size_not_promoted,
             "average_score_promoted": avg_promoted,
@@ -87,13 +115,491 @@ def perform_test(filtered_df, test_type):
             "test_stat": stat,
             "p_value": p_value,
         }
+        if test_type == "permutation":
+            result.update({"ci_lower": ci_lower, "ci_upper": ci_upper})
+        return result
     else:
         return None
 
 
+def group_test_samples(df):
+    """
+    Sort the players once into contiguous (position, value_first_gw) groups.
+
+    Groups are numbered in the order `loop_combinations` has always produced them:
+    positions in order of appearance, then values in order of appearance. Within a
+    group, players are sorted by total points, so tied scores are adjacent.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame. Must include 'position', 'value_first_gw',
+        'promoted_from_championship' and 'total_points'.
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The 'position' and 'value_first_gw' of each group, and for the sorted players
+        their group number, whether they are promoted, their total points, and their
+        row position in `df`.
+    """
+    position_codes, positions = pd.factorize(df["position"])
+    value_codes, values = pd.factorize(df["value_first_gw"])
+    promoted = df["promoted_from_championship"].to_numpy()
+
+    # Players without a position or value, or not in either group, are not tested
+    valid = (position_codes >= 0) & (value_codes >= 0) & np.isin(promoted, [0, 1])
+    keys = position_codes[valid] * len(values) + value_codes[valid]
+    group_ids, group_keys = pd.factorize(keys, sort=True)
+
+    points = df["total_points"].to_numpy(dtype="float64")[valid]
+    order = np.lexsort((points, group_ids))
+
+    # Plain arrays, so results do not depend on the input dtypes (e.g. categoricals)
+    groups = pd.DataFrame(
+        {
+            "position": np.asarray(positions)[group_keys // len(values)],
+            "value_first_gw": np.asarray(values)[group_keys % len(values)],
+        }
+    )
+    rows = np.flatnonzero(valid)[order]
+    return groups, group_ids[order], promoted[valid][order] == 1, points[order], rows
+
+
+def get_sample_statistics(group_ids, promoted, points, n_groups):
+    """
+    Compute the size, mean and sample variance of both samples of every group.
+
+    Parameters
+    ----------
+    group_ids, promoted, points : np.ndarray
+        The sorted players from `group_test_samples`.
+    n_groups : int
+        The number of groups.
+
+    Returns
+    -------
+    dict
+        For each of 'promoted' and 'not_promoted', a (sizes, means, variances) tuple
+        of arrays with one entry per group. Variances use one degree of freedom.
+    """
+    sample_statistics = {}
+    for sample, in_sample in [("promoted", promoted), ("not_promoted", ~promoted)]:
+        sizes = np.bincount(group_ids[in_sample], minlength=n_groups)
+        sample_ids = group_ids[in_sample]
+        sample_points = points[in_sample]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.bincount(sample_ids, sample_points, n_groups) / sizes
+            squared_deviations = (sample_points - means[sample_ids]) ** 2
+            variances = np.bincount(sample_ids, squared_deviations, n_groups) / (
+                sizes - 1
+            )
+        sample_statistics[sample] = (sizes, means, variances)
+    return sample_statistics
+
+
+def get_moment_statistics(sizes, sums, squares):
+    """
+    Compute sample sizes, means and sample variances from counts, sums and sums of
+    squares.
+
+    For integer points, such as total points, the sums are exact and so are the
+    variances' numerators.
+
+    Parameters
+    ----------
+    sizes, sums, squares : np.ndarray
+        The number of players, and the sum and sum of squares of their points.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The (sizes, means, variances) of the samples, as from
+        `get_sample_statistics`. Variances use one degree of freedom.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / sizes
+        variances = np.maximum(sizes * squares - sums**2, 0) / (sizes * (sizes - 1))
+    return sizes, means, variances
+
+
+def welch_ttest_grouped(sample_statistics):
+    """
+    Welch's t-test of every group from its sample sizes, means and variances.
+
+    Matches `scipy.stats.ttest_ind(..., equal_var=False)` for each group.
+
+    Parameters
+    ----------
+    sample_statistics : dict
+        The sample statistics from `get_sample_statistics`.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The t-statistic and two-sided p-value of each group.
+    """
+    n1, mean1, var1 = sample_statistics["promoted"]
+    n2, mean2, var2 = sample_statistics["not_promoted"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se1 = var1 / n1
+        se2 = var2 / n2
+        t_stat = (mean1 - mean2) / np.sqrt(se1 + se2)
+        df = (se1 + se2) ** 2 / (se1**2 / (n1 - 1) + se2**2 / (n2 - 1))
+
+    # As in scipy, samples without variance get one degree of freedom
+    df = np.where(np.isnan(df), 1, df)
+    p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+    return t_stat, p_value
+
+
+@lru_cache(maxsize=None)
+def get_mann_whitney_u_sf(n1, n2):
+    """
+    Get the exact null distribution of the Mann-Whitney U statistic as P(U >= u).
+
+    The number of arrangements with each U is a coefficient of the Gaussian binomial
+    coefficient, built by multiplying by (1 - q^(n2 + i)) and dividing by (1 - q^i)
+    for i = 1..n1 with exact integer arithmetic.
+
+    Parameters
+    ----------
+    n1, n2 : int
+        The sample sizes.
+
+    Returns
+    -------
+    np.ndarray
+        P(U >= u) for u = 0..n1 * n2.
+    """
+    n1, n2 = min(n1, n2), max(n1, n2)
+    counts = [1] + [0] * (n1 * n2)
+    for i in range(1, n1 + 1):
+        for u in range(len(counts) - 1, n2 + i - 1, -1):
+            counts[u] -= counts[u - n2 - i]
+        for u in range(i, len(counts)):
+            counts[u] += counts[u - i]
+
+    total = sum(counts)
+    tail_counts = np.cumsum(np.array(counts[::-1], dtype=object))[::-1]
+    return np.array([count / total for count in tail_counts])
+
+
+def mann_whitney_u_grouped(group_ids, promoted, points, n_groups):
+    """
+    Two-sided Mann-Whitney U test of every group from one pass over sorted points.
+
+    Matches `scipy.stats.mannwhitneyu` with its defaults for each group: the exact
+    distribution is used when either sample has at most 8 players and there are no
+    ties, and otherwise the normal approximation with tie and continuity corrections.
+
+    Parameters
+    ----------
+    group_ids, promoted, points : np.ndarray
+        The sorted players from `group_test_samples`.
+    n_groups : int
+        The number of groups.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The U statistic of the promoted sample and the p-value of each group.
+    """
+    # Runs of tied points within a group share their average rank
+    new_run = np.ones(len(points), dtype=bool)
+    new_run[1:] = (group_ids[1:] != group_ids[:-1]) | (points[1:] != points[:-1])
+    run_ids = np.cumsum(new_run) - 1
+    n_runs = np.count_nonzero(new_run)
+    promoted_counts = np.bincount(run_ids, promoted, n_runs)
+    not_promoted_counts = np.bincount(run_ids, minlength=n_runs) - promoted_counts
+
+    return mann_whitney_u_from_counts(
+        group_ids[new_run], promoted_counts, not_promoted_counts, n_groups
+    )
+
+
+def mann_whitney_u_from_counts(
+    run_groups, promoted_counts, not_promoted_counts, n_groups
+):
+    """
+    Two-sided Mann-Whitney U test of every group from counts of tied points.
+
+    Each run is one distinct points value of a group, and its players share their
+    average rank, so only the number of players of each sample at each value is
+    needed. Matches `scipy.stats.mannwhitneyu` like `mann_whitney_u_grouped`.
+
+    Parameters
+    ----------
+    run_groups : np.ndarray
+        The group of each run, with runs sorted by group and then by points.
+    promoted_counts, not_promoted_counts : np.ndarray
+        The number of promoted and non-promoted players of each run.
+    n_groups : int
+        The number of groups.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The U statistic of the promoted sample and the p-value of each group.
+    """
+    run_lengths = promoted_counts + not_promoted_counts
+    run_ends = np.cumsum(run_lengths)
+    group_starts = np.append(0, run_ends)[
+        np.searchsorted(run_groups, np.arange(n_groups))
+    ]
+    run_ranks = (
+        run_ends - run_lengths - group_starts[run_groups] + (run_lengths + 1) / 2
+    )
+
+    n1 = np.bincount(run_groups, promoted_counts, n_groups)
+    n2 = np.bincount(run_groups, not_promoted_counts, n_groups)
+    u1 = (
+        np.bincount(run_groups, run_ranks * promoted_counts, n_groups)
+        - n1 * (n1 + 1) / 2
+    )
+    u = np.maximum(u1, n1 * n2 - u1)
+
+    tie_term = np.bincount(run_groups, run_lengths**3 - run_lengths, n_groups)
+    n = n1 + n2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (u - n1 * n2 / 2 - 0.5) / s
+    p_value = 2 * special.ndtr(-z)
+
+    has_ties = np.bincount(run_groups, run_lengths > 1, n_groups) > 0
+    exact = ((n1 <= 8) | (n2 <= 8)) & ~has_ties & (n1 > 0) & (n2 > 0)
+    for group in np.flatnonzero(exact):
+        sf = get_mann_whitney_u_sf(int(n1[group]), int(n2[group]))
+        p_value[group] = 2 * sf[int(u[group])]
+
+    return u1, np.clip(p_value, 0.0, 1.0)
+
+
+# Maximum number of resampled indices `resample_group` holds in memory at once
+RESAMPLE_CHUNK_ELEMENTS = 2**22
+
+
+def get_resample_chunks(n, n_resamples):
+    """
+    Split resamples of n items into chunks of at most `RESAMPLE_CHUNK_ELEMENTS` indices.
+
+    Parameters
+    ----------
+    n : int
+        The number of items in each resample.
+    n_resamples : int
+        The number of resamples.
+
+    Returns
+    -------
+    list of int
+        The number of resamples in each chunk.
+    """
+    chunk_size = max(RESAMPLE_CHUNK_ELEMENTS // max(n, 1), 1)
+    n_full, remainder = divmod(n_resamples, chunk_size)
+    return [chunk_size] * n_full + ([remainder] if remainder else [])
+
+
+def get_permutation_prefixes(n, k, n_resamples, rng):
+    """
+    Draw the first k positions of many random permutations of range(n) at once.
+
+    Runs the first k steps of a Fisher-Yates shuffle on every permutation together,
+    which is uniform over the ordered k-subsets and, for k well below n, much faster
+    than shuffling whole permutations.
+
+    Parameters
+    ----------
+    n : int
+        The number of items permuted.
+    k : int
+        The number of leading positions drawn.
+    n_resamples : int
+        The number of permutations.
+    rng : np.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    np.ndarray
+        A (k, n_resamples) matrix whose columns are the permutation prefixes.
+    """
+    # Position-major layout, so each step swaps whole rows of permutations
+    permutations = np.tile(np.arange(n, dtype=np.int32)[:, None], (1, n_resamples))
+    flat_permutations = permutations.reshape(-1)
+    columns = np.arange(n_resamples)
+    for position in range(k):
+        swaps = rng.integers(position, n, n_resamples) * n_resamples + columns
+        chosen = flat_permutations[swaps]
+        flat_permutations[swaps] = permutations[position]
+        permutations[position] = chosen
+    return permutations[:k]
+
+
+def resample_group(
+    promoted_points, not_promoted_points, n_resamples, confidence_level, seed
+):
+    """
+    Permutation test and bootstrap confidence interval of one group's difference in
+    mean points.
+
+    The permutations are drawn as matrices of indices into the pooled points, and the
+    bootstrap resamples as index matrices per sample, so each resampled mean is a
+    fancy-indexed reduction. Resamples are drawn in chunks from
+    `get_resample_chunks`, so memory is bounded whatever the group size, and only the
+    count of extreme permutations and the bootstrap differences are kept.
+
+    The results are Monte-Carlo estimates, so they match those of
+    `scipy.stats.permutation_test` and `scipy.stats.bootstrap` only up to resampling
+    error, which shrinks with the square root of `n_resamples`. At 10000 resamples,
+    p-values differ from scipy's by up to about 0.03 and interval bounds by up to
+    about 2 points on the FPL data (see `benchmark_resampling_tests.py`).
+
+    Parameters
+    ----------
+    promoted_points, not_promoted_points : np.ndarray
+        The total points of the promoted and non-promoted players.
+    n_resamples : int
+        The number of permutations, and of bootstrap resamples.
+    confidence_level : float
+        The confidence level of the bootstrap interval, e.g. 0.95.
+    seed : int or np.random.SeedSequence
+        The seed of the resamples.
+
+    Returns
+    -------
+    tuple of float
+        The observed difference in means (promoted minus not promoted), the two-sided
+        permutation p-value, and the lower and upper percentile bootstrap bounds of
+        the difference.
+    """
+    rng = np.random.default_rng(seed)
+    n1 = len(promoted_points)
+    pooled = np.concatenate([promoted_points, not_promoted_points])
+    n2 = len(pooled) - n1
+    total = pooled.sum()
+    observed = promoted_points.mean() - not_promoted_points.mean()
+
+    chunks = get_resample_chunks(len(pooled), n_resamples)
+
+    # As in `scipy.stats.permutation_test`, differences equal to the observed one up
+    # to rounding count as extreme, the observed arrangement counts as a permutation,
+    # and the two-sided p-value is twice the smaller one-sided p-value
+    tolerance = 1e-9 * max(abs(observed), 1)
+    count_greater = count_less = 1
+
+    # Only the smaller sample is drawn, and the other gets the remaining points
+    sample_size = min(n1, n2)
+    for chunk in chunks:
+        sample_sums = pooled[
+            get_permutation_prefixes(len(pooled), sample_size, chunk, rng)
+        ].sum(axis=0)
+        promoted_sums = sample_sums if n1 <= n2 else total - sample_sums
+        differences = promoted_sums / n1 - (total - promoted_sums) / n2
+        count_greater += np.count_nonzero(differences >= observed - tolerance)
+        count_less += np.count_nonzero(differences <= observed + tolerance)
+    p_value = min(2 * min(count_greater, count_less) / (n_resamples + 1), 1.0)
+
+    bootstrap_differences = []
+    for chunk in chunks:
+        promoted_means = promoted_points[rng.integers(0, n1, (chunk, n1))].mean(axis=1)
+        not_promoted_means = not_promoted_points[rng.integers(0, n2, (chunk, n2))].mean(
+            axis=1
+        )
+        bootstrap_differences.append(promoted_means - not_promoted_means)
+    alpha = 1 - confidence_level
+    ci_lower, ci_upper = np.quantile(
+        np.concatenate(bootstrap_differences), [alpha / 2, 1 - alpha / 2]
+    )
+
+    return observed, p_value, ci_lower, ci_upper
+
+
+def resampling_tests_grouped(
+    group_ids,
+    promoted,
+    points,
+    n_groups,
+    n_resamples=10000,
+    confidence_level=0.95,
+    seed=0,
+    max_workers=None,
+):
+    """
+    Permutation tests and bootstrap intervals of every group with `resample_group`.
+
+    Each group gets its own random stream spawned from `seed`, so results do not
+    depend on the number of workers or on which groups are tested together.
+
+    Parameters
+    ----------
+    group_ids, promoted, points : np.ndarray
+        The sorted players from `group_test_samples`.
+    n_groups : int
+        The number of groups.
+    n_resamples : int, optional
+        The number of permutations and bootstrap resamples per group (default is
+        10000).
+    confidence_level : float, optional
+        The confidence level of the bootstrap intervals (default is 0.95).
+    seed : int, optional
+        The seed the groups' random streams are spawned from (default is 0).
+    max_workers : int, optional
+        The number of worker processes the groups are split across. Groups are
+        resampled in this process if None (default is None).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The difference in means, p-value, and lower and upper bootstrap bounds of
+        each group, NaN for groups without both samples.
+    """
+    group_bounds = np.searchsorted(group_ids, np.arange(n_groups + 1))
+    group_seeds = np.random.SeedSequence(seed).spawn(n_groups)
+
+    tested_groups = []
+    tasks = []
+    for group in range(n_groups):
+        start, end = group_bounds[group], group_bounds[group + 1]
+        group_points = points[start:end]
+        group_promoted = promoted[start:end]
+        if group_promoted.all() or not group_promoted.any():
+            continue
+        tested_groups.append(group)
+        tasks.append((group_points[group_promoted], group_points[~group_promoted]))
+
+    results = np.full((4, n_groups), np.nan)
+    arguments = (
+        [promoted_points for promoted_points, _ in tasks],
+        [not_promoted_points for _, not_promoted_points in tasks],
+        [n_resamples] * len(tasks),
+        [confidence_level] * len(tasks),
+        [group_seeds[group] for group in tested_groups],
+    )
+    if max_workers is None:
+        group_results = list(map(resample_group, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunksize = max(1, len(tasks) // (4 * max_workers))
+            group_results = list(
+                executor.map(resample_group, *arguments, chunksize=chunksize)
+            )
+
+    if group_results:
+        results[:, tested_groups] = np.array(group_results).T
+    return tuple(results)
+
+
 def loop_combinations(df):
     """
-    Loop through unique combinations of position and value_first_gw and perform t-tests.
+    Perform Welch's t-tests and Mann-Whitney U tests for every combination of position
+    and value_first_gw.
+
+    Players are grouped once, and both tests are computed for all groups together from
+    grouped NumPy arrays rather than by filtering the DataFrame for each combination.
+    Combinations without both promoted and non-promoted players are skipped.
 
     Parameters
     ----------
@@ -102,30 +608,101 @@ def loop_combinations(df):
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing t-test results and statistics for each position and value combination.
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        The t-test and Mann-Whitney U test results and statistics for each position and
+        value combination.
     """
-    results_t = []
-    results_mwu = []
+    groups, group_ids, promoted, points, _ = group_test_samples(df)
+    n_groups = len(groups)
 
-    unique_positions = df["position"].unique()
-    unique_values = df["value_first_gw"].unique()
+    sample_statistics = get_sample_statistics(group_ids, promoted, points, n_groups)
+    n1, mean1, _ = sample_statistics["promoted"]
+    n2, mean2, _ = sample_statistics["not_promoted"]
 
-    for position in unique_positions:
-        for value in unique_values:
-            filtered_df = filter_data(df, position, value)
-            result_t = perform_test(filtered_df, test_type="t_test")
-            result_mwu = perform_test(filtered_df, test_type="mwu")
+    results = pd.DataFrame(
+        {
+            "sample_size_promoted": n1,
+            "sample_size_not_promoted": n2,
+            "average_score_promoted": mean1,
+            "average_score_not_promoted": mean2,
+        }
+    )
+    tested = (n1 > 0) & (n2 > 0)
 
-            if result_t:  # Only append if there is valid t-test data
-                result_t.update({"position": position, "value_first_gw": value})
-                results_t.append(result_t)
+    result_frames = []
+    for test_stat, p_value in [
+        welch_ttest_grouped(sample_statistics),
+        mann_whitney_u_grouped(group_ids, promoted, points, n_groups),
+    ]:
+        result_df = results.assign(test_stat=test_stat, p_value=p_value)
+        result_df = pd.concat([result_df, groups], axis=1)[tested]
+        result_frames.append(result_df.reset_index(drop=True))
 
-            if result_mwu:  # Only append if there is valid t-test data
-                result_mwu.update({"position": position, "value_first_gw": value})
-                results_mwu.append(result_mwu)
+    return result_frames[0], result_frames[1]
 
-    return pd.DataFrame(results_t), pd.DataFrame(results_mwu)
+
+def loop_combinations_resampling(
+    df, n_resamples=10000, confidence_level=0.95, seed=0, max_workers=None
+):
+    """
+    Perform permutation tests of the difference in mean points, with bootstrap
+    confidence intervals, for every combination of position and value_first_gw.
+
+    Unlike `loop_combinations`, the tests make no assumption about the shape of the
+    points distributions, which are skewed by a few high scorers.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame containing the data. Must include 'position', 'value_first_gw', and 'promoted_from_championship'.
+    n_resamples : int, optional
+        The number of permutations and bootstrap resamples per combination (default
+        is 10000).
+    confidence_level : float, optional
+        The confidence level of the bootstrap intervals (default is 0.95).
+    seed : int, optional
+        The seed of the resamples (default is 0).
+    max_workers : int, optional
+        The number of worker processes. Combinations are resampled in this process if
+        None (default is None).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The columns of `loop_combinations`, with the difference in means as
+        'test_stat', plus the 'ci_lower' and 'ci_upper' bootstrap bounds.
+    """
+    groups, group_ids, promoted, points, _ = group_test_samples(df)
+    n_groups = len(groups)
+
+    sample_statistics = get_sample_statistics(group_ids, promoted, points, n_groups)
+    n1, mean1, _ = sample_statistics["promoted"]
+    n2, mean2, _ = sample_statistics["not_promoted"]
+    test_stat, p_value, ci_lower, ci_upper = resampling_tests_grouped(
+        group_ids,
+        promoted,
+        points,
+        n_groups,
+        n_resamples=n_resamples,
+        confidence_level=confidence_level,
+        seed=seed,
+        max_workers=max_workers,
+    )
+
+    result_df = pd.DataFrame(
+        {
+            "sample_size_promoted": n1,
+            "sample_size_not_promoted": n2,
+            "average_score_promoted": mean1,
+            "average_score_not_promoted": mean2,
+            "test_stat": test_stat,
+            "p_value": p_value,
+            "ci_lower": ci_lower,
+            "ci_upper": ci_upper,
+        }
+    )
+    result_df = pd.concat([result_df, groups], axis=1)[(n1 > 0) & (n2 > 0)]
+    return result_df.reset_index(drop=True)
 
 
 def perform_test_on_df(df, team_strength_threshold=5):
@@ -148,8 +725,240 @@ def perform_test_on_df(df, team_strength_threshold=5):
     return loop_combinations(df_subset)
 
 
+def perform_resampling_test_on_df(df, team_strength_threshold=5, **kwargs):
+    """
+    Perform permutation tests on the subset of the DataFrame based on team strength
+    threshold.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame containing the data.
+    team_strength_threshold : int, optional
+        The maximum value of 'team_strength' to include in the subset (default is 5).
+    **kwargs
+        Options passed to `loop_combinations_resampling`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Permutation test results for each position and value combination within the
+        subset.
+    """
+    df_subset = create_subset(df, team_strength_threshold)
+    return loop_combinations_resampling(df_subset, **kwargs)
+
+
+# Sweep results by (data fingerprint, strength thresholds, sample size thresholds)
+_sweep_cache = {}
+_sweep_cache_lock = threading.Lock()
+
+SWEEP_TEST_NAMES = ["welchs_ttest", "mw_u_test"]
+
+
+def get_test_data_fingerprint(df):
+    """
+    Fingerprint the columns the hypothesis tests read.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame.
+
+    Returns
+    -------
+    str
+        A hash of the 'position', 'value_first_gw', 'promoted_from_championship',
+        'total_points' and 'team_strength' values, in row order.
+    """
+    columns = [
+        "position",
+        "value_first_gw",
+        "promoted_from_championship",
+        "total_points",
+        "team_strength",
+    ]
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashlib.sha1(row_hashes.to_numpy().tobytes()).hexdigest()
+
+
+def get_cumulative_sample_statistics(
+    group_ids, promoted, points, levels, n_levels, n_groups
+):
+    """
+    Compute the sample statistics of every group for every prefix of strength levels.
+
+    Counts, sums and sums of squares are accumulated once per (level, sample, group)
+    and summed cumulatively over levels, so the subset at each threshold costs one
+    array slice rather than a pass over the players.
+
+    Parameters
+    ----------
+    group_ids, promoted, points : np.ndarray
+        The sorted players from `group_test_samples`.
+    levels : np.ndarray
+        The strength level of each player, i.e. the position of the smallest
+        threshold the player is included at.
+    n_levels : int
+        The number of strength levels.
+    n_groups : int
+        The number of groups.
+
+    Returns
+    -------
+    dict
+        The sample statistics as from `get_sample_statistics`, with arrays of shape
+        (n_levels, n_groups).
+    """
+    bins = (levels * 2 + promoted) * n_groups + group_ids
+    shape = (n_levels, 2, n_groups)
+    n_bins = n_levels * 2 * n_groups
+    sizes = np.bincount(bins, minlength=n_bins).reshape(shape).cumsum(axis=0)
+    sums = np.bincount(bins, points, n_bins).reshape(shape).cumsum(axis=0)
+    squares = np.bincount(bins, points**2, n_bins).reshape(shape).cumsum(axis=0)
+
+    # Index 1 is the promoted sample, as `promoted` is True
+    return {
+        sample: get_moment_statistics(
+            sizes[:, index], sums[:, index], squares[:, index]
+        )
+        for sample, index in [("promoted", 1), ("not_promoted", 0)]
+    }
+
+
+def sweep_thresholds(
+    df, team_strength_thresholds=(1, 2, 3, 4, 5), sample_size_thresholds=(20,)
+):
+    """
+    Perform both tests for a grid of team strength and sample size thresholds.
+
+    The subset at a team strength threshold is the players of every strength level up
+    to it, so players are grouped and sorted once: Welch's t-tests come from the
+    cumulative per-level statistics, and the Mann-Whitney U tests of each threshold
+    from one masked pass over the already sorted points. Sample size thresholds only
+    filter the results. The whole grid costs little more than `perform_test_on_df`,
+    and results are cached by a fingerprint of the data.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The input DataFrame. Must include 'team_strength' as well as the columns used
+        by `loop_combinations`.
+    team_strength_thresholds : iterable of int, optional
+        The maximum values of 'team_strength' to test at (default is 1 to 5).
+    sample_size_thresholds : iterable of int, optional
+        The minimum combined sample sizes to keep results at (default is 20).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per threshold pair, test and (position, value_first_gw) combination,
+        with the columns of `loop_combinations` plus 'team_strength_threshold',
+        'sample_size_threshold', 'test' ('welchs_ttest' or 'mw_u_test'), 'difference'
+        and 'statistically_significant'. Each (thresholds, test) slice passed to
+        `format_result` gives the same table as `perform_test_on_df` at those
+        thresholds.
+    """
+    team_strength_thresholds = sorted(set(team_strength_thresholds))
+    sample_size_thresholds = sorted(set(sample_size_thresholds))
+    cache_key = (
+        get_test_data_fingerprint(df),
+        tuple(team_strength_thresholds),
+        tuple(sample_size_thresholds),
+    )
+    with _sweep_cache_lock:
+        if cache_key in _sweep_cache:
+            return _sweep_cache[cache_key].copy()
+
+    groups, group_ids, promoted, points, rows = group_test_samples(df)
+    n_groups = len(groups)
+    n_levels = len(team_strength_thresholds)
+
+    # Players above the largest threshold, or without a strength, get level n_levels
+    strengths = df["team_strength"].to_numpy(dtype="float64")[rows]
+    levels = np.searchsorted(team_strength_thresholds, strengths, side="left")
+    levels[np.isnan(strengths)] = n_levels
+    included = levels < n_levels
+
+    level_statistics = get_cumulative_sample_statistics(
+        group_ids[included],
+        promoted[included],
+        points[included],
+        levels[included],
+        n_levels,
+        n_groups,
+    )
+
+    # Both tests of every group at every level, as (level, test, group) arrays
+    test_stats = np.empty((n_levels, len(SWEEP_TEST_NAMES), n_groups))
+    p_values = np.empty_like(test_stats)
+    test_stats[:, 0], p_values[:, 0] = welch_ttest_grouped(level_statistics)
+    for level in range(n_levels):
+        in_subset = levels <= level
+        test_stats[level, 1], p_values[level, 1] = mann_whitney_u_grouped(
+            group_ids[in_subset], promoted[in_subset], points[in_subset], n_groups
+        )
+
+    # Keep the tested groups with enough players, in (level, sample size threshold,
+    # test, group) order
+    n1, mean1, _ = level_statistics["promoted"]
+    n2, mean2, _ = level_statistics["not_promoted"]
+    tested = (n1 > 0) & (n2 > 0)
+    large_enough = (n1 + n2)[:, None, :] >= np.array(sample_size_thresholds)[:, None]
+    keep = np.broadcast_to(
+        (tested[:, None, :] & large_enough)[:, :, None, :],
+        (n_levels, len(sample_size_thresholds), len(SWEEP_TEST_NAMES), n_groups),
+    )
+    level_index, threshold_index, test_index, group_index = np.nonzero(keep)
+
+    sweep_df = pd.DataFrame(
+        {
+            "team_strength_threshold": np.array(team_strength_thresholds)[level_index],
+            "sample_size_threshold": np.array(sample_size_thresholds)[threshold_index],
+            "test": np.array(SWEEP_TEST_NAMES)[test_index],
+            "position": groups["position"].to_numpy()[group_index],
+            "value_first_gw": groups["value_first_gw"].to_numpy()[group_index],
+            "sample_size_promoted": n1[level_index, group_index],
+            "sample_size_not_promoted": n2[level_index, group_index],
+            "average_score_promoted": mean1[level_index, group_index],
+            "average_score_not_promoted": mean2[level_index, group_index],
+            "test_stat": test_stats[level_index, test_index, group_index],
+            "p_value": p_values[level_index, test_index, group_index],
+        }
+    )
+    sweep_df = add_statistical_columns(sweep_df)
+    sweep_df = sweep_df[
+        [
+            "team_strength_threshold",
+            "sample_size_threshold",
+            "test",
+            "position",
+            "value_first_gw",
+            "sample_size_promoted",
+            "sample_size_not_promoted",
+            "average_score_promoted",
+            "average_score_not_promoted",
+            "difference",
+            "test_stat",
+            "p_value",
+            "statistically_significant",
+        ]
+    ]
+
+    with _sweep_cache_lock:
+        _sweep_cache[cache_key] = sweep_df
+    return sweep_df.copy()
+
+
+def clear_sweep_cache():
+    """Drop all cached `sweep_thresholds` results."""
+    with _sweep_cache_lock:
+        _sweep_cache.clear()
+
+
 import pandas as pd
 import numpy as np
+from src.tools.storage import write_dataset
 
 
 def filter_by_sample_size(result_df, sample_size_threshold):
@@ -223,6 +1032,10 @@ def reorder_columns(result_df):
         "test_stat",
         "p_value",
     ]
+    # Resampling results also have a confidence interval of the difference
+    column_order += [
+        column for column in ["ci_lower", "ci_upper"] if column in result_df
+    ]
     return result_df[column_order]
 
 
@@ -268,6 +1081,9 @@ def round_columns(result_df):
     result_df["difference"] = result_df["difference"].round(1)
     result_df["p_value"] = result_df["p_value"].round(3)
     result_df["test_stat"] = result_df["test_stat"].round(2)
+    for column in ["ci_lower", "ci_upper"]:
+        if column in result_df:
+            result_df[column] = result_df[column].round(1)
     return result_df
 
 
@@ -296,6 +1112,8 @@ def rename_columns(result_df):
         "sample_size_not_promoted": "Num. Players Not Promoted",
         "test_stat": "Test Statistic",
         "p_value": "P-Value",
+        "ci_lower": "CI Lower",
+        "ci_upper": "CI Upper",
     }
     return result_df.rename(columns=column_rename_dict)
 
@@ -324,7 +1142,7 @@ def format_result(result_df, sample_size_threshold=20, export_csv=False, file_na
     result_df = rename_columns(result_df)
 
     if export_csv:
-        # Save to CSV
-        result_df.to_csv(f"data/analysis/{file_name}.csv", index=False)
+        # Save as Parquet and CSV
+        write_dataset(result_df, file_name, export_csv=True)
 
     return result_df
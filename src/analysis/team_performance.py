@@ -1,4 +1,6 @@
 import pandas as pd
+from src.tools.http_cache import read_csv_from_url
+from src.tools.storage import write_dataset
 
 
 def load_fpl_data(season, base_url):
@@ -18,7 +20,7 @@ def load_fpl_data(season, base_url):
         A DataFrame containing the data for the specified season.
     """
     csv_url = f"{base_url}{season}.csv"
-    df = pd.read_csv(csv_url)
+    df = read_csv_from_url(csv_url)
     df["season"] = season
     return df
 
@@ -136,8 +138,6 @@ def load_and_process_fpl_data(
     combined_df = process_fpl_data(combined_df, promoted_teams_by_season)
 
     if export_csv:
-        combined_df.to_csv(
-            f"data/analysis/team_performance_fpl_points.csv", index=False
-        )
+        write_dataset(combined_df, "team_performance_fpl_points", export_csv=True)
 
     return combined_df
@@ -1,67 +1,200 @@
 import requests
 from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 import pandas as pd
-import time
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
+from src.tools.scraper import HostRateLimiter, create_session, fetch_with_retry
+from src.tools.snapshot_archive import get_snapshot_archive, read_snapshot_text
+from src.tools.storage import write_dataset
 
-def fetch_html(url):
+# First table with the 'standard_tabelle' class, which holds the player rankings
+STANDARD_TABLE_XPATH = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' standard_tabelle ')]"
+)
+
+# Shared pooled session, so pages fetched one at a time still reuse connections
+_session = create_session()
+
+# Shared rate limiters by minimum time between requests, so separate calls to
+# `get_season_data` are spaced out as well
+_rate_limiters = {}
+
+
+def get_rate_limiter(sleep_time):
     """
-    Fetches the HTML content from the given URL.
+    Get the shared per-host rate limiter allowing one request every `sleep_time` seconds.
+
+    Parameters
+    ----------
+    sleep_time : float
+        Minimum average time between requests to the same host, in seconds.
+
+    Returns
+    -------
+    HostRateLimiter
+        The rate limiter.
+    """
+    if sleep_time not in _rate_limiters:
+        _rate_limiters[sleep_time] = HostRateLimiter(rate=1 / sleep_time)
+    return _rate_limiters[sleep_time]
+
+
+def fetch_page(url, session=None, rate_limiter=None):
+    """
+    Fetches the given URL, retrying transient failures.
 
     Parameters
     ----------
     url : str
         The URL of the webpage to fetch.
+    session : requests.Session, optional
+        The pooled session used for the request. The module session is used if None (default is None).
+    rate_limiter : HostRateLimiter, optional
+        Limiter that spaces out requests to the same host (default is None).
 
     Returns
     -------
-    str
-        The HTML content of the webpage. Returns None if the request fails.
+    requests.Response
+        The response. Returns None if the request fails.
     """
+    if session is None:
+        session = _session
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
+        return fetch_with_retry(session, url, rate_limiter=rate_limiter)
     except requests.RequestException as e:
         print(f"Error fetching URL {url}: {e}")
         return None
 
 
-def parse_table(html, headers, columns_to_clean=None):
+def fetch_html(url, session=None, rate_limiter=None):
     """
-    General function to parse HTML table content and return it as a DataFrame.
+    Fetches the HTML content from the given URL, retrying transient failures.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the webpage to fetch.
+    session : requests.Session, optional
+        The pooled session used for the request. The module session is used if None (default is None).
+    rate_limiter : HostRateLimiter, optional
+        Limiter that spaces out requests to the same host (default is None).
+
+    Returns
+    -------
+    str
+        The HTML content of the webpage. Returns None if the request fails.
+    """
+    response = fetch_page(url, session=session, rate_limiter=rate_limiter)
+    if response is None:
+        return None
+    return response.text
+
+
+def extract_table_rows_html_parser(html):
+    """
+    Extracts the cell text of the 'standard_tabelle' rows with BeautifulSoup's html.parser.
 
     Parameters
     ----------
     html : str
         The HTML content of the webpage.
-    headers : list
-        List of column headers for the table.
-    columns_to_clean : dict, optional
-        Dictionary where the key is the column name and the value is a function to clean the column (default is None).
 
     Returns
     -------
-    pd.DataFrame
-        A DataFrame containing the table data. Returns an empty DataFrame if no table is found.
+    list of list of str
+        The text of each cell, row by row, excluding the header row. Returns None if no table is found.
     """
     soup = BeautifulSoup(html, "html.parser")
     table = soup.find("table", {"class": "standard_tabelle"})
 
     if not table:
-        print("Table not found on the page.")
-        return pd.DataFrame()
+        return None
 
     # Extract table rows
     rows = table.find_all("tr")[1:]  # Skip the header row
 
-    # Prepare data for the DataFrame
     data = []
     for row in rows:
         columns = row.find_all("td")
         processed_columns = [col.text.strip().split("\n")[-1] for col in columns]
         data.append(processed_columns)
+    return data
+
+
+def extract_table_rows_lxml(html):
+    """
+    Extracts the cell text of the 'standard_tabelle' rows with lxml and XPath.
+
+    Only the first matching table is walked, and the rest of the page is never turned
+    into Python objects, which makes this much faster than `extract_table_rows_html_parser`.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content of the webpage.
+
+    Returns
+    -------
+    list of list of str
+        The text of each cell, row by row, excluding the header row. Returns None if no table is found.
+    """
+    try:
+        document = lxml.html.document_fromstring(html)
+    except lxml.etree.ParserError:
+        return None
+
+    tables = document.xpath(STANDARD_TABLE_XPATH)
+    if not tables:
+        return None
+
+    # Skip the header row
+    rows = tables[0].xpath(".//tr")[1:]
+    return [
+        [
+            "".join(cell.itertext()).strip().split("\n")[-1]
+            for cell in row.xpath(".//td")
+        ]
+        for row in rows
+    ]
+
+
+# Table parser backends by name. Each returns the cell text of the table rows, or
+# None if the table is missing.
+TABLE_PARSERS = {
+    "lxml": extract_table_rows_lxml,
+    "html.parser": extract_table_rows_html_parser,
+}
+
+
+def parse_table(html, headers, columns_to_clean=None, parser="lxml"):
+    """
+    General function to parse HTML table content and return it as a DataFrame.
+
+    Parameters
+    ----------
+    html : str
+        The HTML content of the webpage.
+    headers : list
+        List of column headers for the table.
+    columns_to_clean : dict, optional
+        Dictionary where the key is the column name and the value is a function that cleans the whole column as a Series (default is None).
+    parser : str, optional
+        The parser backend, a key of `TABLE_PARSERS` (default is 'lxml').
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the table data. Returns an empty DataFrame if no table is found.
+    """
+    data = TABLE_PARSERS[parser](html)
+
+    if data is None:
+        print("Table not found on the page.")
+        return pd.DataFrame()
 
     # Create DataFrame
     df = pd.DataFrame(data, columns=headers)
@@ -70,29 +203,29 @@ def parse_table(html, headers, columns_to_clean=None):
     if columns_to_clean:
         for col, cleaning_function in columns_to_clean.items():
             if col in df.columns:
-                df[col] = df[col].apply(cleaning_function)
+                df[col] = cleaning_function(df[col])
 
     return df
 
 
-def clean_goals_column(goal_str):
+def clean_goals_column(goals):
     """
     Cleans the 'Goals' column by extracting the number of goals, ignoring penalty information.
 
     Parameters
     ----------
-    goal_str : str
+    goals : pd.Series
         The raw goals data in the format 'X (Y penalties)'.
 
     Returns
     -------
-    str
-        The cleaned goal number.
+    pd.Series
+        The cleaned goal numbers.
     """
-    return goal_str.split(" ")[0]
+    return goals.str.split(" ", n=1).str[0]
 
 
-def parse_goals_table(html):
+def parse_goals_table(html, parser="lxml"):
     """
     Parses the HTML content and extracts the goals table data.
 
@@ -100,6 +233,8 @@ def parse_goals_table(html):
     ----------
     html : str
         The HTML content of the webpage.
+    parser : str, optional
+        The parser backend, a key of `TABLE_PARSERS` (default is 'lxml').
 
     Returns
     -------
@@ -108,10 +243,12 @@ def parse_goals_table(html):
     """
     headers = ["#", "Player", "", "Country", "Team", "Goals"]
     columns_to_clean = {"Goals": clean_goals_column}
-    return parse_table(html=html, headers=headers, columns_to_clean=columns_to_clean)
+    return parse_table(
+        html=html, headers=headers, columns_to_clean=columns_to_clean, parser=parser
+    )
 
 
-def parse_assists_table(html):
+def parse_assists_table(html, parser="lxml"):
     """
     Parses the HTML content and extracts the assists table data.
 
@@ -119,6 +256,8 @@ def parse_assists_table(html):
     ----------
     html : str
         The HTML content of the webpage.
+    parser : str, optional
+        The parser backend, a key of `TABLE_PARSERS` (default is 'lxml').
 
     Returns
     -------
@@ -126,33 +265,27 @@ def parse_assists_table(html):
         A DataFrame containing the assist data.
     """
     headers = ["#", "Player", "", "Country", "Team", "Assists"]
-    return parse_table(html=html, headers=headers)
+    return parse_table(html=html, headers=headers, parser=parser)
 
 
-def get_season_data(url, season, metric, sleep_time=0.5):
+def parse_season_page(html, season, metric):
     """
-    Gets data (goals or assists) for a specific season from the given URL.
+    Parses a goals or assists page into the data for one season.
 
     Parameters
     ----------
-    url : str
-        The URL of the webpage to get data from.
+    html : str
+        The HTML content of the webpage.
     season : str
-        The season for which to get the data.
+        The season the page covers.
     metric : str
         Either 'goals' or 'assists' to determine which table to parse.
-    sleep_time : float, optional
-        Time to sleep between requests to avoid overloading the server (default is 0.5 seconds).
 
     Returns
     -------
     pd.DataFrame
-        A DataFrame containing the data for the given season. Returns an empty DataFrame if getting data fails.
+        A DataFrame containing the data for the given season.
     """
-    html = fetch_html(url=url)
-    if html is None:
-        return pd.DataFrame()
-
     if metric == "goals":
         df = parse_goals_table(html=html)
     elif metric == "assists":
@@ -165,15 +298,116 @@ def get_season_data(url, season, metric, sleep_time=0.5):
     # Drop unnecessary columns
     df = df.drop(columns=["#", ""], errors="ignore")
 
-    # Sleep to avoid overloading the server
-    time.sleep(sleep_time)
-
     return df
 
 
-def get_all_season_data(seasons, metric, sleep_time=0.5):
+def get_snapshot_key(metric, season):
+    """Get the snapshot archive key of a goals or assists page."""
+    return f"{metric}/{season}"
+
+
+def get_season_data(
+    url,
+    season,
+    metric,
+    sleep_time=0.5,
+    session=None,
+    rate_limiter=None,
+    archive=True,
+):
     """
-    Gets data (goals or assists) for multiple seasons and writes them as individual CSVs.
+    Gets data (goals or assists) for a specific season from the given URL.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the webpage to get data from.
+    season : str
+        The season for which to get the data.
+    metric : str
+        Either 'goals' or 'assists' to determine which table to parse.
+    sleep_time : float, optional
+        Minimum time between requests to the same host, used when no rate limiter is given (default is 0.5 seconds).
+    session : requests.Session, optional
+        The pooled session used for the request (default is None).
+    rate_limiter : HostRateLimiter, optional
+        Limiter shared between concurrent requests. The shared limiter for `sleep_time` is used if None (default is None).
+    archive : bool, optional
+        If True, save the raw page to the snapshot archive so it can be re-parsed offline (default is True).
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the data for the given season. Returns an empty DataFrame if getting data fails.
+    """
+    if rate_limiter is None:
+        rate_limiter = get_rate_limiter(sleep_time)
+
+    response = fetch_page(url=url, session=session, rate_limiter=rate_limiter)
+    if response is None:
+        return pd.DataFrame()
+
+    if archive:
+        get_snapshot_archive().add(get_snapshot_key(metric, season), response)
+
+    return parse_season_page(html=response.text, season=season, metric=metric)
+
+
+def get_all_metrics_data(urls_by_metric, sleep_time=0.5, max_workers=4):
+    """
+    Gets data for several metrics and seasons concurrently and writes each season as
+    its own Parquet partition and CSV file.
+
+    All pages share one pooled session and one per-host rate limiter, so requests to
+    the same host are spaced at least `sleep_time` apart on average however many
+    workers are running, while the parsing of one page overlaps the download of the next.
+
+    Parameters
+    ----------
+    urls_by_metric : dict
+        A dictionary where keys are metrics ('goals' or 'assists') and values are dictionaries of season strings to URLs.
+    sleep_time : float, optional
+        Minimum average time between requests to the same host (default is 0.5 seconds).
+    max_workers : int, optional
+        The maximum number of pages fetched at once (default is 4).
+    """
+    # Ensure the data directory exists
+    os.makedirs("data", exist_ok=True)
+
+    session = create_session(pool_size=max_workers)
+    rate_limiter = get_rate_limiter(sleep_time)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for metric, seasons in urls_by_metric.items():
+            for season, url in seasons.items():
+                print(f"Getting {metric} data for season {season}...")
+                future = executor.submit(
+                    get_season_data,
+                    url=url,
+                    season=season,
+                    metric=metric,
+                    session=session,
+                    rate_limiter=rate_limiter,
+                )
+                futures[future] = (metric, season)
+
+        for future in as_completed(futures):
+            metric, season = futures[future]
+            season_data = future.result()
+
+            if not season_data.empty:
+                # Save each season's data to a separate partition and CSV file
+                write_dataset(season_data, f"championship_{metric}", export_csv=True)
+                print(f"{metric.capitalize()} data for season {season} saved.")
+            else:
+                print(f"No {metric} data available for season {season}.")
+
+
+def get_all_season_data(seasons, metric, sleep_time=0.5, max_workers=4):
+    """
+    Gets data (goals or assists) for multiple seasons and writes each season as its own
+    Parquet partition and CSV file.
 
     Parameters
     ----------
@@ -182,25 +416,79 @@ def get_all_season_data(seasons, metric, sleep_time=0.5):
     metric : str
         Either 'goals' or 'assists' to determine which data to get.
     sleep_time : float, optional
-        Time to sleep between requests to avoid overloading the server (default is 0.5 seconds).
+        Minimum average time between requests to the same host (default is 0.5 seconds).
+    max_workers : int, optional
+        The maximum number of pages fetched at once (default is 4).
     """
-    # Ensure the data directory exists
-    os.makedirs("data", exist_ok=True)
+    get_all_metrics_data(
+        {metric: seasons}, sleep_time=sleep_time, max_workers=max_workers
+    )
 
-    for season, url in seasons.items():
-        print(f"Getting {metric} data for season {season}...")
 
-        # Fetch data for the current season
-        season_data = get_season_data(
-            url=url, season=season, metric=metric, sleep_time=sleep_time
-        )
+def reparse_snapshot(object_path, encoding, season, metric):
+    """
+    Parses an archived page. Runs in a worker process of `reparse_all_snapshots`.
+
+    Parameters
+    ----------
+    object_path : str
+        The path of the compressed page body.
+    encoding : str
+        The encoding the page was decoded with when fetched.
+    season : str
+        The season the page covers.
+    metric : str
+        Either 'goals' or 'assists' to determine which table to parse.
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the data for the given season.
+    """
+    html = read_snapshot_text(object_path, encoding)
+    return parse_season_page(html=html, season=season, metric=metric)
 
-        if not season_data.empty:
-            # Define file path
-            file_path = f"data/championship_{metric}/{season}.csv"
 
-            # Save each season's data to a separate CSV file
-            season_data.to_csv(file_path, index=False)
-            print(f"Data for season {season} saved to {file_path}.")
-        else:
-            print(f"No data available for season {season}.")
+def reparse_all_snapshots(metrics=("goals", "assists"), max_workers=None):
+    """
+    Rebuilds the Championship data from the latest archived page of every season,
+    without any network access.
+
+    Pages are parsed in parallel worker processes and each season is written as its
+    own Parquet partition and CSV file.
+
+    Parameters
+    ----------
+    metrics : tuple of str, optional
+        The metrics to rebuild (default is ('goals', 'assists')).
+    max_workers : int, optional
+        The maximum number of worker processes. Defaults to the number of CPUs if None (default is None).
+    """
+    archive = get_snapshot_archive()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for key in archive.keys():
+            metric, season = key.split("/", 1)
+            if metric not in metrics:
+                continue
+
+            snapshot = archive.latest(key)
+            future = executor.submit(
+                reparse_snapshot,
+                archive.get_path(snapshot),
+                snapshot["encoding"],
+                season,
+                metric,
+            )
+            futures[future] = (metric, season)
+
+        for future in as_completed(futures):
+            metric, season = futures[future]
+            season_data = future.result()
+
+            if not season_data.empty:
+                write_dataset(season_data, f"championship_{metric}", export_csv=True)
+                print(f"{metric.capitalize()} data for season {season} re-parsed.")
+            else:
+                print(f"No {metric} table found in the snapshot for season {season}.")
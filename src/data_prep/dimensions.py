@@ -0,0 +1,307 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.tools.config import get_config
+from src.tools.storage import (
+    dataset_exists,
+    get_dataset_config,
+    read_dataset,
+    write_dataset,
+)
+
+
+def load_dimension(name):
+    """
+    Read a dimension table, or an empty one if it has not been written yet.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, e.g. 'dim_team'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The dimension rows.
+    """
+    if dataset_exists(name):
+        return read_dataset(name)
+
+    schema = get_dataset_config(name)["schema"]
+    return pd.DataFrame(
+        {field.name: pd.Series(dtype=field.type.to_pandas_dtype()) for field in schema}
+    )
+
+
+def map_unique(values, lookup):
+    """
+    Look up the id of each value, calling `lookup` once per distinct value.
+
+    Parameters
+    ----------
+    values : array-like
+        The values to look up. Missing values get a missing id.
+    lookup : callable
+        Function returning the id of a value, or None if it has no id.
+
+    Returns
+    -------
+    pd.arrays.IntegerArray
+        The nullable integer id of each value.
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    unique_ids = np.array([lookup(value) for value in uniques] + [None], dtype=object)
+    # Missing values have code -1, which picks the trailing None
+    return pd.array(unique_ids[codes], dtype="Int64")
+
+
+class TeamDimension:
+    """
+    Stable integer ids for teams.
+
+    Each FPL team name gets an id the first time it is seen, and ids are never
+    reassigned, so fact tables can store and join on them across seasons.
+    Championship team names are translated with `conf/team_name_mapping.yaml` before
+    lookup, so a club has one id in both sources.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        teams = load_dimension("dim_team")
+        self._ids = dict(zip(teams["team_name"], teams["team_id"].astype(int)))
+        self._changed = False
+
+    def _get_id(self, team_name, add):
+        team_name = get_config("team_name_mapping").get(team_name, team_name)
+        team_id = self._ids.get(team_name)
+        if team_id is None and add:
+            team_id = max(self._ids.values(), default=0) + 1
+            self._ids[team_name] = team_id
+            self._changed = True
+        return team_id
+
+    def get_ids(self, team_names, add=True):
+        """
+        Get the id of each team, assigning ids to teams not seen before.
+
+        Parameters
+        ----------
+        team_names : array-like of str
+            FPL or Championship team names.
+        add : bool, optional
+            If False, unknown teams get a missing id instead of a new one (default
+            is True).
+
+        Returns
+        -------
+        pd.arrays.IntegerArray
+            The nullable 'team_id' of each team.
+        """
+        with self._lock:
+            return map_unique(team_names, lambda name: self._get_id(name, add))
+
+    def save(self):
+        """Write the dimension to the 'dim_team' dataset if any ids have been added."""
+        with self._lock:
+            if not self._changed:
+                return
+
+            teams = pd.DataFrame(
+                {"team_id": list(self._ids.values()), "team_name": list(self._ids)}
+            )
+            write_dataset(teams.sort_values("team_id"), "dim_team", export_csv=True)
+            self._changed = False
+
+
+def get_backfill_teams(names, teams, seasons):
+    """
+    Get the team each player without an FPL code is told apart from namesakes by.
+
+    Parameters
+    ----------
+    names : array-like of str
+        The FPL player names.
+    teams : array-like of str
+        The FPL team of each player.
+    seasons : array-like of str
+        The season of each player, in the format "YYYY-YY".
+
+    Returns
+    -------
+    np.ndarray
+        The team of players whose name is shared by more than one player in any
+        season, and None for every other player.
+    """
+    players = pd.DataFrame({"name": names, "team": teams, "season": seasons})
+    shared_names = players.loc[players.duplicated(["name", "season"]), "name"]
+    is_shared = players["name"].isin(shared_names) & players["team"].notna()
+    return np.where(is_shared, players["team"].astype(object), None)
+
+
+class PlayerDimension:
+    """
+    Stable integer ids for players, the same in every season.
+
+    A player is identified by their FPL 'code', which is the same in every season
+    (unlike the per-season 'element' id). Players whose code is not known, such as
+    those backfilled from the aggregated data, are identified across seasons by
+    name, and by name and team if the name is shared by several players in a season
+    (see `get_backfill_teams`). Namesakes who never play in the same season cannot be
+    told apart without a code, and share an id until their seasons are re-fetched.
+    The first time a backfilled player is seen with a code, their id is kept and
+    linked to it, so every season's rows keep the same id.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        players = load_dimension("dim_player")
+        self._players = {
+            int(row.player_id): {
+                "name": row.name,
+                "team": None if pd.isna(row.team) else row.team,
+                "fpl_code": None if pd.isna(row.fpl_code) else int(row.fpl_code),
+            }
+            for row in players.itertuples(index=False)
+        }
+        self._ids_by_code = {
+            player["fpl_code"]: player_id
+            for player_id, player in self._players.items()
+            if player["fpl_code"] is not None
+        }
+        self._ids_by_key = {
+            (player["name"], player["team"]): player_id
+            for player_id, player in self._players.items()
+            if player["fpl_code"] is None
+        }
+        self._changed = False
+
+    def _get_id(self, name, team, fpl_code, add):
+        if fpl_code is not None and fpl_code in self._ids_by_code:
+            return self._ids_by_code[fpl_code]
+
+        if fpl_code is None:
+            keys = [(name, team)]
+        else:
+            # A coded player may have been backfilled with or without their team
+            keys = [(name, team), (name, None)]
+        for key in keys:
+            player_id = self._ids_by_key.get(key)
+            if player_id is None:
+                continue
+            if fpl_code is not None:
+                # Link the backfilled id to the code from now on
+                del self._ids_by_key[key]
+                self._ids_by_code[fpl_code] = player_id
+                self._players[player_id]["fpl_code"] = fpl_code
+                self._changed = True
+            return player_id
+
+        if not add:
+            return None
+
+        player_id = max(self._players, default=0) + 1
+        self._players[player_id] = {"name": name, "team": team, "fpl_code": fpl_code}
+        if fpl_code is None:
+            self._ids_by_key[(name, team)] = player_id
+        else:
+            self._ids_by_code[fpl_code] = player_id
+        self._changed = True
+        return player_id
+
+    def get_ids(self, names, teams=None, fpl_codes=None, add=True):
+        """
+        Get the id of each player, assigning ids to players not seen before.
+
+        Parameters
+        ----------
+        names : array-like of str
+            The FPL player names.
+        teams : array-like of str, optional
+            The FPL team of each player, used with the name to identify players
+            without a code. Use `get_backfill_teams` to only set it for players
+            sharing their name with another player. Players without a code are
+            identified by name alone if None, or where the team is missing (default
+            is None).
+        fpl_codes : array-like of int, optional
+            The FPL 'code' of each player. Players are identified by name and team if
+            None or if their code is missing (default is None).
+        add : bool, optional
+            If False, unknown players get a missing id instead of a new one (default
+            is True).
+
+        Returns
+        -------
+        pd.arrays.IntegerArray
+            The nullable 'player_id' of each player.
+        """
+        names = np.asarray(names, dtype=object)
+        if teams is None:
+            teams = np.full(len(names), None, dtype=object)
+        teams = [None if pd.isna(team) else team for team in teams]
+        if fpl_codes is None:
+            fpl_codes = np.full(len(names), None, dtype=object)
+        fpl_codes = [None if pd.isna(code) else int(code) for code in fpl_codes]
+
+        with self._lock:
+            return map_unique(
+                pd.Series(list(zip(names, teams, fpl_codes)), dtype=object),
+                lambda key: self._get_id(*key, add),
+            )
+
+    def save(self):
+        """Write the dimension to the 'dim_player' dataset if any ids have been added."""
+        with self._lock:
+            if not self._changed:
+                return
+
+            players = pd.DataFrame(
+                {
+                    "player_id": list(self._players),
+                    "name": [player["name"] for player in self._players.values()],
+                    "team": [player["team"] for player in self._players.values()],
+                    "fpl_code": pd.array(
+                        [player["fpl_code"] for player in self._players.values()],
+                        dtype="Int64",
+                    ),
+                }
+            )
+            write_dataset(
+                players.sort_values("player_id"), "dim_player", export_csv=True
+            )
+            self._changed = False
+
+
+_dimensions = {}
+_dimensions_lock = threading.Lock()
+
+
+def get_team_dimension():
+    """
+    Get the shared team dimension, loaded from the 'dim_team' dataset.
+
+    Returns
+    -------
+    TeamDimension
+        The process-wide team dimension.
+    """
+    with _dimensions_lock:
+        if "team" not in _dimensions:
+            _dimensions["team"] = TeamDimension()
+        return _dimensions["team"]
+
+
+def get_player_dimension():
+    """
+    Get the shared player dimension, loaded from the 'dim_player' dataset.
+
+    Returns
+    -------
+    PlayerDimension
+        The process-wide player dimension.
+    """
+    with _dimensions_lock:
+        if "player" not in _dimensions:
+            _dimensions["player"] = PlayerDimension()
+        return _dimensions["player"]
@@ -1,24 +1,22 @@
+import os
 import pandas as pd
 import numpy as np
-from src.tools.yaml_loader import load_yaml_file
-
-# Load parameters
-file_path = "conf/parameters.yaml"
-parameters = load_yaml_file(file_path)
-minutes_played_gameweek_min = parameters["minutes_played_gameweek_min"]
-
-# Load estimated team strengths for missing data
-file_path_estimated_strength = "conf/estimated_team_strength.yaml"
-estimated_team_strength = load_yaml_file(file_path_estimated_strength)
-
-# Load promotion/relegation yaml
-file_path = "conf/promoted_teams_by_season.yaml"
-promoted_teams_by_season = load_yaml_file(file_path)
-
-
-def fetch_data_from_url(url, encoding="utf-8"):
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.tools.http_cache import read_csv_from_url
+from src.tools.storage import get_dataset_config, write_dataset
+from src.data_prep.dimensions import (
+    get_backfill_teams,
+    get_player_dimension,
+    get_team_dimension,
+)
+from src.tools.config import get_parameter, get_promoted_teams, get_team_strengths
+
+
+def fetch_data_from_url(url, encoding="utf-8", chunksize=None):
     """
-    Fetch data from a URL and return a DataFrame.
+    Fetch data from a URL and return a DataFrame. Responses are read through the
+    shared on-disk HTTP cache, so unchanged files are not downloaded again.
 
     Parameters
     ----------
@@ -26,19 +24,22 @@ def fetch_data_from_url(url, encoding="utf-8"):
         The URL to fetch data from.
     encoding : str, optional
         The encoding to use for reading the data (default is 'utf-8').
+    chunksize : int, optional
+        If given, return an iterator over blocks of this many rows instead of one
+        DataFrame (default is None).
 
     Returns
     -------
-    df : pd.DataFrame
-        The DataFrame containing the fetched data.
+    df : pd.DataFrame or pandas.io.parsers.TextFileReader
+        The DataFrame containing the fetched data, or an iterator over its blocks.
     """
-    df = pd.read_csv(url, encoding=encoding)
+    df = read_csv_from_url(url, encoding=encoding, chunksize=chunksize)
     return df
 
 
-def process_fpl_data(df, season_year):
+def add_player_positions(df, season_year, df_players=None, df_teams=None):
     """
-    Process the FPL data by merging and calculating columns.
+    Add 'position' and 'team' columns to gameweek data that does not have them.
 
     Parameters
     ----------
@@ -46,143 +47,432 @@ def process_fpl_data(df, season_year):
         The DataFrame containing raw FPL data.
     season_year : str
         The season year in the format "YYYY-YY".
+    df_players : pd.DataFrame, optional
+        Pre-fetched `players_raw.csv` for the season; fetched on demand if None
+        (default is None).
+    df_teams : pd.DataFrame, optional
+        Pre-fetched `master_team_list.csv`; fetched on demand if None (default is None).
 
     Returns
     -------
-    summary_df : pd.DataFrame
-        A DataFrame containing the processed and aggregated FPL data.
+    pd.DataFrame
+        The gameweek data with 'position' and 'team' columns.
     """
-    if "position" not in df.columns:
+    if "position" in df.columns:
+        return df
+
+    if df_players is None:
         df_players = fetch_data_from_url(
             f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{season_year}/players_raw.csv"
         )
-        df_players = df_players[["id", "team", "element_type"]]
-        df = df.merge(df_players, left_on="element", right_on="id", how="left")
+    df_players = df_players[["id", "team", "element_type"]]
+    df = df.merge(df_players, left_on="element", right_on="id", how="left")
 
+    if df_teams is None:
         df_teams = fetch_data_from_url(
             "https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/master_team_list.csv"
         )
-        df_teams = df_teams[df_teams["season"] == season_year]
-        df = df.merge(df_teams, on="team", how="left")
+    df_teams = df_teams[df_teams["season"] == season_year]
+    df = df.merge(df_teams, on="team", how="left")
 
-        df.rename(columns={"team": "team_id", "team_name": "team"}, inplace=True)
+    df.rename(columns={"team": "team_id", "team_name": "team"}, inplace=True)
 
-        df["position"] = (
-            df["element_type"]
-            .map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
-            .fillna("Unknown")
-        )
+    df["position"] = (
+        df["element_type"]
+        .map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
+        .fillna("Unknown")
+    )
 
-    df["gk_points"] = df["total_points"].where(df["position"] == "GK", 0)
-    df["def_points"] = df["total_points"].where(df["position"] == "DEF", 0)
-    df["mid_points"] = df["total_points"].where(df["position"] == "MID", 0)
-    df["fwd_points"] = df["total_points"].where(df["position"] == "FWD", 0)
+    return df
 
-    max_gw = df["GW"].max()
-    df_max_gw = df[df["GW"] == max_gw]
 
-    # Identify players present in Gameweek 1
-    players_gw1 = df[df["GW"] == 1]["name"].unique()
+# Summed statistics kept for each player, as output column: gameweek column
+PLAYER_SUM_COLUMNS = {
+    "total_points": "total_points",
+    "goals_scored": "goals_scored",
+    "assists": "assists",
+    "clean_sheets": "clean_sheets",
+    "yellow_cards": "yellow_cards",
+    "red_cards": "red_cards",
+    "goals_conceded": "goals_conceded",
+    "own_goals": "own_goals",
+    "penalties_missed": "penalties_missed",
+    "penalties_saved": "penalties_saved",
+    "saves": "saves",
+    "bonus_points": "bonus",
+    "minutes_played": "minutes",
+}
+
+PLAYER_COLUMN_ORDER = [
+    "name",
+    "team",
+    "total_points",
+    "position",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "yellow_cards",
+    "red_cards",
+    "goals_conceded",
+    "own_goals",
+    "penalties_missed",
+    "penalties_saved",
+    "saves",
+    "bonus_points",
+    "value_first_gw",
+    "count_gws_min_minutes",
+    "minutes_played",
+    "min_gw",
+]
+
+
+def get_player_key_column(df):
+    """
+    Get the column identifying players in gameweek data.
 
-    # Filter for gameweeks where minutes > minutes_played_gameweek_min and calculate count
-    count_df = (
-        df[df["minutes"] > minutes_played_gameweek_min]
-        .groupby("name")["GW"]
-        .nunique()
-        .reset_index(name="count_gws_min_minutes")
-    )
+    The FPL 'element' id is used when the data has it, so that two players with the
+    same name are kept apart. Otherwise players are identified by name.
 
-    # Aggregate all other statistics without filtering
-    player_df = (
-        df.groupby("name")
-        .agg(
-            total_points=("total_points", "sum"),
-            goals_scored=("goals_scored", "sum"),
-            assists=("assists", "sum"),
-            clean_sheets=("clean_sheets", "sum"),
-            yellow_cards=("yellow_cards", "sum"),
-            red_cards=("red_cards", "sum"),
-            goals_conceded=("goals_conceded", "sum"),
-            own_goals=("own_goals", "sum"),
-            penalties_missed=("penalties_missed", "sum"),
-            penalties_saved=("penalties_saved", "sum"),
-            saves=("saves", "sum"),
-            bonus_points=("bonus", "sum"),
-            minutes_played=("minutes", "sum"),
-            min_gw=("GW", "min"),
-        )
-        .reset_index()
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Gameweek rows.
+
+    Returns
+    -------
+    str
+        'element' or 'name'.
+    """
+    return "element" if "element" in df.columns else "name"
+
+
+def gameweek_bitmask(gameweeks):
+    """
+    Convert gameweek numbers to single-bit masks so sets of gameweeks can be OR-ed.
+
+    Parameters
+    ----------
+    gameweeks : array-like
+        Gameweek numbers.
+
+    Returns
+    -------
+    np.ndarray
+        The masks as int64, with bit `GW` set for each gameweek.
+
+    Raises
+    ------
+    ValueError
+        If a gameweek number does not fit in the mask.
+    """
+    gameweeks = np.asarray(gameweeks, dtype="int64")
+    if len(gameweeks) and gameweeks.max() >= 63:
+        raise ValueError("Gameweek numbers must be below 63 to be stored as a bitmask.")
+    return np.left_shift(np.int64(1), gameweeks)
+
+
+def count_gameweeks(masks):
+    """
+    Count the gameweeks set in each gameweek bitmask.
+
+    Parameters
+    ----------
+    masks : array-like
+        Gameweek bitmasks.
+
+    Returns
+    -------
+    np.ndarray
+        The number of bits set in each mask.
+    """
+    bytes_per_mask = np.asarray(masks, dtype="int64").view("uint8").reshape(-1, 8)
+    return np.unpackbits(bytes_per_mask, axis=1).sum(axis=1).astype("int64")
+
+
+def aggregate_player_state(df):
+    """
+    Aggregate a block of gameweek rows into per-player state in a single grouped pass.
+
+    Players are identified by their FPL 'element' id when the rows have one, and by
+    name otherwise (see `get_player_key_column`). Rows are sorted once by (player,
+    gameweek), and every per-player field is then reduced over the contiguous groups
+    of the sorted NumPy arrays: summed statistics, the first gameweek and the value in
+    it, a bitmask of gameweeks above `minutes_played_gameweek_min`, and the last
+    gameweek. The rows of each player's last gameweek are kept to give the final team
+    and position. States of consecutive blocks are merged with
+    `combine_player_states`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Gameweek rows with 'position' and 'team' columns.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame)
+        The per-player aggregates indexed by the player key (sorted), with the
+        player's 'name' in its first gameweek when the key is 'element', and the key,
+        'GW', 'position' and 'team' rows of each player's last gameweek.
+    """
+    key_column = get_player_key_column(df)
+    codes, keys = pd.factorize(df[key_column], sort=True)
+    gameweeks = df["GW"].to_numpy()
+
+    # Rows without a key are dropped, as in a groupby
+    valid = np.flatnonzero(codes >= 0)
+
+    # Stable sort, so ties on gameweek keep their row order
+    order = valid[np.lexsort((gameweeks[valid], codes[valid]))]
+    sorted_codes = codes[order]
+    sorted_gameweeks = gameweeks[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    ends = np.append(starts[1:], len(order)) - 1
+
+    players = pd.DataFrame(index=pd.Index(keys, name=key_column))
+    if key_column != "name":
+        players["name"] = df["name"].to_numpy()[order][starts]
+    for column, source_column in PLAYER_SUM_COLUMNS.items():
+        values = df[source_column].to_numpy()[order]
+        if values.dtype.kind == "f":
+            values = np.nan_to_num(values)
+        players[column] = np.add.reduceat(values, starts) if len(order) else values
+
+    players["min_gw"] = sorted_gameweeks[starts]
+    players["value_first_gw"] = df["value"].to_numpy()[order][starts]
+
+    # OR-ing the bits counts a gameweek once even when a player has two fixtures in it
+    minutes_played_gameweek_min = get_parameter("minutes_played_gameweek_min")
+    played = df["minutes"].to_numpy()[order] > minutes_played_gameweek_min
+    bits = np.where(played, gameweek_bitmask(sorted_gameweeks), np.int64(0))
+    players["gw_mask"] = np.bitwise_or.reduceat(bits, starts) if len(order) else bits
+
+    last_gw = sorted_gameweeks[ends]
+    players["last_gw"] = last_gw
+    is_last_gw = np.zeros(len(df), dtype=bool)
+    is_last_gw[valid] = gameweeks[valid] == last_gw[codes[valid]]
+    last_gw_rows = df.loc[is_last_gw, [key_column, "GW", "position", "team"]]
+
+    return players, last_gw_rows
+
+
+def combine_player_states(state, other):
+    """
+    Merge two per-player states, where `other` covers rows after those in `state`.
+
+    Parameters
+    ----------
+    state : tuple of (pd.DataFrame, pd.DataFrame) or None
+        The running state, or None if no rows have been aggregated yet.
+    other : tuple of (pd.DataFrame, pd.DataFrame)
+        The state of the next block of rows.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame)
+        The combined per-player aggregates and last gameweek rows.
+    """
+    if state is None:
+        return other
+
+    key_column = state[0].index.name
+    parts = pd.concat([state[0], other[0]]).reset_index()
+    grouped = parts.groupby(key_column)
+
+    players = grouped[list(PLAYER_SUM_COLUMNS.keys())].sum()
+
+    # Earlier blocks win ties, matching the first occurrence of the minimum gameweek
+    first_parts = parts.loc[grouped["min_gw"].idxmin()].set_index(key_column)
+    if key_column != "name":
+        players.insert(0, "name", first_parts["name"])
+    players["min_gw"] = first_parts["min_gw"]
+    players["value_first_gw"] = first_parts["value_first_gw"]
+
+    players["gw_mask"] = grouped["gw_mask"].agg(
+        lambda masks: np.bitwise_or.reduce(masks.to_numpy())
     )
 
-    # Merge the count data with the aggregated stats
-    player_df = player_df.merge(count_df, on="name", how="left")
+    players["last_gw"] = grouped["last_gw"].max()
+    last_gw_rows = pd.concat([state[1], other[1]], ignore_index=True)
+    last_gw_rows = last_gw_rows[
+        last_gw_rows["GW"] == last_gw_rows[key_column].map(players["last_gw"])
+    ]
+
+    return players, last_gw_rows
 
-    # Identify the minimum gameweek and corresponding value
-    min_gameweek_info = df.loc[df.groupby("name")["GW"].idxmin()][["name", "value"]]
 
-    # Merge the minimum gameweek information with the aggregated data
-    player_df = pd.merge(
-        player_df, min_gameweek_info, on="name", how="left", suffixes=("", "_min")
+def clean_player_names(names):
+    """
+    Remove the underscores and numeric suffixes used in some seasons' player names.
+
+    Parameters
+    ----------
+    names : pd.Series
+        Raw player names, e.g. 'Aaron_Cresswell_402'.
+
+    Returns
+    -------
+    pd.Series
+        Cleaned player names, e.g. 'Aaron Cresswell'.
+    """
+    names = names.str.replace("_", " ")
+    return names.str.replace(r"\s\d+$", "", regex=True)
+
+
+def build_player_df_from_state(state):
+    """
+    Build the final player DataFrame from aggregated per-player state.
+
+    Players are ordered by total points (ties in name order), and each player gets
+    the team and position of their rows in the last gameweek of the season. A player
+    with two fixtures in that gameweek appears once per fixture; a player absent from
+    it has no team or position. Players keyed by FPL id keep it in an 'element'
+    column.
+
+    Parameters
+    ----------
+    state : tuple of (pd.DataFrame, pd.DataFrame)
+        The per-player state returned by `aggregate_player_state`.
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame containing the processed and aggregated FPL data.
+    """
+    players, last_gw_rows = state
+    key_column = players.index.name
+    players = players.sort_index()
+    if key_column != "name":
+        # Namesakes are ordered by id
+        players = players.sort_values("name", kind="stable")
+        players = players.set_index("name", append=True).reorder_levels([1, 0])
+
+    player_df = players[
+        list(PLAYER_SUM_COLUMNS.keys()) + ["min_gw", "value_first_gw"]
+    ].reset_index()
+
+    # Players with no gameweek above the minutes threshold have no count
+    counts = pd.Series(count_gameweeks(players["gw_mask"]))
+    if (counts == 0).any():
+        counts = counts.where(counts > 0)
+    player_df["count_gws_min_minutes"] = counts
+
+    player_df = player_df.sort_values(by="total_points", ascending=False)
+    player_rank = np.empty(len(player_df), dtype="int64")
+    player_rank[player_df.index.to_numpy()] = np.arange(len(player_df))
+    player_df = player_df.reset_index(drop=True)
+    player_df["name"] = clean_player_names(player_df["name"])
+
+    # Match each row of the last gameweek of the season to its player's output row
+    max_gw_rows = last_gw_rows[last_gw_rows["GW"] == players["last_gw"].max()]
+    player_keys = players.index.get_level_values(key_column)
+    row_players = player_rank[
+        pd.Index(player_keys).get_indexer(max_gw_rows[key_column])
+    ]
+    matches = np.bincount(row_players, minlength=len(player_df))
+    repeats = np.maximum(matches, 1)
+
+    # Within a player, rows keep their gameweek data order
+    order = np.argsort(row_players, kind="stable")
+    sorted_players = row_players[order]
+    rank_in_player = np.arange(len(order)) - np.searchsorted(
+        sorted_players, sorted_players
     )
-    player_df = player_df.rename(columns={"value": "value_first_gw"})
+    slots = (np.cumsum(repeats) - repeats)[sorted_players] + rank_in_player
 
-    player_df = player_df.sort_values(by="total_points", ascending=False).reset_index(
+    player_df = player_df.loc[np.repeat(player_df.index, repeats)].reset_index(
         drop=True
     )
+    for column in ["position", "team"]:
+        values = np.full(len(player_df), np.nan, dtype=object)
+        values[slots] = max_gw_rows[column].to_numpy()[order]
+        player_df[column] = values
 
-    # Perform the left join with player_df on 'name'
-    player_df = player_df.merge(
-        df_max_gw[["name", "position", "team"]], on="name", how="left"
-    )
+    if key_column != "name":
+        return player_df[PLAYER_COLUMN_ORDER + [key_column]]
+    return player_df[PLAYER_COLUMN_ORDER]
 
-    column_order = [
-        "name",
-        "team",
-        "total_points",
-        "position",
-        "goals_scored",
-        "assists",
-        "clean_sheets",
-        "yellow_cards",
-        "red_cards",
-        "goals_conceded",
-        "own_goals",
-        "penalties_missed",
-        "penalties_saved",
-        "saves",
-        "bonus_points",
-        "value_first_gw",
-        "count_gws_min_minutes",
-        "minutes_played",
-        "min_gw",
-    ]
 
-    # Reorder the DataFrame columns
-    player_df = player_df[column_order]
+def process_fpl_data(df, season_year, df_players=None, df_teams=None):
+    """
+    Process the FPL data by merging and calculating columns.
 
-    # Remove _ from names
-    player_df["name"] = player_df["name"].str.replace("_", " ")
-    player_df["name"] = player_df["name"].str.replace(r"\s\d+$", "", regex=True)
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame containing raw FPL data.
+    season_year : str
+        The season year in the format "YYYY-YY".
+    df_players : pd.DataFrame, optional
+        Pre-fetched `players_raw.csv` for the season. Only used when the gameweek
+        data has no 'position' column; fetched on demand if None (default is None).
+    df_teams : pd.DataFrame, optional
+        Pre-fetched `master_team_list.csv`. Only used when the gameweek data has no
+        'position' column; fetched on demand if None (default is None).
 
-    return player_df
+    Returns
+    -------
+    summary_df : pd.DataFrame
+        A DataFrame containing the processed and aggregated FPL data.
+    """
+    df = add_player_positions(df, season_year, df_players, df_teams)
+    return build_player_df_from_state(aggregate_player_state(df))
 
 
-def get_fpl_player_data_aggregated(season_year):
+def process_fpl_data_chunked(chunks, season_year, df_players=None, df_teams=None):
     """
-    Fetch and process FPL player data for the given season year.
+    Process FPL gameweek data block by block, keeping only per-player running state.
+
+    Produces the same DataFrame as `process_fpl_data`, but peak memory is bounded by
+    the size of one block plus one row per player rather than by the whole season.
 
     Parameters
     ----------
+    chunks : iterable of pd.DataFrame
+        Consecutive blocks of raw gameweek rows, e.g. from `pd.read_csv(..., chunksize=...)`.
     season_year : str
         The season year in the format "YYYY-YY".
+    df_players : pd.DataFrame, optional
+        Pre-fetched `players_raw.csv` for the season; fetched on demand if needed
+        (default is None).
+    df_teams : pd.DataFrame, optional
+        Pre-fetched `master_team_list.csv`; fetched on demand if needed (default is None).
 
     Returns
     -------
-    summary_df : pd.DataFrame
-        A DataFrame containing the aggregated FPL player data.
+    pd.DataFrame
+        A DataFrame containing the processed and aggregated FPL data.
+    """
+    state = None
+    for chunk in chunks:
+        if "position" not in chunk.columns and df_players is None:
+            # Fetch the side files once rather than once per block
+            df_players = fetch_data_from_url(
+                f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{season_year}/players_raw.csv"
+            )
+            df_teams = fetch_data_from_url(
+                "https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/master_team_list.csv"
+            )
+        chunk = add_player_positions(chunk, season_year, df_players, df_teams)
+        state = combine_player_states(state, aggregate_player_state(chunk))
+
+    return build_player_df_from_state(state)
+
+
+def get_merged_gw_source(season_year):
+    """
+    Get the URL and encoding of the merged gameweek data for a season.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+
+    Returns
+    -------
+    tuple of (str, str)
+        The URL of `merged_gw.csv` and the encoding to read it with.
     """
     vaastav_url = f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{season_year}/gws/merged_gw.csv"
-    season_start = int(season_year[:4])
 
     # Set encoding based on season start year
     if int(season_year[:4]) <= 2018:
@@ -190,26 +480,200 @@ def get_fpl_player_data_aggregated(season_year):
     else:
         encoding = "utf-8"
 
+    return vaastav_url, encoding
+
+
+def get_player_state_dir(season_year):
+    """Get the directory holding the persisted per-player state for a season."""
+    return f"data/fpl_data/state/{season_year}"
+
+
+def save_player_state(state, season_year):
+    """
+    Persist per-player aggregate state for a season.
+
+    Parameters
+    ----------
+    state : tuple of (pd.DataFrame, pd.DataFrame)
+        The per-player aggregates and last gameweek rows.
+    season_year : str
+        The season year in the format "YYYY-YY".
+    """
+    players, last_gw_rows = state
+    state_dir = get_player_state_dir(season_year)
+    os.makedirs(state_dir, exist_ok=True)
+    players.to_csv(f"{state_dir}/players.csv", encoding="utf-8")
+    last_gw_rows.to_csv(f"{state_dir}/last_gw_rows.csv", index=False, encoding="utf-8")
+
+
+def load_player_state(season_year):
+    """
+    Load the persisted per-player aggregate state for a season.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame) or None
+        The per-player aggregates and last gameweek rows, or None if no state has
+        been saved for the season.
+    """
+    state_dir = get_player_state_dir(season_year)
+    if not os.path.exists(f"{state_dir}/players.csv"):
+        return None
+
+    # Player names such as 'None' must not be read as missing values
+    players = pd.read_csv(
+        f"{state_dir}/players.csv",
+        index_col=0,
+        encoding="utf-8",
+        keep_default_na=False,
+        na_values={"value_first_gw": [""]},
+    )
+    last_gw_rows = pd.read_csv(
+        f"{state_dir}/last_gw_rows.csv",
+        encoding="utf-8",
+        keep_default_na=False,
+        na_values={"position": [""], "team": [""]},
+    )
+    return players, last_gw_rows
+
+
+def fetch_gameweek_data(season_year, gameweek):
+    """
+    Fetch the rows of a single gameweek, or None if it has not been published.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+    gameweek : int
+        The gameweek number.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        The gameweek rows with a 'GW' column added.
+    """
+    _, encoding = get_merged_gw_source(season_year)
+    gameweek_url = f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{season_year}/gws/gw{gameweek}.csv"
+
+    try:
+        df = fetch_data_from_url(gameweek_url, encoding=encoding)
+    except (requests.HTTPError, FileNotFoundError):
+        return None
+
+    df["GW"] = gameweek
+    return df
+
+
+def get_fpl_player_data_incremental(season_year):
+    """
+    Fetch and process FPL player data, folding in only gameweeks not seen before.
+
+    Per-player aggregate state is persisted under `data/fpl_data/state/`, and each
+    call fetches the individual gameweek files after the last gameweek in that state.
+    The newest gameweek may still be in progress, so it is folded into the returned
+    data but only persisted once a later gameweek has been published.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+
+    Returns
+    -------
+    summary_df : pd.DataFrame
+        A DataFrame containing the aggregated FPL player data.
+    """
+    state = load_player_state(season_year)
+    last_gw = 0 if state is None else int(state[0]["last_gw"].max())
+
+    df_players = None
+    df_teams = None
+    new_states = []
+    for gameweek in range(last_gw + 1, 63):
+        df = fetch_gameweek_data(season_year, gameweek)
+        if df is None:
+            break
+
+        if "position" not in df.columns and df_players is None:
+            # Fetch the side files once rather than once per gameweek
+            df_players = fetch_data_from_url(
+                f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{season_year}/players_raw.csv"
+            )
+            df_teams = fetch_data_from_url(
+                "https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/master_team_list.csv"
+            )
+        df = add_player_positions(df, season_year, df_players, df_teams)
+        new_states.append(aggregate_player_state(df))
+
+    if not new_states and state is None:
+        raise ValueError(f"No gameweek data is available for season {season_year}.")
+
+    # Persist everything except the newest gameweek, which may still change
+    for new_state in new_states[:-1]:
+        state = combine_player_states(state, new_state)
+    if len(new_states) > 1:
+        save_player_state(state, season_year)
+
+    if new_states:
+        state = combine_player_states(state, new_states[-1])
+
+    return build_player_df_from_state(state)
+
+
+def get_fpl_player_data_aggregated(season_year, chunksize=None, incremental=False):
+    """
+    Fetch and process FPL player data for the given season year.
+
+    Parameters
+    ----------
+    season_year : str
+        The season year in the format "YYYY-YY".
+    chunksize : int, optional
+        If given, stream the gameweek data in blocks of this many rows so that peak
+        memory does not grow with the season (default is None).
+    incremental : bool, optional
+        If True, update persisted per-player state with only the gameweeks published
+        since the last call, instead of re-aggregating the whole season (default is False).
+
+    Returns
+    -------
+    summary_df : pd.DataFrame
+        A DataFrame containing the aggregated FPL player data.
+    """
+    if incremental:
+        return get_fpl_player_data_incremental(season_year)
+
+    vaastav_url, encoding = get_merged_gw_source(season_year)
+
+    if chunksize is not None:
+        with fetch_data_from_url(
+            vaastav_url, encoding=encoding, chunksize=chunksize
+        ) as chunks:
+            return process_fpl_data_chunked(chunks, season_year)
+
     df = fetch_data_from_url(vaastav_url, encoding=encoding)
     player_df = process_fpl_data(df, season_year)
 
     return player_df
 
 
-def load_team_data(current_season, estimated_team_strength):
+def load_team_data(current_season):
     """
     Load team data for a given Premier League season. The function first attempts to
     load the data from the Fantasy Premier League (FPL) API for the specified season.
-    If this fails, it falls back to using an estimated team strength dataset provided
-    as input.
+    If this fails, it falls back to the estimated team strengths in
+    `conf/estimated_team_strength.yaml`.
 
     Parameters
     ----------
     current_season : str
         The season for which the team data is to be loaded, e.g., '2018-19'.
-    estimated_team_strength : list of dict
-        A list of dictionaries containing fallback team strength data. Each dictionary
-        should have keys 'season', 'team_name', and 'team_strength'.
 
     """
 
@@ -218,7 +682,7 @@ def load_team_data(current_season, estimated_team_strength):
 
     try:
         # Try to load the CSV data
-        team_data = pd.read_csv(team_data_url)
+        team_data = fetch_data_from_url(team_data_url)
         return team_data[
             [
                 "name",
@@ -232,14 +696,15 @@ def load_team_data(current_season, estimated_team_strength):
             ]
         ]
     except:
-        # Filter by the current season
-        filtered_data = [
-            item for item in estimated_team_strength if item["season"] == current_season
-        ]
+        # Look up the current season's estimates
+        team_strengths = get_team_strengths(current_season)
 
         # Convert to DataFrame and add the extra columns
-        df = pd.DataFrame(filtered_data)[["team_name", "team_strength"]].rename(
-            columns={"team_name": "name", "team_strength": "strength"}
+        df = pd.DataFrame(
+            {
+                "name": list(team_strengths.keys()),
+                "strength": list(team_strengths.values()),
+            }
         )
         df["strength_overall_home"] = 0
         df["strength_overall_away"] = 0
@@ -257,10 +722,7 @@ def fetch_data_for_season(season):
 
     try:
         player_data = get_fpl_player_data_aggregated(current_season)
-        team_data = load_team_data(
-            current_season=current_season,
-            estimated_team_strength=estimated_team_strength,
-        )
+        team_data = load_team_data(current_season=current_season)
         return player_data, team_data, current_season
     except Exception as e:
         print(f"Error fetching data for season {current_season}: {e}")
@@ -296,26 +758,23 @@ def process_team_data(team_data):
 
 
 def merge_data(player_data, team_data_selected, season):
-    """Merge player and team data for a specific season and add season column."""
-    team_data_selected = team_data_selected.rename(columns={"name": "team"})
-    merged_data = pd.merge(
-        player_data, team_data_selected, how="left", left_on="team", right_on="team"
-    )
+    """Merge player and team data for a specific season on 'team_id' and add season column."""
+    team_data_selected = team_data_selected.drop(columns=["name"])
+    merged_data = pd.merge(player_data, team_data_selected, how="left", on="team_id")
     merged_data["season"] = season
     return merged_data
 
 
 # Function to add the 'promoted_from_championship' column
-def add_promoted_column(season_data, promoted_teams_by_season, season_start_year):
+def add_promoted_column(season_data, season_start_year):
     """
     Add a binary 'promoted_from_championship' column to the season data.
 
     Parameters
     ----------
     season_data : pd.DataFrame
-        The DataFrame containing the merged player and team data for a specific season.
-    promoted_teams_by_season : dict
-        A dictionary where the key is the season start year and the value is a list of promoted teams.
+        The DataFrame containing the merged player and team data for a specific season,
+        with a 'team_id' column.
     season_start_year : int
         The start year of the season (e.g., 2021 for the 2021-22 season).
 
@@ -324,19 +783,228 @@ def add_promoted_column(season_data, promoted_teams_by_season, season_start_year
     pd.DataFrame
         The updated DataFrame with the 'promoted_from_championship' column.
     """
-    # Get promoted teams for the season, or an empty list if not available
-    promoted_teams = promoted_teams_by_season.get(season_start_year, [])
+    # Get promoted teams for the season, or an empty set if not available
+    promoted_teams = get_promoted_teams(season_start_year)
+    promoted_team_ids = get_team_dimension().get_ids(list(promoted_teams), add=False)
 
     # Add the binary column
-    season_data["promoted_from_championship"] = season_data["team"].apply(
-        lambda team: 1 if team in promoted_teams else 0
+    season_data["promoted_from_championship"] = (
+        season_data["team_id"].isin(promoted_team_ids.dropna()).astype(int)
     )
 
     return season_data
 
 
+def add_dimension_keys(player_data, current_season, df_players=None):
+    """
+    Add stable 'player_id' and 'team_id' columns to aggregated player data.
+
+    Players keyed by their per-season FPL 'element' id are identified across seasons
+    by the FPL 'code' in `players_raw.csv`. Coded players seen before without a code
+    keep their backfilled id. Players without a code are identified by name, and by
+    team too if their name is shared within the season.
+
+    Parameters
+    ----------
+    player_data : pd.DataFrame
+        The aggregated FPL player data for the season.
+    current_season : str
+        The season in the format "YYYY-YY".
+    df_players : pd.DataFrame, optional
+        Pre-fetched `players_raw.csv` for the season; fetched on demand if the player
+        data has an 'element' column and this is None (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        The player data with 'player_id' and 'team_id' columns, without 'element'.
+    """
+    fpl_codes = None
+    if "element" in player_data.columns:
+        if df_players is None:
+            df_players = fetch_data_from_url(
+                f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{current_season}/players_raw.csv"
+            )
+        fpl_codes = player_data["element"].map(df_players.set_index("id")["code"])
+        player_data = player_data.drop(columns=["element"])
+
+    teams = get_backfill_teams(
+        player_data["name"],
+        player_data["team"],
+        np.full(len(player_data), current_season),
+    )
+    if fpl_codes is not None:
+        # Coded players are linked to ids backfilled with or without their team
+        teams = np.where(fpl_codes.notna(), player_data["team"].astype(object), teams)
+    player_data["player_id"] = get_player_dimension().get_ids(
+        player_data["name"], teams, fpl_codes
+    )
+    player_data["team_id"] = get_team_dimension().get_ids(player_data["team"])
+    return player_data
+
+
+def save_season_data(player_data, team_data, current_season, df_players=None):
+    """
+    Merge player and team data for a season and save it to its own partition and CSV file.
+
+    New players and teams are added to the 'dim_player' and 'dim_team' datasets.
+
+    Parameters
+    ----------
+    player_data : pd.DataFrame
+        The aggregated FPL player data for the season.
+    team_data : pd.DataFrame
+        The team strength data for the season.
+    current_season : str
+        The season in the format "YYYY-YY".
+    df_players : pd.DataFrame, optional
+        Pre-fetched `players_raw.csv` for the season, used to identify players across
+        seasons; fetched on demand if needed (default is None).
+    """
+    player_data = add_dimension_keys(player_data, current_season, df_players)
+    team_data_selected = process_team_data(team_data)
+    team_data_selected["team_id"] = get_team_dimension().get_ids(
+        team_data_selected["name"]
+    )
+    season_data = merge_data(player_data, team_data_selected, current_season)
+
+    # Get the start year of the season (e.g., 2018 from "2018-19")
+    season_start_year = int(current_season[:4])
+
+    # Add 'promoted_from_championship' column
+    season_data = add_promoted_column(season_data, season_start_year)
+
+    # Save the dimensions first, so every saved key has a dimension row
+    get_player_dimension().save()
+    get_team_dimension().save()
+
+    # Save the season's partition as Parquet, plus its CSV file
+    season_data = season_data[get_dataset_config("fpl_data")["schema"].names]
+    write_dataset(season_data, "fpl_data", export_csv=True)
+    print(f"Data for season '{current_season}' has been saved successfully.")
+
+
+def submit_season_downloads(executor, current_season, master_team_list_future):
+    """
+    Submit every download needed for one season to the executor.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        The executor that runs the downloads.
+    current_season : str
+        The season in the format "YYYY-YY".
+    master_team_list_future : concurrent.futures.Future
+        The shared download of `master_team_list.csv`, which is the same for every season.
+
+    Returns
+    -------
+    dict
+        The futures for the season's 'gameweeks', 'players', 'master_team_list' and 'teams' data.
+    """
+    vaastav_url, encoding = get_merged_gw_source(current_season)
+
+    return {
+        "gameweeks": executor.submit(fetch_data_from_url, vaastav_url, encoding),
+        "players": executor.submit(
+            fetch_data_from_url,
+            f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{current_season}/players_raw.csv",
+        ),
+        "master_team_list": master_team_list_future,
+        "teams": executor.submit(load_team_data, current_season),
+    }
+
+
+def assemble_season_data(season_futures, current_season):
+    """
+    Build the player and team data for a season from its completed downloads.
+
+    Parameters
+    ----------
+    season_futures : dict
+        The completed futures returned by `submit_season_downloads`.
+    current_season : str
+        The season in the format "YYYY-YY".
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame, pd.DataFrame)
+        The aggregated player data, the team data and `players_raw.csv` for the season.
+    """
+    df = season_futures["gameweeks"].result()
+    df_players = season_futures["players"].result()
+
+    # The team list is only needed when the gameweek data has no positions
+    df_teams = None
+    if "position" not in df.columns:
+        df_teams = season_futures["master_team_list"].result()
+
+    player_data = process_fpl_data(
+        df, current_season, df_players=df_players, df_teams=df_teams
+    )
+    team_data = season_futures["teams"].result()
+
+    return player_data, team_data, df_players
+
+
+def process_and_merge_season_data_concurrently(start_season, end_season, max_workers):
+    """
+    Process and save data for multiple seasons, downloading all seasons at once.
+
+    Every season's files are submitted to a bounded thread pool up front, and each
+    season's CSV is written as soon as all of its downloads have finished.
+
+    Parameters
+    ----------
+    start_season : int
+        The starting season year (e.g., 2018).
+    end_season : int
+        The ending season year (e.g., 2024).
+    max_workers : int
+        The maximum number of downloads in flight at once.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        master_team_list_future = executor.submit(
+            fetch_data_from_url,
+            "https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/master_team_list.csv",
+        )
+
+        futures_by_season = {}
+        seasons_by_future = {}
+        for season in range(start_season, end_season + 1):
+            current_season = get_season_string(season)
+            season_futures = submit_season_downloads(
+                executor, current_season, master_team_list_future
+            )
+            futures_by_season[current_season] = season_futures
+            for future in season_futures.values():
+                seasons_by_future.setdefault(future, []).append(current_season)
+
+        remaining = {
+            current_season: set(season_futures.values())
+            for current_season, season_futures in futures_by_season.items()
+        }
+
+        for future in as_completed(seasons_by_future):
+            for current_season in seasons_by_future[future]:
+                remaining[current_season].discard(future)
+                if remaining[current_season]:
+                    continue
+
+                try:
+                    player_data, team_data, df_players = assemble_season_data(
+                        futures_by_season[current_season], current_season
+                    )
+                except Exception as e:
+                    print(f"Error fetching data for season {current_season}: {e}")
+                    print(f"No data available for season {current_season}.")
+                    continue
+
+                save_season_data(player_data, team_data, current_season, df_players)
+
+
 # Main function that processes multiple seasons and saves the data
-def process_and_merge_season_data(start_season, end_season):
+def process_and_merge_season_data(start_season, end_season, max_workers=None):
     """
     Process and save data for multiple seasons, each in its own CSV file.
 
@@ -346,28 +1014,21 @@ def process_and_merge_season_data(start_season, end_season):
         The starting season year (e.g., 2018).
     end_season : int
         The ending season year (e.g., 2024).
+    max_workers : int, optional
+        If given, download all seasons concurrently with at most this many requests
+        in flight. If None, seasons are fetched one after another (default is None).
     """
+    if max_workers is not None:
+        process_and_merge_season_data_concurrently(
+            start_season, end_season, max_workers
+        )
+        return
+
     for season in range(start_season, end_season + 1):
         player_data, team_data, current_season = fetch_data_for_season(season)
 
         if player_data is not None and team_data is not None:
-            team_data_selected = process_team_data(team_data)
-            season_data = merge_data(player_data, team_data_selected, current_season)
-
-            # Get the start year of the season (e.g., 2018 from "2018-19")
-            season_start_year = int(current_season[:4])
-
-            # Add 'promoted_from_championship' column
-            season_data = add_promoted_column(
-                season_data, promoted_teams_by_season, season_start_year
-            )
-
-            encoding = "utf-8"
-
-            # Save the data to a CSV file for each season
-            file_path_player = f"data/fpl_data/{current_season}.csv"
-            season_data.to_csv(file_path_player, index=False, encoding=encoding)
-            print(f"CSV file '{file_path_player}' has been created successfully.")
+            save_season_data(player_data, team_data, current_season)
         else:
             print(f"No data available for season {current_season}.")
 
@@ -1,22 +1,19 @@
 import pandas as pd
+from src.tools.storage import read_dataset
 
 
-def load_combine_fpl_data(season_years, export_csv=False):
-    # Initialize an empty list to store the DataFrames
-    data_frames = []
+def load_combine_fpl_data(season_years=None, export_csv=False, columns=None):
+    # Read the requested seasons (or all seasons if None) in a single read
+    filters = None if season_years is None else [("season", "in", season_years)]
+    df = read_dataset("fpl_data", columns=columns, filters=filters)
 
-    # Loop through the season years and read each CSV file using f-strings
-    for season in season_years:
-        file_path = f"data/fpl_data/{season}.csv"
-        df = pd.read_csv(file_path)
-        data_frames.append(df)
+    # Derived columns are only added when their source columns were read
+    if "season" in df.columns:
+        df["season_start"] = df["season"].str[:4].astype(int)
 
-    # Concatenate all DataFrames into a single DataFrame
-    df = pd.concat(data_frames, ignore_index=True)
-    df["season_start"] = df["season"].str[:4].astype(int)
-
-    # Concatenate 'Name' and 'Season' columns
-    df["name_season"] = df["name"] + " (" + df["season"] + ")"
+        # Concatenate 'Name' and 'Season' columns
+        if "name" in df.columns:
+            df["name_season"] = df["name"] + " (" + df["season"].astype(str) + ")"
 
     if export_csv:
         df.to_csv("data/fpl_data/joined/seasons_joined.csv", index=False)
@@ -24,17 +21,8 @@ def load_combine_fpl_data(season_years, export_csv=False):
 
 
 def load_combine_championship_goals_data(season_years, export_csv=False):
-    # Initialize an empty list to store the DataFrames
-    data_frames = []
-
-    # Loop through the season years and read each CSV file using f-strings
-    for season in season_years:
-        file_path = f"data/championship_goals/{season}.csv"
-        df = pd.read_csv(file_path)
-        data_frames.append(df)
-
-    # Concatenate all DataFrames into a single DataFrame
-    df = pd.concat(data_frames, ignore_index=True)
+    # Read the requested seasons in a single read
+    df = read_dataset("championship_goals", filters=[("Season", "in", season_years)])
     df["season_start"] = df["Season"].str[:4].astype(int)
 
     if export_csv:
@@ -43,17 +31,8 @@ def load_combine_championship_goals_data(season_years, export_csv=False):
 
 
 def load_combine_championship_assists_data(season_years, export_csv=False):
-    # Initialize an empty list to store the DataFrames
-    data_frames = []
-
-    # Loop through the season years and read each CSV file using f-strings
-    for season in season_years:
-        file_path = f"data/championship_assists/{season}.csv"
-        df = pd.read_csv(file_path)
-        data_frames.append(df)
-
-    # Concatenate all DataFrames into a single DataFrame
-    df = pd.concat(data_frames, ignore_index=True)
+    # Read the requested seasons in a single read
+    df = read_dataset("championship_assists", filters=[("Season", "in", season_years)])
     df["season_start"] = df["Season"].str[:4].astype(int)
 
     if export_csv:
@@ -0,0 +1,76 @@
+import altair as alt
+
+# Style of the player name labels, offset above their points
+LABEL_STYLE = {"dy": -5, "fontSize": 12, "color": "#767679"}
+
+
+def get_chart_fields(x, y, tooltip, label):
+    """Get the fields a labelled scatter plot reads, each once, in order."""
+    return list(dict.fromkeys([x, y] + list(tooltip) + [label]))
+
+
+def labelled_scatter_plot(df, x, y, tooltip, label, label_groups):
+    """
+    Build a scatter plot with some of its points labelled.
+
+    Only the fields the chart reads are kept, and the points and every label layer
+    share one top-level dataset, so each row is serialized once. Labels are picked
+    from that dataset with a filter transform rather than separate DataFrames.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to plot.
+    x, y : str
+        The fields plotted on each axis.
+    tooltip : list of str
+        The fields shown in each point's tooltip.
+    label : str
+        The field the labelled points are picked by and labelled with.
+    label_groups : list of dict
+        The labelled points, each group with the 'labels' to show and the 'align'
+        and 'dx' offset of their text. Groups without labels are skipped.
+
+    Returns
+    -------
+    alt.LayerChart
+        The points and one text layer per label group.
+    """
+    points = alt.Chart().mark_circle(size=60).encode(x=x, y=y, tooltip=list(tooltip))
+
+    label_layers = [
+        alt.Chart()
+        .transform_filter(alt.FieldOneOfPredicate(field=label, oneOf=group["labels"]))
+        .mark_text(align=group["align"], dx=group["dx"], **LABEL_STYLE)
+        .encode(x=x, y=y, text=label)
+        for group in label_groups
+        if group["labels"]
+    ]
+
+    return alt.layer(
+        points, *label_layers, data=df[get_chart_fields(x, y, tooltip, label)]
+    )
+
+
+def get_chart_spec(chart):
+    """
+    Serialize a chart to the Vega-Lite spec shown with `st.vega_lite_chart`.
+
+    As in `st.altair_chart`, the config added by Altair's theme is left out so the
+    Streamlit theme applies; the charts of the app set no config of their own. The
+    data is inlined as named datasets, so the spec can be cached and shown again
+    without re-serializing the chart.
+
+    Parameters
+    ----------
+    chart : alt.TopLevelMixin
+        The chart.
+
+    Returns
+    -------
+    dict
+        The Vega-Lite spec.
+    """
+    spec = chart.to_dict()
+    spec.pop("config", None)
+    return spec
@@ -0,0 +1,164 @@
+import threading
+
+from src.tools.storage import get_dataset_fingerprint, read_dataset
+
+
+class DatasetCache:
+    """
+    Process-wide cache of the datasets read by the app.
+
+    Streamlit re-runs the app script on every interaction, in every session, but
+    imported modules are loaded once per process. Each dataset is read the first
+    time it is requested and cached with a fingerprint of its files; later requests
+    only stat the files, and re-read the dataset if they have changed. Views derived
+    from a dataset (e.g. a search index) are cached alongside it and rebuilt when it
+    changes.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _get_entry(self, name, columns):
+        key = (name, None if columns is None else tuple(columns))
+        fingerprint = get_dataset_fingerprint(name)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        # Read without the lock, so other datasets are served meanwhile. If the same
+        # dataset is read by two sessions at once, the first entry installed is kept
+        data = read_dataset(name, columns=columns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                entry = {"fingerprint": fingerprint, "data": data, "views": {}}
+                self._entries[key] = entry
+            return entry
+
+    def get(self, name, columns=None):
+        """
+        Get a dataset, reading it only if it is not cached or its files have changed.
+
+        Parameters
+        ----------
+        name : str
+            The dataset name, a key of `DATASETS`.
+        columns : list of str, optional
+            The columns to read. All columns are read if None (default is None).
+
+        Returns
+        -------
+        pd.DataFrame
+            A shallow copy of the cached data. Columns may be added or replaced, but
+            values are shared between sessions and must not be modified in place.
+        """
+        return self._get_entry(name, columns)["data"].copy(deep=False)
+
+    def get_view(self, name, build_view, columns=None):
+        """
+        Get a view of a dataset, building it on first use and when the data changes.
+
+        Parameters
+        ----------
+        name : str
+            The dataset name, a key of `DATASETS`.
+        build_view : callable
+            Function that builds the view from the dataset. Views are cached by this
+            function, so it should be a module-level function.
+        columns : list of str, optional
+            The columns the view is built from. All columns are read if None
+            (default is None).
+
+        Returns
+        -------
+        object
+            The view. It is shared between sessions and must not be modified.
+        """
+        entry = self._get_entry(name, columns)
+        with self._lock:
+            view = entry["views"].get(build_view)
+        if view is not None:
+            return view
+
+        # Built without the lock, like datasets are read
+        view = build_view(entry["data"])
+        with self._lock:
+            return entry["views"].setdefault(build_view, view)
+
+    def info(self):
+        """
+        Get the cache's hit and miss counts and memory use.
+
+        Returns
+        -------
+        dict
+            The number of 'hits' and 'misses' since the process started, the number
+            of cached 'entries', and the memory used by their data in 'bytes'.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "bytes": int(
+                    sum(
+                        entry["data"].memory_usage(deep=True).sum()
+                        for entry in self._entries.values()
+                    )
+                ),
+            }
+
+
+_dataset_cache = DatasetCache()
+
+
+def load_app_dataset(name, columns=None):
+    """
+    Get a dataset from the shared app cache.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+    columns : list of str, optional
+        The columns to read. All columns are read if None (default is None).
+
+    Returns
+    -------
+    pd.DataFrame
+        The dataset. Its values must not be modified in place.
+    """
+    return _dataset_cache.get(name, columns=columns)
+
+
+def get_app_dataset_view(name, build_view, columns=None):
+    """
+    Get a view of a dataset from the shared app cache.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+    build_view : callable
+        Module-level function that builds the view from the dataset.
+    columns : list of str, optional
+        The columns the view is built from (default is None, for all columns).
+
+    Returns
+    -------
+    object
+        The view.
+    """
+    return _dataset_cache.get_view(name, build_view, columns=columns)
+
+
+def get_app_cache_info():
+    """Get the hit and miss counts and memory use of the shared app cache."""
+    return _dataset_cache.info()
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
+from rapidfuzz import fuzz
+
 from src.analysis.championship_player_performance import get_top_ranked_players
+from src.analysis.name_index import NameIndex
 
 
 def top_players_fpl_data(df, filter_position, filter_value_first_gw, top_n):
@@ -48,11 +52,28 @@ def top_players_fpl_data(df, filter_position, filter_value_first_gw, top_n):
         df=df_filtered, metric="total_points", top_n=top_n
     )
 
+    return format_top_players(df_filtered)
+
+
+def format_top_players(df):
+    """
+    Add points per game to FPL player-seasons, and select and rename columns for display.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The FPL player-seasons.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The player-seasons with display column names.
+    """
     # Calculate total points per 38 games
-    df_filtered["total_points_per_38"] = round(df_filtered["total_points"] / 38, 1)
+    df = df.assign(total_points_per_38=round(df["total_points"] / 38, 1))
 
     # Select specific columns
-    df_filtered = df_filtered[
+    df = df[
         [
             "name",
             "season",
@@ -85,6 +106,181 @@ def top_players_fpl_data(df, filter_position, filter_value_first_gw, top_n):
     }
 
     # Rename columns
-    df_filtered = df_filtered.rename(columns=column_rename_dict)
+    return df.rename(columns=column_rename_dict)
+
+
+class TopPlayersIndex:
+    """
+    Pre-sorted index answering `top_players_fpl_data` queries without scanning the data.
+
+    Promoted player-seasons are partitioned by position (and once more for 'All'),
+    and each partition is split into blocks of equal value, each sorted by total
+    points. A query binary-searches the blocks in its value range, cuts each block
+    after its top_n-th score (keeping ties, which are all that can reach the overall
+    top n), and merges what is left. Players with equal points keep their data order.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The FPL player-seasons, with the columns used by `top_players_fpl_data`.
+    """
+
+    def __init__(self, df):
+        df = df[df["promoted_from_championship"] == 1]
+        self.display_df = format_top_players(df)
+
+        positions = df["position"].to_numpy(dtype=object)
+        values = df["value_first_gw"].to_numpy(dtype="float64")
+        points = df["total_points"].to_numpy(dtype="float64")
+
+        self._partitions = {}
+        for position in ["All"] + sorted(pd.unique(positions[pd.notna(positions)])):
+            rows = np.arange(len(df))
+            if position != "All":
+                rows = rows[positions == position]
+            rows = rows[np.lexsort((rows, -points[rows], values[rows]))]
+            block_values, block_starts = np.unique(values[rows], return_index=True)
+            self._partitions[position] = {
+                "rows": rows,
+                "negative_points": -points[rows],
+                "block_values": block_values,
+                "block_bounds": np.append(block_starts, len(rows)),
+            }
+
+    def top_players(self, filter_position, filter_value_first_gw, top_n):
+        """
+        Get the top ranked promoted players of a position and value range.
+
+        Parameters
+        ----------
+        filter_position : str
+            The player position (e.g., 'GK', 'DEF', 'MID', 'FWD'), or 'All'.
+        filter_value_first_gw : tuple of float
+            The lowest and highest value in millions, e.g. (4.5, 6.0).
+        top_n : int
+            The number of top-ranked players to return based on total points,
+            including ties.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The same players and columns as `top_players_fpl_data`.
+        """
+        partition = self._partitions.get(filter_position)
+        if partition is None or top_n < 1:
+            return self.display_df.iloc[:0]
+
+        # The same bounds as the value filter of `top_players_fpl_data`
+        block_values = partition["block_values"]
+        first_block = np.searchsorted(
+            block_values, 10 * filter_value_first_gw[0], side="left"
+        )
+        last_block = np.searchsorted(
+            block_values, 10 * filter_value_first_gw[1], side="right"
+        )
+
+        negative_points = partition["negative_points"]
+        block_bounds = partition["block_bounds"]
+        candidates = []
+        for block in range(first_block, last_block):
+            start, end = block_bounds[block], block_bounds[block + 1]
+            if end - start > top_n:
+                cutoff = negative_points[start + top_n - 1]
+                end = start + np.searchsorted(
+                    negative_points[start:end], cutoff, side="right"
+                )
+            candidates.append(np.arange(start, end))
+        if not candidates:
+            return self.display_df.iloc[:0]
+
+        candidates = np.concatenate(candidates)
+        rows = partition["rows"][candidates]
+        candidate_points = negative_points[candidates]
+        order = np.lexsort((rows, candidate_points))
+        rows = rows[order]
+        candidate_points = candidate_points[order]
+
+        # Keep every player scoring at least the top_n-th highest points
+        if len(rows) > top_n:
+            rows = rows[candidate_points <= candidate_points[top_n - 1]]
+        return self.display_df.iloc[rows]
+
+
+def build_top_players_index(fpl_data):
+    """Build the `TopPlayersIndex` of the app's FPL data."""
+    return TopPlayersIndex(fpl_data)
+
+
+def build_player_name_index(fpl_data):
+    """
+    Build the name index searched by `search_players_fpl_data`.
+
+    Parameters
+    ----------
+    fpl_data : pandas.DataFrame
+        The FPL player-seasons, with a 'name' column.
+
+    Returns
+    -------
+    NameIndex
+        The index over the player-seasons.
+    """
+    return NameIndex(fpl_data)
+
+
+def search_players_fpl_data(name_index, query, limit=10):
+    """
+    Search FPL player-seasons by player name, tolerating accents, typos and partial names.
+
+    Parameters
+    ----------
+    name_index : NameIndex
+        Index over the FPL player-seasons, built from the app's FPL data.
+    query : str
+        The player name searched for, e.g. 'mitrovic'.
+    limit : int, optional
+        The maximum number of distinct players returned (default is 10).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Every season of the matching players, best match first, with renamed columns.
+    """
+    df_matches = name_index.search(query, limit=limit, min_score=60, scorer=fuzz.WRatio)
+
+    # Show the seasons of each player in order
+    df_matches = df_matches.sort_values(
+        ["score", "name", "season"], ascending=[False, True, True], kind="stable"
+    )
+
+    df_matches = df_matches[
+        [
+            "name",
+            "season",
+            "team",
+            "position",
+            "value_first_gw",
+            "total_points",
+            "goals_scored",
+            "assists",
+            "minutes_played",
+            "promoted_from_championship",
+        ]
+    ]
+
+    column_rename_dict = {
+        "name": "Player",
+        "season": "Season",
+        "team": "Team",
+        "position": "Position",
+        "value_first_gw": "Value",
+        "total_points": "Total Points",
+        "goals_scored": "Goals",
+        "assists": "Assists",
+        "minutes_played": "Minutes Played",
+        "promoted_from_championship": "Promoted Team",
+    }
+    df_matches = df_matches.rename(columns=column_rename_dict)
+    df_matches["Promoted Team"] = df_matches["Promoted Team"] == 1
 
-    return df_filtered
+    return df_matches
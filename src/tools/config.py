@@ -0,0 +1,222 @@
+import os
+import threading
+
+from src.tools.yaml_loader import load_yaml_file
+
+CONF_DIR = "conf"
+
+
+class ConfigRegistry:
+    """
+    Lazily loaded, cached YAML configuration.
+
+    Each `conf/<name>.yaml` file is parsed the first time it is requested and cached
+    with its modification time. Later requests only stat the file, and re-parse it if
+    it has changed. Indexed views derived from a file (e.g. a dict keyed by season)
+    are cached alongside it and rebuilt when the file changes.
+
+    Parameters
+    ----------
+    conf_dir : str, optional
+        Directory holding the YAML files (default is 'conf').
+    """
+
+    def __init__(self, conf_dir=CONF_DIR):
+        self.conf_dir = conf_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _get_entry(self, name):
+        path = os.path.join(self.conf_dir, f"{name}.yaml")
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry["mtime"] != mtime:
+                entry = {"mtime": mtime, "data": load_yaml_file(path), "views": {}}
+                self._entries[name] = entry
+            return entry
+
+    def get(self, name):
+        """
+        Get the parsed contents of a configuration file.
+
+        Parameters
+        ----------
+        name : str
+            The file name without extension, e.g. 'parameters'.
+
+        Returns
+        -------
+        object
+            The parsed YAML. It is shared between callers and must not be modified.
+        """
+        return self._get_entry(name)["data"]
+
+    def get_view(self, name, build_view):
+        """
+        Get an indexed view of a configuration file, building it on first use.
+
+        Parameters
+        ----------
+        name : str
+            The file name without extension, e.g. 'estimated_team_strength'.
+        build_view : callable
+            Function that builds the view from the parsed YAML. Views are cached by
+            this function, so it should be a module-level function.
+
+        Returns
+        -------
+        object
+            The view. It is shared between callers and must not be modified.
+        """
+        entry = self._get_entry(name)
+        with self._lock:
+            if build_view not in entry["views"]:
+                entry["views"][build_view] = build_view(entry["data"])
+            return entry["views"][build_view]
+
+
+_config_registry = ConfigRegistry()
+
+
+def get_config(name):
+    """
+    Get the parsed contents of `conf/<name>.yaml` from the shared registry.
+
+    Parameters
+    ----------
+    name : str
+        The file name without extension, e.g. 'parameters'.
+
+    Returns
+    -------
+    object
+        The parsed YAML.
+    """
+    return _config_registry.get(name)
+
+
+def get_parameter(key):
+    """
+    Get a value from `conf/parameters.yaml`.
+
+    Parameters
+    ----------
+    key : str
+        The parameter name, e.g. 'minutes_played_gameweek_min'.
+
+    Returns
+    -------
+    object
+        The parameter value.
+    """
+    return get_config("parameters")[key]
+
+
+def index_team_strength(estimated_team_strength):
+    """Index the estimated team strengths by season, then team name."""
+    strength_by_season = {}
+    for item in estimated_team_strength:
+        season_strengths = strength_by_season.setdefault(item["season"], {})
+        season_strengths[item["team_name"]] = item["team_strength"]
+    return strength_by_season
+
+
+def index_promoted_teams(promoted_teams_by_season):
+    """Index the promoted teams as a set for each season start year."""
+    return {
+        season: frozenset(teams) for season, teams in promoted_teams_by_season.items()
+    }
+
+
+def get_team_strengths(season):
+    """
+    Get the estimated strength of every team in a season.
+
+    Parameters
+    ----------
+    season : str
+        The season, e.g. '2018-19'.
+
+    Returns
+    -------
+    dict
+        Team strength by team name, in the order of `conf/estimated_team_strength.yaml`.
+        Empty if the season has no estimates.
+    """
+    strength_by_season = _config_registry.get_view(
+        "estimated_team_strength", index_team_strength
+    )
+    return strength_by_season.get(season, {})
+
+
+def get_team_strength(season, team_name):
+    """
+    Get the estimated strength of a team in a season.
+
+    Parameters
+    ----------
+    season : str
+        The season, e.g. '2018-19'.
+    team_name : str
+        The team name, e.g. 'Arsenal'.
+
+    Returns
+    -------
+    int
+        The estimated team strength, or None if there is no estimate.
+    """
+    return get_team_strengths(season).get(team_name)
+
+
+def get_promoted_teams_by_season():
+    """
+    Get the teams promoted from the Championship, by season start year.
+
+    Returns
+    -------
+    dict
+        A frozenset of promoted team names for each season start year.
+    """
+    return _config_registry.get_view("promoted_teams_by_season", index_promoted_teams)
+
+
+def get_promoted_teams(season_start_year):
+    """
+    Get the teams promoted from the Championship for a season.
+
+    Parameters
+    ----------
+    season_start_year : int
+        The start year of the season (e.g., 2021 for the 2021-22 season).
+
+    Returns
+    -------
+    frozenset
+        The promoted team names, empty if the season is not listed.
+    """
+    return get_promoted_teams_by_season().get(season_start_year, frozenset())
+
+
+def index_player_overrides(player_overrides):
+    """Index the manual player overrides by (Championship name, team, season start)."""
+    return {
+        (item["player"], item["team"], int(item["season_start"])): item["fpl_name"]
+        for item in player_overrides or []
+    }
+
+
+def get_player_overrides():
+    """
+    Get the confirmed manual matches of Championship players to FPL names.
+
+    Returns
+    -------
+    dict
+        The FPL name (None for a confirmed non-match) by (Championship name, team,
+        FPL season start year), from `conf/player_resolution_overrides.yaml`.
+    """
+    return _config_registry.get_view(
+        "player_resolution_overrides", index_player_overrides
+    )
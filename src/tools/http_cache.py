@@ -0,0 +1,310 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+import pandas as pd
+import requests
+
+from src.tools.config import get_config
+
+
+class HTTPCache:
+    """
+    On-disk HTTP response cache with conditional revalidation and LRU eviction.
+
+    Response bodies are stored once per content hash under `objects/`, and an index
+    maps each URL to its body hash and validators (ETag/Last-Modified). Cached
+    entries are revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    file costs a single 304 response instead of a full download. Access times of
+    entries served without revalidation are only kept in memory, and written with
+    the index at most every `flush_interval` seconds, on the next download or on
+    `flush`.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory in which the index and the response bodies are stored.
+    max_size_bytes : int
+        Maximum total size of the stored bodies. The least recently used URLs are
+        evicted once this is exceeded.
+    max_age : float, optional
+        Number of seconds for which an entry is served without revalidation. If None,
+        every request is revalidated (default is None).
+    offline : bool, optional
+        If True, only serve from the cache and never touch the network (default is False).
+    session : requests.Session, optional
+        The session used for requests. A new session is created if None (default is None).
+    timeout : float, optional
+        The timeout in seconds of each request (default is 30).
+    flush_interval : float, optional
+        The minimum number of seconds between writes of the index for access times
+        alone (default is 60).
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_size_bytes,
+        max_age=None,
+        offline=False,
+        session=None,
+        timeout=30,
+        flush_interval=60,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self.session = session if session is not None else requests.Session()
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._unsaved_accesses = False
+        self._saved_at = time.time()
+        self._objects_dir = os.path.join(cache_dir, "objects")
+        self._index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return {}
+        with open(self._index_path, "r") as file:
+            return json.load(file)
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._index, file, indent=1)
+        os.replace(tmp_path, self._index_path)
+        self._unsaved_accesses = False
+        self._saved_at = time.time()
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects_dir, digest)
+
+    def _write_object(self, response):
+        """Stream a response body to disk and return its content hash and size."""
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(
+            self._objects_dir, f"{os.getpid()}-{threading.get_ident()}.tmp"
+        )
+        with open(tmp_path, "wb") as file:
+            for block in response.iter_content(chunk_size=1024 * 1024):
+                digest.update(block)
+                size += len(block)
+                file.write(block)
+        digest = digest.hexdigest()
+        os.replace(tmp_path, self._object_path(digest))
+        return digest, size
+
+    def _evict(self, keep):
+        """Drop least recently used URLs until the stored bodies fit in the size limit."""
+        sizes = {entry["sha256"]: entry["size"] for entry in self._index.values()}
+        total_size = sum(sizes.values())
+        by_last_access = sorted(
+            self._index.items(), key=lambda item: item[1]["last_access"]
+        )
+
+        for url, entry in by_last_access:
+            if total_size <= self.max_size_bytes:
+                break
+            if url == keep:
+                continue
+            del self._index[url]
+            digest = entry["sha256"]
+            if all(other["sha256"] != digest for other in self._index.values()):
+                total_size -= sizes.pop(digest)
+                self._remove_object_if_unused(digest)
+
+    def _remove_object_if_unused(self, digest):
+        # Bodies are shared between URLs with identical content
+        if all(entry["sha256"] != digest for entry in self._index.values()):
+            if os.path.exists(self._object_path(digest)):
+                os.remove(self._object_path(digest))
+
+    def _store(self, url, response, digest, size):
+        now = time.time()
+        previous = self._index.get(url)
+        self._index[url] = {
+            "sha256": digest,
+            "size": size,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "validated_at": now,
+            "last_access": now,
+        }
+        # The URL's previous body is dropped when its content has changed
+        if previous is not None and previous["sha256"] != digest:
+            self._remove_object_if_unused(previous["sha256"])
+        self._evict(keep=url)
+
+    def _touch(self, url, validated=False):
+        entry = self._index[url]
+        entry["last_access"] = time.time()
+        if validated:
+            entry["validated_at"] = entry["last_access"]
+        self._unsaved_accesses = True
+
+    def flush(self):
+        """Write access times kept only in memory to the index."""
+        with self._lock:
+            if self._unsaved_accesses:
+                self._save_index()
+
+    def _is_fresh(self, entry):
+        if self.max_age is None:
+            return False
+        return time.time() - entry["validated_at"] < self.max_age
+
+    def _conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        elif entry.get("fetched_at"):
+            headers["If-Modified-Since"] = formatdate(entry["fetched_at"], usegmt=True)
+        return headers
+
+    def get_path(self, url):
+        """
+        Get the path of the cached body for a URL, downloading or revalidating it first.
+
+        Parameters
+        ----------
+        url : str
+            The URL to fetch.
+
+        Returns
+        -------
+        str
+            The path of the file holding the response body.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the cache is offline and the URL has not been cached.
+        requests.HTTPError
+            If the server responds with an error status.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is not None and (self.offline or self._is_fresh(entry)):
+                self._touch(url)
+                if time.time() - self._saved_at >= self.flush_interval:
+                    self._save_index()
+                return self._object_path(entry["sha256"])
+
+        if entry is None and self.offline:
+            raise FileNotFoundError(
+                f"{url} is not in the HTTP cache and offline mode is enabled."
+            )
+
+        headers = self._conditional_headers(entry) if entry is not None else {}
+        try:
+            response = self.session.get(
+                url, headers=headers, stream=True, timeout=self.timeout
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            # Serve the stale copy rather than failing when the network is down
+            if entry is None:
+                raise
+            response = None
+
+        if response is not None:
+            with response:
+                if response.status_code != 304:
+                    response.raise_for_status()
+                    # Bodies are streamed to disk outside the lock so downloads can
+                    # overlap
+                    digest, size = self._write_object(response)
+
+        with self._lock:
+            if response is not None and response.status_code != 304:
+                self._store(url, response, digest, size)
+            elif url in self._index:
+                self._touch(url, validated=response is not None)
+
+            # The entry may have been evicted by another thread while revalidating
+            if url in self._index:
+                self._save_index()
+                return self._object_path(self._index[url]["sha256"])
+
+        return self.get_path(url)
+
+    def get(self, url):
+        """
+        Get the response body for a URL through the cache.
+
+        Parameters
+        ----------
+        url : str
+            The URL to fetch.
+
+        Returns
+        -------
+        bytes
+            The response body.
+        """
+        with open(self.get_path(url), "rb") as file:
+            return file.read()
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    Get the shared HTTP cache, configured from `conf/http_cache.yaml`.
+
+    Returns
+    -------
+    HTTPCache
+        The process-wide HTTP cache.
+    """
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            config = get_config("http_cache")
+            _http_cache = HTTPCache(
+                cache_dir=config["cache_dir"],
+                max_size_bytes=config["max_size_mb"] * 1024 * 1024,
+                max_age=config["max_age_seconds"],
+                offline=config["offline"],
+                timeout=config["timeout_seconds"],
+            )
+            # Keep the access times of the last cache hits
+            atexit.register(_http_cache.flush)
+    return _http_cache
+
+
+def read_csv_from_url(url, cache=None, **kwargs):
+    """
+    Read a CSV file from a URL through the HTTP cache.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the CSV file.
+    cache : HTTPCache, optional
+        The cache to read through. The shared cache is used if None (default is None).
+    **kwargs
+        Extra keyword arguments passed to `pd.read_csv`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The contents of the CSV file.
+    """
+    if cache is None:
+        cache = get_http_cache()
+    return pd.read_csv(cache.get_path(url), **kwargs)
@@ -0,0 +1,348 @@
+import pandas as pd
+import pyarrow as pa
+
+# Schemas of the datasets as stored in Parquet
+
+FPL_DATA_SCHEMA = pa.schema(
+    [
+        ("name", pa.string()),
+        ("team", pa.string()),
+        ("total_points", pa.int64()),
+        ("position", pa.string()),
+        ("goals_scored", pa.int64()),
+        ("assists", pa.int64()),
+        ("clean_sheets", pa.int64()),
+        ("yellow_cards", pa.int64()),
+        ("red_cards", pa.int64()),
+        ("goals_conceded", pa.int64()),
+        ("own_goals", pa.int64()),
+        ("penalties_missed", pa.int64()),
+        ("penalties_saved", pa.int64()),
+        ("saves", pa.int64()),
+        ("bonus_points", pa.int64()),
+        ("value_first_gw", pa.int64()),
+        ("count_gws_min_minutes", pa.float64()),
+        ("minutes_played", pa.int64()),
+        ("min_gw", pa.int64()),
+        ("team_strength", pa.float64()),
+        ("team_strength_overall_home", pa.float64()),
+        ("team_strength_overall_away", pa.float64()),
+        ("team_strength_attack_home", pa.float64()),
+        ("team_strength_attack_away", pa.float64()),
+        ("team_strength_defence_home", pa.float64()),
+        ("team_strength_defence_away", pa.float64()),
+        ("season", pa.string()),
+        ("promoted_from_championship", pa.int64()),
+        ("player_id", pa.int64()),
+        ("team_id", pa.int64()),
+    ]
+)
+
+DIM_PLAYER_SCHEMA = pa.schema(
+    [
+        ("player_id", pa.int64()),
+        ("name", pa.string()),
+        ("team", pa.string()),
+        ("fpl_code", pa.int64()),
+    ]
+)
+
+DIM_TEAM_SCHEMA = pa.schema(
+    [
+        ("team_id", pa.int64()),
+        ("team_name", pa.string()),
+    ]
+)
+
+
+def championship_schema(metric):
+    """Get the schema of the scraped Championship goals or assists tables."""
+    return pa.schema(
+        [
+            ("Player", pa.string()),
+            ("Country", pa.string()),
+            ("Team", pa.string()),
+            (metric, pa.int64()),
+            ("Season", pa.string()),
+        ]
+    )
+
+
+def championship_fpl_points_schema(metric):
+    """Get the schema of the Championship goals or assists vs FPL points tables."""
+    return pa.schema(
+        [
+            ("Player", pa.string()),
+            ("Team", pa.string()),
+            ("Position", pa.string()),
+            ("Championship Season", pa.string()),
+            (f"Championship {metric}", pa.int64()),
+            ("FPL Season", pa.string()),
+            ("FPL Points", pa.float64()),
+            ("FPL Goals", pa.float64()),
+            ("FPL Assists", pa.float64()),
+            ("FPL Value", pa.float64()),
+            ("Player (FPL Season)", pa.string()),
+            ("Player (FPL Season) - Short", pa.string()),
+        ]
+    )
+
+
+TEAM_PERFORMANCE_SCHEMA = pa.schema(
+    [
+        ("Team", pa.string()),
+        ("Season", pa.string()),
+        ("Total Points", pa.int64()),
+        ("GK Points", pa.int64()),
+        ("DEF Points", pa.int64()),
+        ("MID Points", pa.int64()),
+        ("FWD Points", pa.int64()),
+        ("Goals Scored", pa.int64()),
+        ("Assists", pa.int64()),
+        ("Clean Sheets", pa.int64()),
+        ("Team (Season)", pa.string()),
+    ]
+)
+
+TEST_RESULT_SCHEMA = pa.schema(
+    [
+        ("Position", pa.string()),
+        ("Value", pa.int64()),
+        ("Avg. Score Promoted", pa.float64()),
+        ("Avg. Score Not Promoted", pa.float64()),
+        ("Difference", pa.float64()),
+        ("Statistically Significant", pa.string()),
+        ("Num. Players Promoted", pa.int64()),
+        ("Num. Players Not Promoted", pa.int64()),
+        ("Test Statistic", pa.float64()),
+        ("P-Value", pa.float64()),
+    ]
+)
+
+TEST_RESAMPLING_RESULT_SCHEMA = pa.schema(
+    list(TEST_RESULT_SCHEMA) + [("CI Lower", pa.float64()), ("CI Upper", pa.float64())]
+)
+
+TEST_STATISTICS_KEY_FIELDS = [
+    ("position", pa.string()),
+    ("value_first_gw", pa.int64()),
+    ("promoted_from_championship", pa.int64()),
+    ("team_strength", pa.float64()),
+    ("season", pa.string()),
+]
+
+TEST_STATISTICS_SCHEMA = pa.schema(
+    TEST_STATISTICS_KEY_FIELDS
+    + [
+        ("count", pa.int64()),
+        ("points_sum", pa.int64()),
+        ("points_sum_squares", pa.int64()),
+    ]
+)
+
+TEST_POINTS_COUNTS_SCHEMA = pa.schema(
+    TEST_STATISTICS_KEY_FIELDS
+    + [
+        ("total_points", pa.int64()),
+        ("count", pa.int64()),
+    ]
+)
+
+TEST_THRESHOLD_SWEEP_SCHEMA = pa.schema(
+    [
+        ("team_strength_threshold", pa.int64()),
+        ("sample_size_threshold", pa.int64()),
+        ("test", pa.string()),
+        ("position", pa.string()),
+        ("value_first_gw", pa.int64()),
+        ("sample_size_promoted", pa.int64()),
+        ("sample_size_not_promoted", pa.int64()),
+        ("average_score_promoted", pa.float64()),
+        ("average_score_not_promoted", pa.float64()),
+        ("difference", pa.float64()),
+        ("test_stat", pa.float64()),
+        ("p_value", pa.float64()),
+        ("statistically_significant", pa.string()),
+    ]
+)
+
+# In-memory dtypes of the datasets, applied by `read_dataset`. Strings repeated across
+# rows (teams, positions, seasons) are categorical, other strings (player names) are
+# Arrow-backed, and integer stats use the smallest integer type holding their range.
+# Points stay 32-bit so sums of squares do not overflow. Integer stats with missing
+# values are float32, as nullable integers cannot be used in boolean masks; integer
+# keys, which are only joined on, are nullable integers.
+CATEGORY = "category"
+STRING = pd.StringDtype("pyarrow")
+
+FPL_DATA_DTYPES = {
+    "name": STRING,
+    "team": CATEGORY,
+    "total_points": "int32",
+    "position": CATEGORY,
+    "goals_scored": "int16",
+    "assists": "int16",
+    "clean_sheets": "int16",
+    "yellow_cards": "int16",
+    "red_cards": "int16",
+    "goals_conceded": "int16",
+    "own_goals": "int16",
+    "penalties_missed": "int16",
+    "penalties_saved": "int16",
+    "saves": "int16",
+    "bonus_points": "int16",
+    # 'value_first_gw' stays int64, as it is carried into the test results
+    "count_gws_min_minutes": "float32",
+    "minutes_played": "int32",
+    "min_gw": "int16",
+    "team_strength": "float32",
+    "team_strength_overall_home": "float32",
+    "team_strength_overall_away": "float32",
+    "team_strength_attack_home": "float32",
+    "team_strength_attack_away": "float32",
+    "team_strength_defence_home": "float32",
+    "team_strength_defence_away": "float32",
+    "season": CATEGORY,
+    "promoted_from_championship": "int8",
+    "player_id": "int32",
+    "team_id": "Int16",
+}
+
+DIM_PLAYER_DTYPES = {
+    "player_id": "int32",
+    "name": STRING,
+    "team": CATEGORY,
+}
+
+DIM_TEAM_DTYPES = {
+    "team_id": "int16",
+    "team_name": STRING,
+}
+
+
+def championship_dtypes(metric):
+    """Get the in-memory dtypes of the scraped Championship goals or assists tables."""
+    # The goals or assists stay int64, as the order of players tied on them in the
+    # published tables depends on the dtype they are sorted as
+    return {
+        "Player": STRING,
+        "Country": CATEGORY,
+        "Team": CATEGORY,
+        "Season": CATEGORY,
+    }
+
+
+def championship_fpl_points_dtypes(metric):
+    """Get the in-memory dtypes of the Championship vs FPL points tables."""
+    return {
+        "Player": STRING,
+        "Team": CATEGORY,
+        "Position": CATEGORY,
+        "Championship Season": CATEGORY,
+        f"Championship {metric}": "int16",
+        "FPL Season": CATEGORY,
+        "Player (FPL Season)": STRING,
+        "Player (FPL Season) - Short": STRING,
+    }
+
+
+TEAM_PERFORMANCE_DTYPES = {
+    "Team": CATEGORY,
+    "Season": CATEGORY,
+    "Total Points": "int16",
+    "GK Points": "int16",
+    "DEF Points": "int16",
+    "MID Points": "int16",
+    "FWD Points": "int16",
+    "Goals Scored": "int16",
+    "Assists": "int16",
+    "Clean Sheets": "int16",
+    "Team (Season)": STRING,
+}
+
+TEST_RESULT_DTYPES = {
+    "Value": "int16",
+    "Num. Players Promoted": "int32",
+    "Num. Players Not Promoted": "int32",
+}
+
+TEST_STATISTICS_KEY_DTYPES = {
+    "position": CATEGORY,
+    "value_first_gw": "int16",
+    "promoted_from_championship": "int8",
+    "team_strength": "float32",
+    "season": CATEGORY,
+}
+
+TEST_STATISTICS_DTYPES = {
+    **TEST_STATISTICS_KEY_DTYPES,
+    "count": "int32",
+    "points_sum": "int32",
+}
+
+TEST_POINTS_COUNTS_DTYPES = {
+    **TEST_STATISTICS_KEY_DTYPES,
+    "total_points": "int32",
+    "count": "int32",
+}
+
+TEST_THRESHOLD_SWEEP_DTYPES = {
+    "team_strength_threshold": "int8",
+    "sample_size_threshold": "int16",
+    "test": CATEGORY,
+    "position": CATEGORY,
+    "value_first_gw": "int16",
+    "sample_size_promoted": "int32",
+    "sample_size_not_promoted": "int32",
+    "statistically_significant": CATEGORY,
+}
+
+
+def apply_dtypes(df, dtypes):
+    """
+    Cast the columns of a DataFrame to their in-memory dtypes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to cast.
+    dtypes : dict
+        The dtype of each column. Columns not in `df` are skipped, and columns not
+        in `dtypes` are left as they are.
+
+    Returns
+    -------
+    pd.DataFrame
+        The data with cast columns.
+    """
+    dtypes = {column: dtype for column, dtype in dtypes.items() if column in df}
+    return df.astype(dtypes)
+
+
+def get_memory_usage(df):
+    """
+    Get the memory used by each column of a DataFrame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to measure.
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'column', 'dtype' and 'bytes' of each column, including the memory of
+        the strings it holds, sorted by bytes in descending order.
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    return (
+        pd.DataFrame(
+            {
+                "column": usage.index,
+                "dtype": [str(dtype) for dtype in df.dtypes[usage.index]],
+                "bytes": usage.to_numpy(),
+            }
+        )
+        .sort_values("bytes", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,171 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that spaces out requests to an average rate.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second, i.e. the sustained number of requests per second.
+    capacity : int, optional
+        The maximum number of tokens, i.e. the largest burst allowed (default is 1).
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter, keeping one token bucket for each host requested.
+
+    Parameters
+    ----------
+    rate : float
+        The sustained number of requests per second allowed to each host.
+    capacity : int, optional
+        The largest burst of requests allowed to each host (default is 1).
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is allowed."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            bucket = self._buckets[host]
+        bucket.acquire()
+
+
+def create_session(pool_size=10):
+    """
+    Create a session that keeps connections open and reuses them across requests.
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        The number of connections kept per host, which should be at least the number
+        of threads sharing the session (default is 10).
+
+    Returns
+    -------
+    requests.Session
+        The pooled session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_retry_delay(response, attempt, backoff):
+    """
+    Get the time to wait before retrying, honouring a Retry-After header if sent.
+
+    Parameters
+    ----------
+    response : requests.Response or None
+        The failed response, or None if the request raised an error.
+    attempt : int
+        The number of the failed attempt, starting at 0.
+    backoff : float
+        The delay in seconds before the first retry, doubled on each attempt.
+
+    Returns
+    -------
+    float
+        The delay in seconds.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return backoff * 2**attempt
+
+
+def fetch_with_retry(
+    session, url, rate_limiter=None, retries=3, backoff=1.0, timeout=30
+):
+    """
+    Fetch a URL, waiting for the rate limiter and retrying transient failures.
+
+    Parameters
+    ----------
+    session : requests.Session
+        The session used for the request.
+    url : str
+        The URL to fetch.
+    rate_limiter : HostRateLimiter, optional
+        Limiter acquired before every attempt, including retries (default is None).
+    retries : int, optional
+        The number of retries after the first attempt (default is 3).
+    backoff : float, optional
+        The delay in seconds before the first retry, doubled on each retry (default is 1.0).
+    timeout : float, optional
+        The timeout in seconds for each attempt (default is 30).
+
+    Returns
+    -------
+    requests.Response
+        The successful response.
+
+    Raises
+    ------
+    requests.RequestException
+        If the last attempt fails.
+    """
+    for attempt in range(retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)
+
+        response = None
+        try:
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError):
+            is_retryable = (
+                response is None or response.status_code in RETRY_STATUS_CODES
+            )
+            if attempt == retries or not is_retryable:
+                raise
+
+        time.sleep(get_retry_delay(response, attempt, backoff))
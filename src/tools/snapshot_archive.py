@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+SNAPSHOT_ROOT = "data/html_snapshots"
+
+
+class SnapshotArchive:
+    """
+    Archive of raw scraped pages, compressed and stored once per content hash.
+
+    Each page body is gzipped to `objects/<sha256>.html.gz`, and an index keeps the
+    fetch metadata of every snapshot (URL, time, status, validators, encoding and
+    hash) under a key such as 'goals/2023-2024'. Re-fetching an unchanged page adds a
+    snapshot to the index without storing the body again.
+
+    Parameters
+    ----------
+    archive_dir : str
+        Directory in which the index and the compressed bodies are stored.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self._lock = threading.Lock()
+        self._objects_dir = os.path.join(archive_dir, "objects")
+        self._index_path = os.path.join(archive_dir, "index.json")
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return {}
+        with open(self._index_path, "r") as file:
+            return json.load(file)
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._index, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._index_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects_dir, f"{digest}.html.gz")
+
+    def add(self, key, response):
+        """
+        Add a fetched page to the archive.
+
+        Parameters
+        ----------
+        key : str
+            The archive key of the page, e.g. 'goals/2023-2024'.
+        response : requests.Response
+            The successful response holding the page.
+
+        Returns
+        -------
+        dict
+            The metadata of the new snapshot.
+        """
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+
+        if not os.path.exists(object_path):
+            os.makedirs(self._objects_dir, exist_ok=True)
+            tmp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            # mtime=0 keeps the compressed file identical for identical pages
+            with open(tmp_path, "wb") as file:
+                file.write(gzip.compress(body, mtime=0))
+            os.replace(tmp_path, object_path)
+
+        snapshot = {
+            "url": response.url,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "status_code": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            # The encoding `response.text` was decoded with
+            "encoding": response.encoding or response.apparent_encoding,
+            "sha256": digest,
+            "size": len(body),
+            "compressed_size": os.path.getsize(object_path),
+        }
+
+        with self._lock:
+            self._index.setdefault(key, []).append(snapshot)
+            self._save_index()
+        return snapshot
+
+    def keys(self):
+        """Get the keys of every archived page."""
+        with self._lock:
+            return sorted(self._index)
+
+    def latest(self, key):
+        """
+        Get the metadata of the most recent snapshot of a page.
+
+        Parameters
+        ----------
+        key : str
+            The archive key of the page, e.g. 'goals/2023-2024'.
+
+        Returns
+        -------
+        dict
+            The snapshot metadata, or None if the page has not been archived.
+        """
+        with self._lock:
+            snapshots = self._index.get(key)
+            return dict(snapshots[-1]) if snapshots else None
+
+    def get_path(self, snapshot):
+        """Get the path of the compressed body of a snapshot."""
+        return self._object_path(snapshot["sha256"])
+
+    def read_text(self, snapshot):
+        """
+        Read the page of a snapshot, decoded as it was when fetched.
+
+        Parameters
+        ----------
+        snapshot : dict
+            The snapshot metadata, as returned by `latest`.
+
+        Returns
+        -------
+        str
+            The HTML content of the page.
+        """
+        return read_snapshot_text(self.get_path(snapshot), snapshot["encoding"])
+
+
+def read_snapshot_text(object_path, encoding):
+    """
+    Read and decode a compressed page body.
+
+    Parameters
+    ----------
+    object_path : str
+        The path of the gzipped body.
+    encoding : str
+        The encoding used to decode the body.
+
+    Returns
+    -------
+    str
+        The decoded page.
+    """
+    with gzip.open(object_path, "rb") as file:
+        return file.read().decode(encoding or "utf-8", errors="replace")
+
+
+_snapshot_archive = None
+_snapshot_archive_lock = threading.Lock()
+
+
+def get_snapshot_archive():
+    """
+    Get the shared snapshot archive, stored under `SNAPSHOT_ROOT`.
+
+    Returns
+    -------
+    SnapshotArchive
+        The process-wide snapshot archive.
+    """
+    global _snapshot_archive
+    with _snapshot_archive_lock:
+        if _snapshot_archive is None:
+            _snapshot_archive = SnapshotArchive(SNAPSHOT_ROOT)
+    return _snapshot_archive
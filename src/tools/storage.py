@@ -0,0 +1,382 @@
+import glob
+import operator
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.tools.schema import (
+    DIM_PLAYER_DTYPES,
+    DIM_PLAYER_SCHEMA,
+    DIM_TEAM_DTYPES,
+    DIM_TEAM_SCHEMA,
+    FPL_DATA_DTYPES,
+    FPL_DATA_SCHEMA,
+    TEAM_PERFORMANCE_DTYPES,
+    TEAM_PERFORMANCE_SCHEMA,
+    TEST_POINTS_COUNTS_DTYPES,
+    TEST_POINTS_COUNTS_SCHEMA,
+    TEST_RESAMPLING_RESULT_SCHEMA,
+    TEST_RESULT_DTYPES,
+    TEST_RESULT_SCHEMA,
+    TEST_STATISTICS_DTYPES,
+    TEST_STATISTICS_SCHEMA,
+    TEST_THRESHOLD_SWEEP_DTYPES,
+    TEST_THRESHOLD_SWEEP_SCHEMA,
+    apply_dtypes,
+    championship_dtypes,
+    championship_fpl_points_dtypes,
+    championship_fpl_points_schema,
+    championship_schema,
+)
+
+PARQUET_ROOT = "data/parquet"
+
+# Datasets readable and writable through this module. 'schema' is the stored schema
+# and 'dtypes' the in-memory dtypes (see `src.tools.schema`). 'csv_path' is the CSV
+# export location, with '{partition}' replaced by the partition value for partitioned
+# data.
+DATASETS = {
+    "fpl_data": {
+        "schema": FPL_DATA_SCHEMA,
+        "dtypes": FPL_DATA_DTYPES,
+        "partition_column": "season",
+        "csv_path": "data/fpl_data/{partition}.csv",
+    },
+    "championship_goals": {
+        "schema": championship_schema("Goals"),
+        "dtypes": championship_dtypes("Goals"),
+        "partition_column": "Season",
+        "csv_path": "data/championship_goals/{partition}.csv",
+    },
+    "championship_assists": {
+        "schema": championship_schema("Assists"),
+        "dtypes": championship_dtypes("Assists"),
+        "partition_column": "Season",
+        "csv_path": "data/championship_assists/{partition}.csv",
+    },
+    "goals_championship_fpl_points": {
+        "schema": championship_fpl_points_schema("Goals"),
+        "dtypes": championship_fpl_points_dtypes("Goals"),
+        "partition_column": None,
+        "csv_path": "data/analysis/goals_championship_fpl_points.csv",
+    },
+    "assists_championship_fpl_points": {
+        "schema": championship_fpl_points_schema("Assists"),
+        "dtypes": championship_fpl_points_dtypes("Assists"),
+        "partition_column": None,
+        "csv_path": "data/analysis/assists_championship_fpl_points.csv",
+    },
+    "team_performance_fpl_points": {
+        "schema": TEAM_PERFORMANCE_SCHEMA,
+        "dtypes": TEAM_PERFORMANCE_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/analysis/team_performance_fpl_points.csv",
+    },
+    "test_welchs_ttest": {
+        "schema": TEST_RESULT_SCHEMA,
+        "dtypes": TEST_RESULT_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/analysis/test_welchs_ttest.csv",
+    },
+    "test_mw_u_test": {
+        "schema": TEST_RESULT_SCHEMA,
+        "dtypes": TEST_RESULT_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/analysis/test_mw_u_test.csv",
+    },
+    "test_permutation": {
+        "schema": TEST_RESAMPLING_RESULT_SCHEMA,
+        "dtypes": TEST_RESULT_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/analysis/test_permutation.csv",
+    },
+    "test_threshold_sweep": {
+        "schema": TEST_THRESHOLD_SWEEP_SCHEMA,
+        "dtypes": TEST_THRESHOLD_SWEEP_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/analysis/test_threshold_sweep.csv",
+    },
+    "test_statistics": {
+        "schema": TEST_STATISTICS_SCHEMA,
+        "dtypes": TEST_STATISTICS_DTYPES,
+        "partition_column": "season",
+        "csv_path": "data/test_statistics/statistics/{partition}.csv",
+    },
+    "test_points_counts": {
+        "schema": TEST_POINTS_COUNTS_SCHEMA,
+        "dtypes": TEST_POINTS_COUNTS_DTYPES,
+        "partition_column": "season",
+        "csv_path": "data/test_statistics/points_counts/{partition}.csv",
+    },
+    "dim_player": {
+        "schema": DIM_PLAYER_SCHEMA,
+        "dtypes": DIM_PLAYER_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/dimensions/dim_player.csv",
+    },
+    "dim_team": {
+        "schema": DIM_TEAM_SCHEMA,
+        "dtypes": DIM_TEAM_DTYPES,
+        "partition_column": None,
+        "csv_path": "data/dimensions/dim_team.csv",
+    },
+}
+
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda column, values: column.isin(values),
+    "not in": lambda column, values: ~column.isin(values),
+}
+
+
+def get_dataset_config(name):
+    """
+    Get the schema, partition column and CSV path of a registered dataset.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+
+    Returns
+    -------
+    dict
+        The dataset configuration.
+
+    Raises
+    ------
+    ValueError
+        If the dataset is not registered.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{name}'. Expected one of {list(DATASETS)}.")
+    return DATASETS[name]
+
+
+def get_parquet_path(name):
+    """Get the directory holding the Parquet files of a dataset."""
+    return f"{PARQUET_ROOT}/{name}"
+
+
+def dataset_exists(name):
+    """Check whether a dataset has been written as Parquet or CSV."""
+    config = get_dataset_config(name)
+    return os.path.exists(get_parquet_path(name)) or bool(
+        glob.glob(config["csv_path"].format(partition="*"))
+    )
+
+
+def get_dataset_fingerprint(name):
+    """
+    Fingerprint the files a dataset is read from.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+
+    Returns
+    -------
+    tuple
+        The (path, modification time, size) of each Parquet file, or of each CSV file
+        if the dataset has no Parquet files. It changes whenever a file is written,
+        added or removed.
+    """
+    config = get_dataset_config(name)
+    root = get_parquet_path(name)
+    if os.path.exists(root):
+        paths = glob.glob(f"{root}/**/*.parquet", recursive=True)
+    else:
+        paths = glob.glob(config["csv_path"].format(partition="*"))
+
+    fingerprint = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Removed while a partition is being rewritten
+            continue
+        fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def write_dataset(df, name, export_csv=False):
+    """
+    Write a DataFrame to a dataset as Parquet, replacing the partitions it contains.
+
+    Partitioned datasets get one file per partition value (e.g. one per season),
+    so writing one season leaves the other seasons in place.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to write. Must contain every column of the dataset schema.
+    name : str
+        The dataset name, a key of `DATASETS`.
+    export_csv : bool, optional
+        If True, also write the data to the dataset's CSV location (default is False).
+    """
+    config = get_dataset_config(name)
+    schema = config["schema"]
+    partition_column = config["partition_column"]
+    root = get_parquet_path(name)
+
+    if partition_column is None:
+        partitions = [(None, df)]
+        file_schema = schema
+    else:
+        partitions = list(df.groupby(partition_column, sort=False, observed=True))
+        file_schema = pa.schema(
+            [field for field in schema if field.name != partition_column]
+        )
+
+    for partition, partition_df in partitions:
+        if partition is None:
+            partition_dir = root
+        else:
+            partition_dir = f"{root}/{partition_column}={partition}"
+
+        # Cast after conversion so scraped numbers held as strings are parsed
+        table = pa.Table.from_pandas(
+            partition_df[file_schema.names], preserve_index=False
+        ).cast(file_schema)
+        if os.path.exists(partition_dir):
+            shutil.rmtree(partition_dir)
+        os.makedirs(partition_dir)
+        pq.write_table(table, f"{partition_dir}/part-0.parquet")
+
+        if export_csv:
+            csv_path = config["csv_path"].format(partition=partition)
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+            partition_df.to_csv(csv_path, index=False, encoding="utf-8")
+
+
+def apply_filters(df, filters):
+    """
+    Apply filters in the Parquet (column, op, value) form to a DataFrame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to filter.
+    filters : list of tuple
+        Filters that must all hold, e.g. [("season", "in", ["2022-23", "2023-24"])].
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows matching every filter.
+    """
+    for column, op, value in filters:
+        df = df[FILTER_OPERATORS[op](df[column], value)]
+    return df
+
+
+def read_csv_dataset(name, columns=None, filters=None, compact=True):
+    """
+    Read a dataset from its CSV files.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+    columns : list of str, optional
+        The columns to read. All columns are read if None (default is None).
+    filters : list of tuple, optional
+        Row filters in the (column, op, value) form (default is None).
+    compact : bool, optional
+        If True, cast the columns to the dataset's in-memory dtypes (default is True).
+
+    Returns
+    -------
+    pd.DataFrame
+        The dataset rows.
+    """
+    config = get_dataset_config(name)
+    paths = sorted(glob.glob(config["csv_path"].format(partition="*")))
+
+    # Filter columns must be read even when they are not returned
+    read_columns = columns
+    if columns is not None and filters:
+        read_columns = list(
+            dict.fromkeys(list(columns) + [column for column, _, _ in filters])
+        )
+
+    df = pd.concat(
+        [pd.read_csv(path, usecols=read_columns) for path in paths],
+        ignore_index=True,
+    )
+    if filters:
+        df = apply_filters(df, filters).reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    if compact:
+        df = apply_dtypes(df, config["dtypes"])
+    return df
+
+
+def read_dataset(name, columns=None, filters=None, compact=True):
+    """
+    Read a dataset, only loading the requested columns and matching rows.
+
+    Parquet files are read when the dataset has been written with `write_dataset`;
+    filters on the partition column then skip whole files. Otherwise the dataset's
+    CSV files are read.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+    columns : list of str, optional
+        The columns to read. All columns are read if None (default is None).
+    filters : list of tuple, optional
+        Row filters in the (column, op, value) form, e.g.
+        [("season", "in", ["2022-23", "2023-24"])] (default is None).
+    compact : bool, optional
+        If True, cast the columns to the dataset's in-memory dtypes, e.g. categorical
+        teams and positions. If False, strings are objects and numbers 64-bit
+        (default is True).
+
+    Returns
+    -------
+    pd.DataFrame
+        The dataset rows, with columns in schema order unless `columns` is given.
+    """
+    config = get_dataset_config(name)
+    root = get_parquet_path(name)
+
+    if not os.path.exists(root):
+        return read_csv_dataset(name, columns=columns, filters=filters, compact=compact)
+
+    table = pq.read_table(
+        root,
+        columns=columns,
+        filters=filters or None,
+        schema=config["schema"],
+        partitioning="hive" if config["partition_column"] else None,
+    )
+    df = table.to_pandas()
+    if compact:
+        df = apply_dtypes(df, config["dtypes"])
+    return df
+
+
+def import_csv_dataset(name):
+    """
+    Convert a dataset's existing CSV files to Parquet.
+
+    Parameters
+    ----------
+    name : str
+        The dataset name, a key of `DATASETS`.
+    """
+    write_dataset(read_csv_dataset(name), name)
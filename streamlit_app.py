@@ -1,17 +1,28 @@
 import streamlit as st
 import pandas as pd
-from src.tools.app_tools import top_players_fpl_data
+from src.tools.app_tools import (
+    build_player_name_index,
+    build_top_players_index,
+    search_players_fpl_data,
+)
 import base64
-import altair as alt
 
-from src.tools.yaml_loader import load_yaml_file
+from src.analysis.statistics_store import tests_from_statistics
+from src.analysis.stats_tests import format_result
+from src.tools.app_charts import get_chart_spec, labelled_scatter_plot
+from src.tools.app_data import (
+    get_app_cache_info,
+    get_app_dataset_view,
+    load_app_dataset,
+)
+from src.tools.config import get_parameter
 
 
 # Load parameters
-file_path = "conf/parameters.yaml"
-parameters = load_yaml_file(file_path)
-number_gameweeks_played_min = parameters["number_gameweeks_played_min"]
-minutes_played_gameweek_min = parameters["minutes_played_gameweek_min"]
+number_gameweeks_played_min = get_parameter("number_gameweeks_played_min")
+minutes_played_gameweek_min = get_parameter("minutes_played_gameweek_min")
+team_strength_threshold = get_parameter("team_strength_threshold")
+sample_size_threshold = get_parameter("sample_size_threshold")
 
 # Set the page configuration
 st.set_page_config(
@@ -19,18 +30,29 @@ st.set_page_config(
     page_icon=":soccer:",  # layout="wide"
 )
 
-# Import data
-fpl_data = pd.read_csv("data/fpl_data/joined/seasons_joined.csv")
-goals_championship_fpl_points = pd.read_csv(
-    "data/analysis/goals_championship_fpl_points.csv"
-)
-assists_championship_fpl_points = pd.read_csv(
-    "data/analysis/assists_championship_fpl_points.csv"
-)
-team_performance_fpl_points = pd.read_csv(
-    "data/analysis/team_performance_fpl_points.csv"
-)
-welchs_ttest = pd.read_csv("data/analysis/test_welchs_ttest.csv")
+# Import data. The FPL data is only read, with the columns used by the app, by the
+# sections built from it. Datasets are read once per app process and shared between
+# sessions and reruns until their files change.
+fpl_columns = [
+    "name",
+    "season",
+    "total_points",
+    "position",
+    "team",
+    "value_first_gw",
+    "goals_scored",
+    "assists",
+    "saves",
+    "goals_conceded",
+    "minutes_played",
+    "promoted_from_championship",
+]
+goals_championship_fpl_points = load_app_dataset("goals_championship_fpl_points")
+assists_championship_fpl_points = load_app_dataset("assists_championship_fpl_points")
+team_performance_fpl_points = load_app_dataset("team_performance_fpl_points")
+welchs_ttest = load_app_dataset("test_welchs_ttest")
+test_statistics = load_app_dataset("test_statistics")
+test_points_counts = load_app_dataset("test_points_counts")
 
 st.title("FPL Championship Analysis")
 
@@ -199,6 +221,48 @@ st.markdown(
     """**whilst the p-value is below a 0.05 threshold, we are making [multiple comparisons](https://en.wikipedia.org/wiki/Multiple_comparisons_problem) so the signficiance threshold will be lower*"""
 )
 
+st.markdown("""
+##### Testing Selected Seasons
+Select seasons to rerun the test on those seasons only.
+""")
+
+
+# Interactive sections are fragments: changing a section's widgets re-runs only that
+# section, and their outputs are cached by the section's data and inputs.
+@st.cache_data(show_spinner=False)
+def get_seasons_ttest(
+    statistics, points_counts, seasons, team_strength_threshold, sample_size_threshold
+):
+    """Get the formatted t-test results of the selected seasons."""
+    # The test is computed from stored per-season points summaries, not player rows
+    seasons_ttest, _ = tests_from_statistics(
+        seasons=seasons,
+        team_strength_threshold=team_strength_threshold,
+        statistics=statistics,
+        points_counts=points_counts,
+    )
+    return format_result(seasons_ttest, sample_size_threshold=sample_size_threshold)
+
+
+@st.fragment
+def seasons_test_section():
+    test_seasons = sorted(test_statistics["season"].unique())
+    selected_seasons = st.multiselect("Seasons", test_seasons, default=test_seasons)
+    if selected_seasons:
+        seasons_ttest = get_seasons_ttest(
+            test_statistics,
+            test_points_counts,
+            selected_seasons,
+            team_strength_threshold,
+            sample_size_threshold,
+        )
+        st.dataframe(seasons_ttest, hide_index=True)
+    else:
+        st.info("Select at least one season.")
+
+
+seasons_test_section()
+
 st.text("")
 st.markdown("""
 #### £5.0m Midfielders Total Points Distribution
@@ -229,28 +293,39 @@ Previous performance (goals and assists) correlates with FPL points in the follo
 st.text("")
 
 
-goals_championship_fpl_points = goals_championship_fpl_points[
-    goals_championship_fpl_points["Championship Goals"] >= 0
-]
-
-position = st.selectbox(
-    "Filter by Position",
-    ["All", "DEF", "MID", "FWD"],
-    index=3,
-    key="scatter_plot_goals",
-)
-
-if position != "All":
+@st.cache_data(show_spinner=False)
+def get_goals_outputs(goals_championship_fpl_points, position):
+    """Get the goals scatter plot spec and the average stats by value of a position."""
     goals_championship_fpl_points = goals_championship_fpl_points[
-        goals_championship_fpl_points["Position"] == position
+        goals_championship_fpl_points["Championship Goals"] >= 0
     ]
 
-
-# Create a base scatter plot
-base = (
-    alt.Chart(goals_championship_fpl_points)
-    .mark_circle(size=60)
-    .encode(
+    if position != "All":
+        goals_championship_fpl_points = goals_championship_fpl_points[
+            goals_championship_fpl_points["Position"] == position
+        ]
+
+    # Define points to annotate
+    if position in ["MID"]:
+        players_to_annotate = [
+            "Jota: 18/19",
+            "Harrison: 20/21",
+            "Pereira: 20/21",
+            "Sessegnon: 18/19",
+            "Knockaert: 17/18",
+            "Grealish: 19/20",
+        ]
+    else:
+        players_to_annotate = [
+            "Mitrović: 22/23",
+            "Toney: 21/22",
+            "Pukki: 19/20",
+            "Bamford: 20/21",
+        ]
+
+    # Toney's label is offset to the left, the other players' to the right
+    chart = labelled_scatter_plot(
+        goals_championship_fpl_points,
         x="Championship Goals",
         y="FPL Points",
         tooltip=[
@@ -259,104 +334,77 @@ base = (
             "Championship Goals",
             "FPL Points",
             "FPL Value",
-        ],  # Tooltips for all points
+        ],
+        label="Player (FPL Season) - Short",
+        label_groups=[
+            {
+                "labels": [
+                    player
+                    for player in players_to_annotate
+                    if player == "Toney: 21/22"
+                ],
+                "align": "right",
+                "dx": -10,
+            },
+            {
+                "labels": [
+                    player
+                    for player in players_to_annotate
+                    if player != "Toney: 21/22"
+                ],
+                "align": "left",
+                "dx": 10,
+            },
+        ],
     )
-)
-
-# Define points to annotate
-if position in ["MID"]:
-    players_to_annotate = [
-        "Jota: 18/19",
-        "Harrison: 20/21",
-        "Pereira: 20/21",
-        "Sessegnon: 18/19",
-        "Knockaert: 17/18",
-        "Grealish: 19/20",
-    ]
-else:
-    players_to_annotate = [
-        "Mitrović: 22/23",
-        "Toney: 21/22",
-        "Pukki: 19/20",
-        "Bamford: 20/21",
-    ]
 
-# Create a DataFrame for annotations with specific offsets
-annotations_df = goals_championship_fpl_points[
-    goals_championship_fpl_points["Player (FPL Season) - Short"].isin(
-        players_to_annotate
+    average_stats = (
+        goals_championship_fpl_points.groupby("FPL Value")[
+            ["FPL Points", "Championship Goals"]
+        ]
+        .mean()
+        .reset_index()
     )
-]
 
-# Create text annotations for Toney separately (offset to the left)
-toney_text = (
-    alt.Chart(
-        annotations_df[annotations_df["Player (FPL Season) - Short"] == "Toney: 21/22"]
-    )
-    .mark_text(
-        align="right",  # Align text to the right for Toney
-        dx=-10,  # Move Toney's label to the left
-        dy=-5,  # Vertical offset
-        fontSize=12,
-        color="#767679",
-    )
-    .encode(x="Championship Goals", y="FPL Points", text="Player (FPL Season) - Short")
-)
+    average_stats["FPL Points"] = round(average_stats["FPL Points"], 1)
+    average_stats["Championship Goals"] = round(average_stats["Championship Goals"], 1)
+    return get_chart_spec(chart), average_stats
 
-# Create text annotations for the other players (offset to the right)
-other_text = (
-    alt.Chart(
-        annotations_df[annotations_df["Player (FPL Season) - Short"] != "Toney: 21/22"]
+
+# The average stats table below the chart follows its position filter, so both are
+# in the same section
+@st.fragment
+def goals_section():
+    position = st.selectbox(
+        "Filter by Position",
+        ["All", "DEF", "MID", "FWD"],
+        index=3,
+        key="scatter_plot_goals",
     )
-    .mark_text(
-        align="left",  # Align text to the left for others
-        dx=10,  # Move labels to the right
-        dy=-5,  # Vertical offset
-        fontSize=12,
-        color="#767679",
+    chart_spec, average_stats = get_goals_outputs(
+        goals_championship_fpl_points, position
     )
-    .encode(x="Championship Goals", y="FPL Points", text="Player (FPL Season) - Short")
-)
-
-# Combine the scatter plot with the annotations
-chart = base + toney_text + other_text
-
 
-# Display the chart in Streamlit
-st.altair_chart(chart, use_container_width=False)
-st.markdown("""#### Forwards:  Championship Goals vs. FPL points vs. FPL Value
+    # Display the chart in Streamlit
+    st.vega_lite_chart(chart_spec, use_container_width=False)
+    st.markdown("""#### Forwards:  Championship Goals vs. FPL points vs. FPL Value
 This shows Championship goals do correlate with FPL Points after promotion. However these players are priced based on this performance in the championship.           
             """)
-st.text("")
-
-forwards = goals_championship_fpl_points[
-    (goals_championship_fpl_points["Position"] == "FWD")
-]
+    st.text("")
 
-# Calculate correlation matrix
-correlation_matrix = forwards[["FPL Points", "FPL Value", "Championship Goals"]].corr()
-average_stats = (
-    goals_championship_fpl_points.groupby("FPL Value")[
-        ["FPL Points", "Championship Goals"]
-    ]
-    .mean()
-    .reset_index()
-)
-
-average_stats["FPL Points"] = round(average_stats["FPL Points"], 1)
-average_stats["Championship Goals"] = round(average_stats["Championship Goals"], 1)
-
-
-image_path = "assets/fwd_correlation_heatmap.png"
-st.image(image_path, use_column_width=False)
-st.text("")
-st.markdown("""
+    image_path = "assets/fwd_correlation_heatmap.png"
+    st.image(image_path, use_column_width=False)
+    st.text("")
+    st.markdown("""
 Again, here we can see for forwards, as FPL Value increases, FPL Points increases, along with championship goals the previous season.
 
 In other words, as would be expected, their price is set depending on their goals scored the previous season.
             """)
 
-st.dataframe(average_stats, hide_index=True)
+    st.dataframe(average_stats, hide_index=True)
+
+
+goals_section()
 
 st.markdown("""#### Comparing FPL points with Championship Assists from the Previous Season
 This illustrates players who provided assists in the Championship in teams that were subsequently promoted. It compares the players' FPL points in the season following their promotion. Matheus Pereira's strong performances in the Championship and FPL during the 2019/20 and 2020/21 seasons, respectively, are highlighted in the top right.
@@ -365,28 +413,20 @@ This illustrates players who provided assists in the Championship in teams that
 st.text("")
 
 
-assists_championship_fpl_points = assists_championship_fpl_points[
-    assists_championship_fpl_points["Championship Assists"] >= 0
-]
-
-position = st.selectbox(
-    "Filter by Position",
-    ["All", "DEF", "MID", "FWD"],
-    index=2,
-    key="scatter_plot_assists",
-)
-
-if position != "All":
+@st.cache_data(show_spinner=False)
+def get_assists_chart(assists_championship_fpl_points, position):
+    """Get the assists scatter plot spec of a position."""
     assists_championship_fpl_points = assists_championship_fpl_points[
-        assists_championship_fpl_points["Position"] == position
+        assists_championship_fpl_points["Championship Assists"] >= 0
     ]
 
+    if position != "All":
+        assists_championship_fpl_points = assists_championship_fpl_points[
+            assists_championship_fpl_points["Position"] == position
+        ]
 
-# Create a base scatter plot
-base = (
-    alt.Chart(assists_championship_fpl_points)
-    .mark_circle(size=60)
-    .encode(
+    chart = labelled_scatter_plot(
+        assists_championship_fpl_points,
         x="Championship Assists",
         y="FPL Points",
         tooltip=[
@@ -395,47 +435,36 @@ base = (
             "Championship Assists",
             "FPL Points",
             "FPL Value",
-        ],  # Tooltips for all points
+        ],
+        label="Player (FPL Season) - Short",
+        label_groups=[
+            {
+                "labels": ["Wilson: 22/23", "Harrison: 20/21", "Pereira: 20/21"],
+                "align": "left",
+                "dx": 10,
+            }
+        ],
     )
-)
+    return get_chart_spec(chart)
 
-# Define points to annotate
-players_to_annotate = [
-    "Wilson: 22/23",
-    "Harrison: 20/21",
-    "Pereira: 20/21",
-]
 
-
-# Create a DataFrame for annotations with specific offsets
-annotations_df = assists_championship_fpl_points[
-    assists_championship_fpl_points["Player (FPL Season) - Short"].isin(
-        players_to_annotate
+@st.fragment
+def assists_section():
+    position = st.selectbox(
+        "Filter by Position",
+        ["All", "DEF", "MID", "FWD"],
+        index=2,
+        key="scatter_plot_assists",
     )
-]
-
 
-# Create text annotations for the other players (offset to the right)
-other_text = (
-    alt.Chart(annotations_df)
-    .mark_text(
-        align="left",  # Align text to the left
-        dx=10,  # Move labels to the right
-        dy=-5,  # Vertical offset
-        fontSize=12,
-        color="#767679",
+    # Display the chart in Streamlit
+    st.vega_lite_chart(
+        get_assists_chart(assists_championship_fpl_points, position),
+        use_container_width=False,
     )
-    .encode(
-        x="Championship Assists", y="FPL Points", text="Player (FPL Season) - Short"
-    )
-)
-
-# Combine the scatter plot with the annotations
-chart = base + other_text
 
 
-# Display the chart in Streamlit
-st.altair_chart(chart, use_container_width=False)
+assists_section()
 st.text("")
 
 st.divider()
@@ -443,39 +472,73 @@ st.markdown("""#### Players from Promoted Teams by Total FPL Points""")
 st.text("")
 
 
-# Create two columns: one for the dropdown and one for the slider
-col1, col2 = st.columns([1, 1])
-
-# Dropdown in the first column
-with col1:
-    position = st.selectbox(
-        "Filter by Position", ["All", "GK", "DEF", "MID", "FWD"], index=0
+@st.fragment
+def top_players_section():
+    # Create two columns: one for the dropdown and one for the slider
+    col1, col2 = st.columns([1, 1])
+
+    # Dropdown in the first column
+    with col1:
+        position = st.selectbox(
+            "Filter by Position", ["All", "GK", "DEF", "MID", "FWD"], index=0
+        )
+
+    # Slider in the second column
+    with col2:
+        value_limit = st.slider(
+            "Filter by Player Value",
+            min_value=0.0,
+            max_value=10.0,
+            value=(0.0, 10.0),
+            step=0.1,
+            format="£%.1f",
+        )
+
+    # Filter your data with the selected position and value limit
+    top_players_index = get_app_dataset_view(
+        "fpl_data", build_top_players_index, columns=fpl_columns
     )
-
-# Slider in the second column
-with col2:
-    value_limit = st.slider(
-        "Filter by Player Value",
-        min_value=0.0,
-        max_value=10.0,
-        value=(0.0, 10.0),
-        step=0.1,
-        format="£%.1f",
+    fpl_data_filtered = top_players_index.top_players(
+        filter_position=position, filter_value_first_gw=value_limit, top_n=1000
     )
 
-# Filter your data with the selected position and value limit
-fpl_data_filtered = top_players_fpl_data(
-    df=fpl_data, filter_position=position, top_n=1000, filter_value_first_gw=value_limit
-)
+    # Display filtered data
+    st.dataframe(fpl_data_filtered, hide_index=True)
 
-# Display filtered data
-st.dataframe(fpl_data_filtered, hide_index=True)
+
+top_players_section()
 
 st.markdown("""
 **Average points per game is the total points, divided by 38 (the number of gameweeks), not the average for games played.*
 """)
 
 
+st.text("")
+
+st.markdown("""#### Player Search
+Search every player's FPL seasons by name. Accents, typos and partial names are fine.
+            """)
+
+
+@st.fragment
+def player_search_section():
+    player_query = st.text_input("Search for a Player", placeholder="e.g. Mitrovic")
+    if player_query:
+        player_matches = search_players_fpl_data(
+            name_index=get_app_dataset_view(
+                "fpl_data", build_player_name_index, columns=fpl_columns
+            ),
+            query=player_query,
+        )
+        if player_matches.empty:
+            st.markdown("No players found.")
+        else:
+            st.dataframe(player_matches, hide_index=True)
+
+
+player_search_section()
+
+
 st.text("")
 
 st.markdown("""#### Promoted Teams by Total FPL Points
@@ -522,3 +585,7 @@ Note: This analysis doesn't solely focus on players who played in the Championsh
 We are only looking at players in teams that were promoted, not those joining from promoted teams. The latter can be influenced by the strength of the club they are moving to (e.g., when Tottenham signed Bale).
 
 A separate analysis would be needed to assess the impact of signings from different teams.""")
+
+# Data cache statistics, shown with ?debug=1
+if st.query_params.get("debug"):
+    st.sidebar.json(get_app_cache_info())